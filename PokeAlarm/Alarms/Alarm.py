@@ -2,7 +2,10 @@
 import time
 import traceback
 # 3rd Party Imports
+from gevent.event import Event
 # Local Imports
+from Retry import get_backoff, get_breaker, get_retry_queue
+from Template import Template
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 #             ONLY EDIT THIS FILE IF YOU KNOW WHAT YOU ARE DOING!
@@ -20,6 +23,15 @@ class Alarm(object):
         "gyms": {}
     }
 
+    _dts_keys = None  # DTS used by the alert for each kind of event
+
+    # Alarms that queue their alerts (or their retries) to be sent in the
+    # background report when each one is sent to the send listener instead
+    sends_in_background = False
+    _send_listener = None
+    _pending = 0  # Alerts passed to track_send that haven't finished
+    _idle = None  # Set whenever there are no pending alerts
+
     # Gather settings and create alarm
     def __init__(self):
         raise NotImplementedError("This is an abstract method.")
@@ -60,16 +72,72 @@ class Alarm(object):
     def raid_alert(self, pokeraid_info):
         raise NotImplementedError('Raid Alert is not implemented.')
 
+    # Wait for the alerts of this alarm that are still being sent in the
+    # background (but not for those of other alarms)
+    def flush(self, timeout=None):
+        if self._pending > 0:
+            self._idle.wait(timeout)
+
+    # Set the function called with how long each alert sent in the
+    # background took, and whether it was sent
+    def set_send_listener(self, listener):
+        self._send_listener = listener
+
+    # Returns a callback to call once each part of an alert has been sent
+    # (or given up on), which reports the alert to the send listener
+    def track_send(self, parts=1):
+        start = time.time()
+        listener = self._send_listener
+        results = []
+        if self._idle is None:
+            self._idle = Event()
+        self._pending += 1
+        self._idle.clear()
+
+        def callback(ok):
+            results.append(ok)
+            if len(results) != parts:
+                return
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+            if listener is not None:
+                listener(time.time() - start, all(results))
+        return callback
+
+    # Compile a string into a Template so substitutions can be made quickly
+    @staticmethod
+    def create_template(string):
+        if string is None:
+            return None
+        return Template(string)
+
+    # Record which DTS the templates of each alert use
+    def set_dts_keys(self, alerts):
+        self._dts_keys = {}
+        for kind, alert in alerts.iteritems():
+            keys = set()
+            values = alert.values() if isinstance(alert, dict) else alert
+            for value in values:
+                if isinstance(value, Template):
+                    keys.update(value.keys)
+            self._dts_keys[kind] = frozenset(keys)
+
+    # Returns the DTS used to alert on the given kind of event, or None
+    # if this alarm doesn't know which it uses
+    def get_dts_keys(self, kind):
+        if self._dts_keys is None:
+            return None
+        return self._dts_keys.get(kind, frozenset())
+
     # Return a version of the string with the correct substitutions made
     @staticmethod
     def replace(string, pkinfo):
         if string is None:
             return None
-
-        s = string.encode('utf-8')
-        for key in pkinfo:
-            s = s.replace("<{}>".format(key), str(pkinfo[key]))
-        return s
+        if not isinstance(string, Template):
+            string = Template(string)
+        return string.render(pkinfo)
 
     @staticmethod
     def pop_type(data, param_name, kind, default=None):
@@ -82,20 +150,67 @@ class Alarm(object):
                 'Unable to interpret the value "{}" as a valid {} '
                 'for parameter {}.", '.format(value, kind, param_name))
 
-    # Attempts to send the alert multiple times
+    # Returns the time (in seconds since the epoch) after which the alert
+    # isn't worth sending anymore, or None if it doesn't expire
+    @staticmethod
+    def get_deadline(info):
+        return getattr(info, 'deadline', None)
+
+    # Attempts to send the alert, and schedules it to be tried again later
+    # if it fails (until it runs out of attempts or time). The callback (if
+    # any) is called with whether it was finally sent or given up on.
     @staticmethod
-    def try_sending(log, reconnect, name, send_alert, args, max_attempts=3):
-        for i in range(max_attempts):
+    def try_sending(log, reconnect, name, send_alert, args, max_attempts=3,
+                    deadline=None, destination=None, callback=None,
+                    attempt=1):
+        if deadline is not None and time.time() > deadline:
+            log.info("{} notification expired before it could be sent. "
+                     "Giving up.".format(name))
+            if callback is not None:
+                callback(False)
+            return
+        breaker = get_breaker(destination or name)
+        if not breaker.allow():  # Destination has been failing
+            if attempt >= max_attempts:
+                log.error("{} is still failing... Giving up.".format(name))
+                if callback is not None:
+                    callback(False)
+                return
+            delay = breaker.get_delay() + get_backoff(1)
+            log.debug("{} is failing, waiting {:.2f}s to send.".format(
+                name, delay))
+        else:
             try:
                 send_alert(**args)
+                breaker.success()
+                if callback is not None:
+                    callback(True)
                 return  # message sent successfully
             except Exception as e:
+                breaker.failure()
                 log.error("Encountered error while sending notification"
                           + " ({}: {})".format(type(e).__name__, e))
                 log.debug("Stack trace: \n {}".format(traceback.format_exc()))
                 log.info(
                     "{} is having connection issues. {} attempt of {}.".format(
-                        name, i + 1, max_attempts))
-                time.sleep(3)
-                reconnect()
-        log.error("Could not send notification... Giving up.")
+                        name, attempt, max_attempts))
+                if attempt >= max_attempts:
+                    log.error("Could not send notification... Giving up.")
+                    if callback is not None:
+                        callback(False)
+                    return
+                try:
+                    reconnect()
+                except Exception as e:
+                    log.error("Unable to reconnect ({}: {})".format(
+                        type(e).__name__, e))
+                delay = get_backoff(attempt)
+        if deadline is not None and time.time() + delay > deadline:
+            log.info("{} notification would expire before it could be "
+                     "tried again. Giving up.".format(name))
+            if callback is not None:
+                callback(False)
+            return
+        get_retry_queue().schedule(
+            delay, Alarm.try_sending, log, reconnect, name, send_alert, args,
+            max_attempts, deadline, destination, callback, attempt + 1)
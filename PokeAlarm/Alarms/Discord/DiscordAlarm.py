@@ -1,6 +1,5 @@
 # Standard Library Imports
 import logging
-import requests
 
 # 3rd Party Imports
 import itertools
@@ -9,10 +8,11 @@ from PokeAlarm.Alarms import Alarm
 from PokeAlarm.Utils import parse_boolean, get_static_map_url, \
     reject_leftover_parameters, require_and_remove_key, get_image_url, \
     get_static_weather_map_url
+from WebhookScheduler import get_scheduler
 
 log = logging.getLogger('Discord')
-try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 #             ONLY EDIT THIS FILE IF YOU KNOW WHAT YOU ARE DOING!
@@ -23,6 +23,8 @@ replace = Alarm.replace
 
 class DiscordAlarm(Alarm):
 
+    sends_in_background = True  # Payloads are queued on the scheduler
+
     _defaults = {
         'monsters': {
             'username': "<mon_name>",
@@ -93,9 +95,13 @@ class DiscordAlarm(Alarm):
     def __init__(self, settings, max_attempts, static_map_key):
         # Required Parameters
         self.__webhook_url = "https://discordapp.com/api/webhooks/<channel_id>"
-        self.__max_attempts = max_attempts
 
         # Optional Alarm Parameters
+        self.__max_attempts = self.pop_type(
+            settings, 'max_attempts', int, max_attempts)
+        self.__timeout = self.pop_type(settings, 'timeout', float, 5)
+        self.__batch_window = self.pop_type(
+            settings, 'batch_window', float, 0)
         self.__startup_message = parse_boolean(
             settings.pop('startup_message', "True"))
         self.__disable_embed = parse_boolean(
@@ -119,6 +125,16 @@ class DiscordAlarm(Alarm):
         self.__weather = self.create_alert_settings(
             settings.pop('weather', {}), self._defaults['weather'], 'weather')
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__monsters,
+            'stops': self.__stops,
+            'gyms': self.__gyms,
+            'eggs': self.__eggs,
+            'raids': self.__raids,
+            'weather': self.__weather
+        })
+
         # Warn user about leftover parameters
         reject_leftover_parameters(settings, "'Alarm level in Discord alarm.")
 
@@ -131,15 +147,14 @@ class DiscordAlarm(Alarm):
     # Send a message letting the channel know that this alarm has started
     def startup_message(self):
         if self.__startup_message:
-            args = {
-                'url': self.__webhook_url,
-                'payload': {
-                    'username': 'PokeAlarm',
-                    'content': 'PokeAlarm activated!'
-                }
-            }
-            try_sending(log, self.connect, "Discord",
-                        self.send_webhook, args, self.__max_attempts)
+            self.send_webhook(self.__webhook_url, {
+                'username': 'PokeAlarm',
+                'content': 'PokeAlarm activated!'
+            }, callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Set the appropriate settings for each alert
@@ -151,17 +166,21 @@ class DiscordAlarm(Alarm):
             static_map = get_static_map_url(
                 settings.pop('map', self.__map))
         alert = {
-            'webhook_url': settings.pop('webhook_url', self.__webhook_url),
-            'username': settings.pop('username', default['username']),
-            'avatar_url': settings.pop('avatar_url', default['avatar_url']),
+            'webhook_url': template(
+                settings.pop('webhook_url', self.__webhook_url)),
+            'username': template(
+                settings.pop('username', default['username'])),
+            'avatar_url': template(
+                settings.pop('avatar_url', default['avatar_url'])),
             'disable_embed': parse_boolean(
                 settings.pop('disable_embed', self.__disable_embed)),
-            'content': settings.pop('content', default['content']),
-            'icon_url': settings.pop('icon_url', default['icon_url']),
-            'title': settings.pop('title', default['title']),
-            'url': settings.pop('url', default['url']),
-            'body': settings.pop('body', default['body']),
-            'map': static_map
+            'content': template(settings.pop('content', default['content'])),
+            'icon_url': template(
+                settings.pop('icon_url', default['icon_url'])),
+            'title': template(settings.pop('title', default['title'])),
+            'url': template(settings.pop('url', default['url'])),
+            'body': template(settings.pop('body', default['body'])),
+            'map': template(static_map)
         }
 
         reject_leftover_parameters(settings, "'Alert level in Discord alarm.")
@@ -205,12 +224,8 @@ class DiscordAlarm(Alarm):
                 payload['embeds'][0]['image'] = {
                     'url': replace(alert['map'], map_info)
                 }
-        args = {
-            'url': replace(alert['webhook_url'], info),
-            'payload': payload
-        }
-        try_sending(log, self.connect,
-                    "Discord", self.send_webhook, args, self.__max_attempts)
+        self.send_webhook(replace(alert['webhook_url'], info), payload,
+                          self.get_deadline(info), self.track_send())
 
     # Trigger an alert based on Pokemon info
     def pokemon_alert(self, pokemon_info):
@@ -238,15 +253,9 @@ class DiscordAlarm(Alarm):
         log.debug("Weather notification triggered.")
         self.send_alert(self.__weather, weather_info)
 
-    # Send a payload to the webhook url
-    def send_webhook(self, url, payload):
-        log.debug(payload)
-        resp = requests.post(url, json=payload, timeout=5)
-        if resp.ok is True:
-            log.debug("Notification successful (returned {})".format(
-                resp.status_code))
-        else:
-            log.debug("Discord response was {}".format(resp.content))
-            raise requests.exceptions.RequestException(
-                "Response received {}, webhook not accepted.".format(
-                    resp.status_code))
+    # Queue a payload to be sent to the webhook url. The callback is called
+    # with whether it was sent.
+    def send_webhook(self, url, payload, deadline=None, callback=None):
+        get_scheduler().send(url, payload, self.__timeout,
+                             self.__max_attempts, self.__batch_window,
+                             deadline, callback)
@@ -0,0 +1,299 @@
+# Standard Library Imports
+from collections import deque, namedtuple
+import logging
+import itertools
+import re
+import time
+# 3rd Party Imports
+import gevent
+import requests
+# Local Imports
+from PokeAlarm.Alarms.Retry import CircuitBreaker, get_backoff
+from PokeAlarm.Utilities.HttpUtils import get_session
+
+log = logging.getLogger('Discord')
+
+Message = namedtuple(
+    'Message', ['payload', 'timeout', 'max_attempts', 'batch_window',
+                'queued', 'deadline', 'callback'])
+
+# Discord only accepts so many embeds in a single message
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+# Version of the API used by webhook urls that don't give one
+DEFAULT_API_VERSION = 6
+
+# Times a message is sent again after being rate limited before giving up
+MAX_RATE_LIMITED = 10
+
+
+class WebhookScheduler(object):
+    """ Sends Discord webhooks without going over their rate limits.
+
+    Each webhook has its own rate limit bucket, so messages are queued per
+    webhook and sent in order by a greenlet for that webhook. The quota
+    left in a bucket is tracked from the `X-RateLimit-*` headers of each
+    response, and sending waits for the bucket to reset once it runs out.
+    A 429 response pauses the bucket (or every bucket, if the limit is
+    global) for exactly as long as Discord asks, and the message is sent
+    again without counting as a failed attempt (up to MAX_RATE_LIMITED
+    times, in case the limit never lifts). Failed messages are tried
+    again after a backoff, and a webhook that keeps failing is paused by
+    its circuit breaker. Messages that expire while they wait are dropped.
+    Once a message is sent or given up on, its callback is called with
+    whether it was sent.
+
+    Messages can also be given a batch window, to wait for more messages
+    to the same webhook. Their embeds are then sent together in a single
+    message, which uses up the quota much slower on busy channels. If
+    Discord rejects a batch, its messages are sent again one at a time.
+    """
+
+    def __init__(self, session=None):
+        self.__session = session
+        self.__buckets = {}
+        self.__global_reset = 0.0  # When the global rate limit is lifted
+
+    def send(self, url, payload, timeout=5, max_attempts=3,
+             batch_window=0, deadline=None, callback=None):
+        """ Queues a payload to be posted to the webhook url. """
+        bucket = self.__buckets.get(url)
+        if bucket is None:
+            bucket = self.__buckets[url] = _Bucket(url)
+        bucket.pending.append(Message(
+            payload, timeout, max_attempts, batch_window, time.time(),
+            deadline, callback))
+        if bucket.greenlet is None or bucket.greenlet.ready():
+            bucket.greenlet = gevent.spawn(self._run, bucket)
+
+    def get_queue_size(self):
+        """ Returns the number of messages waiting to be sent. """
+        return sum(len(b.pending) for b in self.__buckets.values())
+
+    def join(self, timeout=None):
+        """ Waits for the queued messages to be sent. """
+        greenlets = [b.greenlet for b in self.__buckets.values()
+                     if b.greenlet is not None]
+        gevent.joinall(greenlets, timeout=timeout)
+
+    def _run(self, bucket):
+        attempts, limited = 0, 0
+        while bucket.pending:
+            self._wait(bucket)
+            first = bucket.pending[0]
+            if first.deadline is not None and time.time() > first.deadline:
+                log.info("Notification expired before it could be sent. "
+                         "Giving up.")
+                self._remove(bucket, 1, False)
+                attempts, limited = 0, 0
+                continue
+            delay = first.queued + first.batch_window - time.time()
+            if delay > 0:  # Give other messages a chance to join in
+                gevent.sleep(delay)
+                continue  # It might have expired while waiting
+            if bucket.unbatched > 0:  # Part of a batch that was rejected
+                payload, count = first.payload, 1
+            else:
+                payload, count = self.batch(bucket.pending)
+            timeout, max_attempts = first.timeout, first.max_attempts
+            try:
+                resp = self._post(bucket.url, payload, timeout)
+                if resp.status_code >= 500:  # Worth trying again
+                    raise requests.exceptions.RequestException(
+                        "Response received {}, webhook not accepted.".format(
+                            resp.status_code))
+            except Exception as e:
+                attempts += 1
+                bucket.breaker.failure()
+                log.error("Encountered error while sending notification"
+                          + " ({}: {})".format(type(e).__name__, e))
+                if attempts < max_attempts:
+                    log.info("Discord is having connection issues. "
+                             "{} attempt of {}.".format(
+                                 attempts, max_attempts))
+                    gevent.sleep(get_backoff(attempts))
+                    continue
+                log.error("Could not send notification... Giving up.")
+                self._remove(bucket, count, False)
+                attempts, limited = 0, 0
+                continue
+            bucket.breaker.success()
+            self._update_limits(bucket, resp)
+            if resp.status_code == 429:
+                limited += 1
+                if limited <= MAX_RATE_LIMITED:
+                    continue  # Try again once the limit resets
+                log.error("Discord is still rate limiting the webhook... "
+                          "Giving up.")
+                self._remove(bucket, count, False)
+                attempts, limited = 0, 0
+                continue
+            if resp.status_code == 400 and count > 1:
+                log.warning("Discord rejected a batch of {} notifications, "
+                            "sending them one at a time.".format(count))
+                bucket.unbatched = count
+                attempts, limited = 0, 0
+                continue
+            if resp.ok is True:
+                log.debug("Notification successful (returned {})".format(
+                    resp.status_code))
+            else:
+                log.debug("Discord response was {}".format(resp.content))
+                log.error("Response received {}, webhook not accepted. "
+                          "Giving up.".format(resp.status_code))
+            self._remove(bucket, count, resp.ok is True)
+            attempts, limited = 0, 0
+
+    @staticmethod
+    def _remove(bucket, count, ok):
+        """ Removes the messages that were sent or given up on. """
+        for _ in range(count):
+            msg = bucket.pending.popleft()
+            if msg.callback is not None:
+                try:
+                    msg.callback(ok)
+                except Exception as e:
+                    log.error("Encountered error in notification callback "
+                              "({}: {})".format(type(e).__name__, e))
+        bucket.unbatched = max(0, bucket.unbatched - count)
+
+    @staticmethod
+    def batch(pending):
+        """ Returns the payload for the next messages, and how many of
+        them it includes.
+
+        Messages with a batch window that follow the first one are added
+        to it while they have the same username, avatar and content, their
+        embeds still fit into a single message, and they haven't expired.
+        """
+        now = time.time()
+        first = pending[0]
+        if not first.batch_window or 'embeds' not in first.payload:
+            return first.payload, 1
+        payload = dict(first.payload)
+        payload['embeds'] = list(first.payload['embeds'])
+        chars = sum(_embed_chars(e) for e in payload['embeds'])
+        count = 1
+        for msg in itertools.islice(pending, 1, None):
+            embeds = msg.payload.get('embeds')
+            if not msg.batch_window or not embeds:
+                break
+            if msg.deadline is not None and now > msg.deadline:
+                break  # Dropped once it's the first message
+            if any(msg.payload.get(k) != payload.get(k)
+                   for k in ('username', 'avatar_url', 'content')):
+                break
+            size = sum(_embed_chars(e) for e in embeds)
+            if len(payload['embeds']) + len(embeds) > MAX_EMBEDS \
+                    or chars + size > MAX_EMBED_CHARS:
+                break
+            payload['embeds'].extend(embeds)
+            chars += size
+            count += 1
+        return payload, count
+
+    def _post(self, url, payload, timeout):
+        log.debug(payload)
+        session = self.__session or get_session()
+        return session.post(url, json=payload, timeout=timeout)
+
+    def _wait(self, bucket):
+        """ Sleeps until the bucket is allowed to send again. """
+        now = time.time()
+        delay = self.__global_reset - now
+        if bucket.remaining == 0:
+            delay = max(delay, bucket.reset - now)
+        delay = max(delay, bucket.breaker.get_delay())
+        if delay > 0:
+            log.debug("Waiting {:.2f}s for the rate limit on {}.".format(
+                delay, bucket.url))
+            gevent.sleep(delay)
+        if bucket.remaining == 0 and bucket.reset <= time.time():
+            bucket.remaining = None  # Quota has been reset
+        bucket.breaker.allow()
+
+    def _update_limits(self, bucket, resp):
+        """ Updates the quota of a bucket from the response headers. """
+        now = time.time()
+        headers = resp.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            bucket.remaining = int(remaining)
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        reset = headers.get('X-RateLimit-Reset')
+        if reset_after is not None:
+            bucket.reset = now + float(reset_after)
+        elif reset is not None:
+            bucket.reset = float(reset)
+
+        if resp.status_code != 429:
+            return
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        retry_after = self.get_retry_after(bucket.url, body, headers)
+        if body.get('global') or headers.get('X-RateLimit-Global'):
+            log.warning("Discord global rate limit reached, pausing "
+                        "all webhooks for {:.2f}s.".format(retry_after))
+            self.__global_reset = now + retry_after
+        else:
+            log.warning("Discord rate limit reached, pausing webhook "
+                        "for {:.2f}s.".format(retry_after))
+            bucket.remaining = 0
+            bucket.reset = now + retry_after
+
+    @staticmethod
+    def get_retry_after(url, body, headers):
+        """ Returns the seconds to wait after a 429 response.
+
+        The headers always give seconds, so they are used when sent. The
+        body gives milliseconds before API v8, and seconds after.
+        """
+        for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+            if headers.get(header) is not None:
+                return float(headers[header])
+        retry_after = body.get('retry_after')
+        if retry_after is None:
+            return 1.0
+        if get_api_version(url) < 8:
+            return retry_after / 1000.0
+        return float(retry_after)
+
+
+def get_api_version(url):
+    """ Returns the version of the API a webhook url uses. """
+    match = re.search(r'/api/v(\d+)/', url)
+    return int(match.group(1)) if match else DEFAULT_API_VERSION
+
+
+def _embed_chars(embed):
+    """ Returns the number of characters Discord counts in an embed. """
+    chars = len(embed.get('title') or '') \
+        + len(embed.get('description') or '') \
+        + len((embed.get('footer') or {}).get('text') or '') \
+        + len((embed.get('author') or {}).get('name') or '')
+    for field in embed.get('fields') or []:
+        chars += len(field.get('name') or '') + len(field.get('value') or '')
+    return chars
+
+
+class _Bucket(object):
+    """ Messages waiting to be sent to a webhook, and its rate limit. """
+
+    def __init__(self, url):
+        self.url = url
+        self.pending = deque()
+        self.remaining = None  # Unknown until the first response
+        self.reset = 0.0  # When the quota is refilled
+        self.breaker = CircuitBreaker()
+        self.unbatched = 0  # Messages to send alone, after a rejected batch
+        self.greenlet = None
+
+
+def get_scheduler():
+    """ Returns the scheduler shared by all Discord alarms. """
+    if not hasattr(get_scheduler, 'scheduler'):
+        get_scheduler.scheduler = WebhookScheduler()
+    return get_scheduler.scheduler
@@ -0,0 +1,128 @@
+# Standard Library Imports
+import logging
+import time
+import traceback
+# 3rd Party Imports
+import gevent
+from gevent.queue import Queue
+# Local Imports
+from Alarm import Alarm
+
+log = logging.getLogger('Dispatcher')
+
+
+class Dispatcher(object):
+    """ Sends the notifications for a single alarm in the background.
+
+    Notifications are put in a queue and sent by a pool of workers, so a
+    slow or failing service only holds up its own alarm. Keeps track of
+    how long notifications wait in the queue and how long they take to
+    send, which can be collected with `get_stats`. Alarms that send in the
+    background report when each notification is actually sent (or given
+    up on), so their send times cover more than queueing it. Notifications
+    whose deadline passes while they wait are dropped instead of sent.
+    """
+
+    def __init__(self, name, alarm, workers=1):
+        self.__name = name
+        self.__alarm = alarm
+        self.__queue = Queue()
+        self.__workers = [None] * max(1, int(workers))
+        self.__reset_stats()
+        alarm.set_send_listener(self._on_sent)
+
+    def __reset_stats(self):
+        self.__started = 0
+        self.__sent = 0
+        self.__failed = 0
+        self.__expired = 0
+        self.__wait_total, self.__wait_max = 0.0, 0.0
+        self.__send_total, self.__send_max = 0.0, 0.0
+
+    def get_name(self):
+        return self.__name
+
+    def start(self):
+        """ Starts the workers sending notifications. """
+        for i in range(len(self.__workers)):
+            self.__workers[i] = gevent.spawn(self._work)
+
+    def send(self, alert, info):
+        """ Queues info to be sent with the alarm's alert method. """
+        self.__queue.put((time.time(), alert, info))
+
+    def get_queue_size(self):
+        """ Returns the number of notifications waiting to be sent. """
+        return self.__queue.qsize()
+
+    def get_stats(self):
+        """ Returns the stats since they were last collected. """
+        started, sent = self.__started, self.__sent
+        stats = {
+            'queued': self.get_queue_size(),
+            'sent': sent,
+            'failed': self.__failed,
+            'expired': self.__expired,
+            'avg_wait': self.__wait_total / started if started else 0.0,
+            'max_wait': self.__wait_max,
+            'avg_send': self.__send_total / sent if sent else 0.0,
+            'max_send': self.__send_max
+        }
+        self.__reset_stats()
+        return stats
+
+    def stop(self, timeout=None):
+        """ Sends the remaining notifications and stops the workers. """
+        for _ in self.__workers:
+            self.__queue.put(None)
+        workers = [w for w in self.__workers if w is not None]
+        start = time.time()
+        gevent.joinall(workers, timeout=timeout)
+        for worker in workers:
+            if not worker.ready():
+                log.warning("Alarm '{}' could not finish sending in time! "
+                            "{} notifications were dropped.".format(
+                                self.__name, self.get_queue_size()))
+                gevent.killall(workers)
+                return
+        # Some alarms keep sending after the worker hands them off
+        if timeout is not None:
+            timeout = max(0, timeout - (time.time() - start))
+        self.__alarm.flush(timeout)
+
+    def _work(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:  # Told to stop
+                break
+            queued, alert, info = item
+            start = time.time()
+            deadline = Alarm.get_deadline(info)
+            if deadline is not None and start > deadline:
+                self.__expired += 1
+                log.debug("Alarm '{}' dropped an expired notification."
+                          "".format(self.__name))
+                continue
+            self.__started += 1
+            self.__wait_total += start - queued
+            self.__wait_max = max(self.__wait_max, start - queued)
+            try:
+                getattr(self.__alarm, alert)(info)
+            except Exception as e:
+                log.error("Alarm '{}' encountered error while sending "
+                          "notification ({}: {})".format(
+                              self.__name, type(e).__name__, e))
+                log.debug("Stack trace: \n {}".format(traceback.format_exc()))
+                self._on_sent(time.time() - start, False)
+                continue
+            if not self.__alarm.sends_in_background:
+                self._on_sent(time.time() - start, True)
+
+    def _on_sent(self, duration, ok):
+        """ Records a notification that was sent or given up on. """
+        if not ok:
+            self.__failed += 1
+            return
+        self.__sent += 1
+        self.__send_total += duration
+        self.__send_max = max(self.__send_max, duration)
@@ -13,6 +13,7 @@ from PokeAlarm.Utils import parse_boolean, get_time_as_str, \
 log = logging.getLogger(__name__)
 try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -24,6 +25,8 @@ replace = Alarm.replace
 
 class FacebookPageAlarm(Alarm):
 
+    sends_in_background = True  # Retries are queued on the retry queue
+
     _defaults = {
         'monsters': {
             'message': "A wild <mon_name> has appeared!",
@@ -95,6 +98,15 @@ class FacebookPageAlarm(Alarm):
         self.__raids = self.create_alert_settings(
             settings.pop('raids', {}), self._defaults['raids'])
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__monsters,
+            'stops': self.__stops,
+            'gyms': self.__gyms,
+            'eggs': self.__eggs,
+            'raids': self.__raids
+        })
+
         #  Warn user about leftover parameters
         reject_leftover_parameters(
             settings, "Alarm level in FacebookPage alarm.")
@@ -110,18 +122,23 @@ class FacebookPageAlarm(Alarm):
         if self.__startup_message:
             timestamps = get_time_as_str(datetime.utcnow())
             self.post_to_wall("{} - PokeAlarm has initialized!".format(
-                timestamps[2]))
+                timestamps[2]), callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Set the appropriate settings for each alert
     def create_alert_settings(self, settings, default):
         alert = {
-            'message': settings.pop('message', default['message']),
-            'link': settings.pop('link', default['link']),
-            'caption': settings.pop('caption', default['caption']),
-            'description': settings.pop('description', default['description']),
-            'image': settings.pop('image', default['image']),
-            'name': settings.pop('name', default['name'])
+            'message': template(settings.pop('message', default['message'])),
+            'link': template(settings.pop('link', default['link'])),
+            'caption': template(settings.pop('caption', default['caption'])),
+            'description': template(
+                settings.pop('description', default['description'])),
+            'image': template(settings.pop('image', default['image'])),
+            'name': template(settings.pop('name', default['name']))
         }
         reject_leftover_parameters(
             settings, "Alert level in FacebookPage alarm.")
@@ -140,7 +157,9 @@ class FacebookPageAlarm(Alarm):
             attachment['name'] = replace(alert['name'], info)
         self.post_to_wall(
             message=replace(alert['message'], info),
-            attachment=attachment
+            attachment=attachment,
+            deadline=self.get_deadline(info),
+            callback=self.track_send()
         )
 
     # Trigger an alert based on Pokemon info
@@ -164,9 +183,11 @@ class FacebookPageAlarm(Alarm):
         self.send_alert(self.__raids, raid_info)
 
     # Sends a wall post to Facebook
-    def post_to_wall(self, message, attachment=None):
+    def post_to_wall(self, message, attachment=None, deadline=None,
+                     callback=None):
         args = {"message": message}
         if attachment is not None:
             args['attachment'] = attachment
         try_sending(log, self.connect, "FacebookPage",
-                    self.__client.put_wall_post, args)
+                    self.__client.put_wall_post, args, deadline=deadline,
+                    callback=callback)
@@ -12,6 +12,7 @@ from PokeAlarm.Utils import parse_boolean, require_and_remove_key, \
 log = logging.getLogger(__name__)
 try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -22,6 +23,9 @@ replace = Alarm.replace
 
 
 class PushbulletAlarm(Alarm):
+
+    sends_in_background = True  # Retries are queued on the retry queue
+
     _defaults = {
         'monsters': {
             'title': "A wild <mon_name> has appeared!",
@@ -76,6 +80,15 @@ class PushbulletAlarm(Alarm):
         self.__raid = self.create_alert_settings(
             settings.pop('raids', {}), self._defaults['raids'])
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__pokemon,
+            'stops': self.__pokestop,
+            'gyms': self.__gym,
+            'eggs': self.__egg,
+            'raids': self.__raid
+        })
+
         #  Warn user about leftover parameters
         reject_leftover_parameters(
             settings, "Alarm level in Pushbullet alarm.")
@@ -99,15 +112,20 @@ class PushbulletAlarm(Alarm):
                 "title": "PokeAlarm activated!",
                 "message": "PokeAlarm has successully started!"
             }
-            try_sending(log, self.connect, "PushBullet", self.push_note, args)
+            try_sending(log, self.connect, "PushBullet", self.push_note, args,
+                        callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Set the appropriate settings for each alert
     def create_alert_settings(self, settings, default):
         alert = {
-            'title': settings.pop('title', default['title']),
-            'url': settings.pop('url', default['url']),
-            'body': settings.pop('body', default['body']),
+            'title': template(settings.pop('title', default['title'])),
+            'url': template(settings.pop('url', default['url'])),
+            'body': template(settings.pop('body', default['body'])),
             'channel': settings.pop('channel', None)
         }
         reject_leftover_parameters(
@@ -122,7 +140,9 @@ class PushbulletAlarm(Alarm):
             'url': replace(alert['url'], info),
             'body': replace(alert['body'], info)
         }
-        try_sending(log, self.connect, "PushBullet", self.push_link, args)
+        try_sending(log, self.connect, "PushBullet", self.push_link, args,
+                    deadline=self.get_deadline(info),
+                    callback=self.track_send())
 
     # Trigger an alert based on Pokemon info
     def pokemon_alert(self, pokemon_info):
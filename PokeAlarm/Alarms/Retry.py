@@ -0,0 +1,141 @@
+# Standard Library Imports
+import heapq
+import itertools
+import logging
+import random
+import time
+# 3rd Party Imports
+import gevent
+from gevent.event import Event
+from gevent.pool import Group
+# Local Imports
+
+log = logging.getLogger('Retry')
+
+
+def get_backoff(attempt, base=1.0, cap=60.0):
+    """ Returns the seconds to wait before trying again after the given
+    number of failed attempts.
+
+    The wait doubles after each attempt (up to the cap), and is randomized
+    between half and all of it so that alarms which failed at the same
+    time don't all try again at the same time.
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+
+class CircuitBreaker(object):
+    """ Stops sending to a destination that keeps failing.
+
+    After `threshold` failures in a row the circuit opens, and nothing
+    should be sent for `cooldown` seconds. After that a single attempt is
+    let through - if it works the circuit closes again, otherwise it stays
+    open for another cooldown.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.__threshold = threshold
+        self.__cooldown = cooldown
+        self.__failures = 0
+        self.__opened = None  # When the circuit was last opened
+
+    def is_open(self):
+        return self.__opened is not None
+
+    def get_delay(self):
+        """ Returns the seconds until an attempt can be made (0 if now). """
+        if self.__opened is None:
+            return 0
+        return max(0, self.__opened + self.__cooldown - time.time())
+
+    def allow(self):
+        """ Returns True if an attempt can be made now. """
+        if self.get_delay() > 0:
+            return False
+        if self.__opened is not None:  # Let a single attempt through
+            self.__opened = time.time()
+        return True
+
+    def success(self):
+        self.__failures = 0
+        self.__opened = None
+
+    def failure(self):
+        self.__failures += 1
+        if self.__failures >= self.__threshold:
+            self.__opened = time.time()
+
+
+class RetryQueue(object):
+    """ Runs failed sends again once their backoff has passed.
+
+    Retries are kept in a heap ordered by when they are due, and started
+    by a timer greenlet, so the sender that failed doesn't have to wait.
+    """
+
+    def __init__(self):
+        self.__heap = []
+        self.__order = itertools.count()  # Keeps ties in the order added
+        self.__wakeup = Event()
+        self.__timer = None
+        self.__running = Group()
+
+    def schedule(self, delay, func, *args):
+        """ Calls func(*args) in a new greenlet after delay seconds. """
+        heapq.heappush(self.__heap, (
+            time.time() + delay, next(self.__order), func, args))
+        self.__wakeup.set()  # It might be due sooner than the rest
+        if self.__timer is None or self.__timer.ready():
+            self.__timer = gevent.spawn(self._run)
+
+    def get_queue_size(self):
+        """ Returns the number of retries waiting to be run. """
+        return len(self.__heap)
+
+    def join(self, timeout=None):
+        """ Waits for the scheduled retries to finish. """
+        end = None if timeout is None else time.time() + timeout
+        while True:
+            greenlets = list(self.__running)
+            if self.__timer is not None and not self.__timer.ready():
+                greenlets.append(self.__timer)
+            if not greenlets:
+                return
+            remaining = None if end is None else end - time.time()
+            if remaining is not None and remaining <= 0:
+                return
+            gevent.joinall(greenlets, timeout=remaining)
+
+    def _run(self):
+        while self.__heap:
+            delay = self.__heap[0][0] - time.time()
+            if delay > 0:
+                self.__wakeup.clear()
+                self.__wakeup.wait(delay)
+                continue
+            _, _, func, args = heapq.heappop(self.__heap)
+            self.__running.spawn(func, *args)
+
+
+def get_retry_queue():
+    """ Returns the retry queue shared by all alarms. """
+    if not hasattr(get_retry_queue, 'queue'):
+        get_retry_queue.queue = RetryQueue()
+    return get_retry_queue.queue
+
+
+def reset_retry_queue():
+    """ Forgets the shared retry queue, which can't be used by a forked
+    process. """
+    if hasattr(get_retry_queue, 'queue'):
+        del get_retry_queue.queue
+
+
+def get_breaker(destination):
+    """ Returns the circuit breaker for a destination. """
+    if not hasattr(get_breaker, 'breakers'):
+        get_breaker.breakers = {}
+    if destination not in get_breaker.breakers:
+        get_breaker.breakers[destination] = CircuitBreaker()
+    return get_breaker.breakers[destination]
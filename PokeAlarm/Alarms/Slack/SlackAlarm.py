@@ -13,6 +13,7 @@ from PokeAlarm.Utils import parse_boolean, get_static_map_url, \
 log = logging.getLogger('Slack')
 try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -24,6 +25,8 @@ replace = Alarm.replace
 
 class SlackAlarm(Alarm):
 
+    sends_in_background = True  # Retries are queued on the retry queue
+
     _defaults = {
         'monsters': {
             'username': "<mon_name>",
@@ -93,6 +96,15 @@ class SlackAlarm(Alarm):
         self.__raid = self.create_alert_settings(
             settings.pop('raids', {}), self._defaults['raids'])
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__pokemon,
+            'stops': self.__pokestop,
+            'gyms': self.__gym,
+            'eggs': self.__egg,
+            'raids': self.__raid
+        })
+
         # Warn user about leftover parameters
         reject_leftover_parameters(settings, "'Alarm level in Slack alarm.")
 
@@ -107,20 +119,28 @@ class SlackAlarm(Alarm):
     def startup_message(self):
         if self.__startup_message:
             self.send_message(self.__default_channel, username="PokeAlarm",
-                              text="PokeAlarm activated!")
+                              text="PokeAlarm activated!",
+                              callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Set the appropriate settings for each alert
     def create_alert_settings(self, settings, default):
         alert = {
-            'channel': settings.pop('channel', self.__default_channel),
-            'username': settings.pop('username', default['username']),
-            'icon_url': settings.pop('icon_url', default['icon_url']),
-            'title': settings.pop('title', default['title']),
-            'url': settings.pop('url', default['url']),
-            'body': settings.pop('body', default['body']),
-            'map': get_static_map_url(
-                settings.pop('map', self.__map), self.__static_map_key)
+            'channel': template(
+                settings.pop('channel', self.__default_channel)),
+            'username': template(
+                settings.pop('username', default['username'])),
+            'icon_url': template(
+                settings.pop('icon_url', default['icon_url'])),
+            'title': template(settings.pop('title', default['title'])),
+            'url': template(settings.pop('url', default['url'])),
+            'body': template(settings.pop('body', default['body'])),
+            'map': template(get_static_map_url(
+                settings.pop('map', self.__map), self.__static_map_key))
         }
         reject_leftover_parameters(settings, "'Alert level in Slack alarm.")
         return alert
@@ -142,7 +162,9 @@ class SlackAlarm(Alarm):
                 replace(alert['url'], info), replace(alert['title'], info),
                 replace(alert['body'], info)),
             icon_url=replace(alert['icon_url'], info),
-            attachments=attachments
+            attachments=attachments,
+            deadline=self.get_deadline(info),
+            callback=self.track_send()
         )
 
     # Trigger an alert based on Pokemon info
@@ -189,7 +211,8 @@ class SlackAlarm(Alarm):
 
     # Send a message to Slack
     def send_message(self, channel, username, text,
-                     icon_url=None, attachments=None):
+                     icon_url=None, attachments=None, deadline=None,
+                     callback=None):
         args = {
             "channel": self.get_channel(channel),
             "username": username,
@@ -200,7 +223,9 @@ class SlackAlarm(Alarm):
         if attachments is not None:
             args['attachments'] = attachments
         try_sending(log, self.connect, "Slack",
-                    self.__client.chat.post_message, args)
+                    self.__client.chat.post_message, args,
+                    deadline=deadline, destination=args['channel'],
+                    callback=callback)
 
     # Returns a string s that is in proper channel format
     @staticmethod
@@ -1,6 +1,5 @@
 # Standard Library Imports
 import logging
-import requests
 from collections import namedtuple
 
 # 3rd Party Imports
@@ -9,12 +8,13 @@ from collections import namedtuple
 from PokeAlarm.Alarms import Alarm
 from PokeAlarm.Utilities import GenUtils as utils
 from PokeAlarm.Utils import require_and_remove_key, get_image_url
+from TelegramSender import get_sender
 
 log = logging.getLogger('Telegram')
 
 # 2 lazy 2 type
-try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 #             ONLY EDIT THIS FILE IF YOU KNOW WHAT YOU ARE DOING!
@@ -25,6 +25,8 @@ replace = Alarm.replace
 
 class TelegramAlarm(Alarm):
 
+    sends_in_background = True  # Messages are queued on the sender
+
     Alert = namedtuple(
         "Alert", ['bot_token', 'chat_id', 'sticker', 'sticker_url',
                   'sticker_notify', 'message', 'message_notify', 'venue',
@@ -73,6 +75,7 @@ class TelegramAlarm(Alarm):
 
         self._startup_message = self.pop_type(
             settings, 'startup_message', utils.parse_bool, True)
+        self._timeout = self.pop_type(settings, 'timeout', float, 30)
 
         # Optional Alert Parameters
         alert_defaults = {
@@ -110,6 +113,15 @@ class TelegramAlarm(Alarm):
         self._raid_alert = self.create_alert_settings(
             'raids', settings, alert_defaults)
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self._mon_alert,
+            'stops': self._stop_alert,
+            'gyms': self._gym_alert,
+            'eggs': self._egg_alert,
+            'raids': self._raid_alert
+        })
+
         # Reject leftover parameters
         for key in settings:
             raise ValueError("'{}' is not a recognized parameter for the Alarm"
@@ -128,19 +140,19 @@ class TelegramAlarm(Alarm):
         settings = Alarm.pop_type(settings, kind, dict, {})
 
         alert = TelegramAlarm.Alert(
-            bot_token=Alarm.pop_type(
-                settings, 'bot_token', unicode, default['bot_token']),
-            chat_id=Alarm.pop_type(
-                settings, 'chat_id', unicode, default['chat_id']),
+            bot_token=template(Alarm.pop_type(
+                settings, 'bot_token', unicode, default['bot_token'])),
+            chat_id=template(Alarm.pop_type(
+                settings, 'chat_id', unicode, default['chat_id'])),
             sticker=Alarm.pop_type(
                 settings, 'sticker', utils.parse_bool, default['sticker']),
-            sticker_url=Alarm.pop_type(
-                settings, 'sticker_url', unicode, default['sticker_url']),
+            sticker_url=template(Alarm.pop_type(
+                settings, 'sticker_url', unicode, default['sticker_url'])),
             sticker_notify=Alarm.pop_type(
                 settings, 'sticker_notify', utils.parse_bool,
                 default['sticker_notify']),
-            message=Alarm.pop_type(
-                settings, 'message', unicode, default['message']),
+            message=template(Alarm.pop_type(
+                settings, 'message', unicode, default['message'])),
             message_notify=Alarm.pop_type(
                 settings, 'message_notify', utils.parse_bool,
                 default['message_notify']),
@@ -173,7 +185,12 @@ class TelegramAlarm(Alarm):
     def startup_message(self):
         if self._startup_message:
             self.send_message(
-                self._bot_token, self._chat_id, "PokeAlarm activated!")
+                self._bot_token, self._chat_id, "PokeAlarm activated!",
+                callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Generic Telegram Alert
@@ -183,25 +200,38 @@ class TelegramAlarm(Alarm):
         message = replace(alert.message, dts)
         lat, lng = dts['lat'], dts['lng']
         max_attempts = alert.max_attempts
+        deadline = self.get_deadline(dts)
         sticker_url = replace(alert.sticker_url, dts)
         log.debug(sticker_url)
+        sticker = alert.sticker and sticker_url is not None
+        # The parts of the alert are sent to the chat at the same time, and
+        # the alert is done once all of them are
+        group = object()
+        parts = int(sticker) + (1 if alert.venue else 1 + int(alert.map))
+        callback = self.track_send(parts)
         # Send Sticker
-        if alert.sticker and sticker_url is not None:
-            self.send_sticker(bot_token, chat_id, sticker_url, max_attempts)
+        if sticker:
+            self.send_sticker(bot_token, chat_id, sticker_url, max_attempts,
+                              deadline=deadline, group=group,
+                              callback=callback)
 
         # Send Venue
         if alert.venue:
-            self.send_venue(
-                bot_token, chat_id, lat, lng, message, max_attempts)
+            self.send_venue(bot_token, chat_id, lat, lng, message,
+                            max_attempts, deadline=deadline, group=group,
+                            callback=callback)
             return  # Don't send message or map
 
         # Send Message
-        self.send_message(bot_token, chat_id, replace(message, dts),
-                          web_preview=alert.web_preview)
+        self.send_message(bot_token, chat_id, message,
+                          max_attempts, web_preview=alert.web_preview,
+                          deadline=deadline, group=group, callback=callback)
 
         # Send Map
         if alert.map:
-            self.send_location(bot_token, chat_id, lat, lng, max_attempts)
+            self.send_location(bot_token, chat_id, lat, lng, max_attempts,
+                               deadline=deadline, group=group,
+                               callback=callback)
 
     # Trigger an alert based on Pokemon info
     def pokemon_alert(self, mon_dts):
@@ -224,78 +254,52 @@ class TelegramAlarm(Alarm):
         self.generic_alert(self._raid_alert, raid_dts)
 
     def send_sticker(self, token, chat_id, sticker_url,
-                     max_attempts=3, notify=False):
-        args = {
-            'url': "https://api.telegram.org/bot{}/sendSticker".format(token),
-            'payload': {
-                'chat_id': chat_id,
-                'sticker': sticker_url,
-                'disable_notification': not notify
-            }
-        }
-        try_sending(
-            log, self.connect, "Telegram (STKR)", self.send_webhook, args,
-            max_attempts)
+                     max_attempts=3, notify=False, deadline=None,
+                     group=None, callback=None):
+        self.send_webhook(token, 'sendSticker', {
+            'chat_id': chat_id,
+            'sticker': sticker_url,
+            'disable_notification': not notify
+        }, max_attempts, deadline, group, callback)
 
     def send_message(self, token, chat_id, message,
-                     max_attempts=3, notify=True, web_preview=False):
-        args = {
-            'url': "https://api.telegram.org/bot{}/sendMessage".format(token),
-            'payload': {
-                'chat_id': chat_id,
-                'text': message,
-                'parse_mode': 'Markdown',
-                'disable_web_page_preview': not web_preview,
-                'disable_notification': not notify
-            }
-        }
-        try_sending(
-            log, self.connect, "Telegram (MSG)", self.send_webhook, args,
-            max_attempts)
+                     max_attempts=3, notify=True, web_preview=False,
+                     deadline=None, group=None, callback=None):
+        self.send_webhook(token, 'sendMessage', {
+            'chat_id': chat_id,
+            'text': message,
+            'parse_mode': 'Markdown',
+            'disable_web_page_preview': not web_preview,
+            'disable_notification': not notify
+        }, max_attempts, deadline, group, callback)
 
     def send_location(self, token, chat_id, lat, lng,
-                      max_attempts=3, notify=False):
-        args = {
-            'url': "https://api.telegram.org/bot{}/sendLocation".format(token),
-            'payload': {
-                'chat_id': chat_id,
-                'latitude': lat,
-                'longitude': lng,
-                'disable_notification': not notify
-            }
-        }
-        try_sending(
-            log, self.connect, "Telegram (LOC)", self.send_webhook, args,
-            max_attempts)
-
-    def send_venue(self, token, chat_id, lat, lng, message, max_attempts):
+                      max_attempts=3, notify=False, deadline=None,
+                      group=None, callback=None):
+        self.send_webhook(token, 'sendLocation', {
+            'chat_id': chat_id,
+            'latitude': lat,
+            'longitude': lng,
+            'disable_notification': not notify
+        }, max_attempts, deadline, group, callback)
+
+    def send_venue(self, token, chat_id, lat, lng, message, max_attempts,
+                   deadline=None, group=None, callback=None):
         msg = message.split('\n', 1)
-        args = {
-            'url': "https://api.telegram.org/bot{}/sendVenue".format(
-                token),
-            'payload': {
-                'chat_id': chat_id,
-                'latitude': lat,
-                'title': msg[0],
-                'address': msg[1] if len(msg) > 1 else '',
-                'longitude': lng,
-                'disable_notification': False
-            }
-        }
-        try_sending(
-            log, self.connect, "Telegram (VEN)", self.send_webhook, args,
-            max_attempts)
-
-    # Send a payload to the webhook url
-    def send_webhook(self, url, payload):
-        log.debug(url)
-        log.debug(payload)
-        resp = requests.post(url, json=payload, timeout=30)
-        if resp.ok is True:
-            log.debug("Notification successful (returned {})".format(
-                resp.status_code))
-        else:
-            log.debug("Telegram response was {}".format(resp.content))
-            raise requests.exceptions.RequestException(
-                "Response received {}, webhook not accepted.".format(
-                    resp.status_code))
+        self.send_webhook(token, 'sendVenue', {
+            'chat_id': chat_id,
+            'latitude': lat,
+            'title': msg[0],
+            'address': msg[1] if len(msg) > 1 else '',
+            'longitude': lng,
+            'disable_notification': False
+        }, max_attempts, deadline, group, callback)
+
+    # Queue a call to the Bot API, to be sent in order with the rest of the
+    # messages for the same chat (or at the same time as the rest of its
+    # group). The callback is called with whether it was sent.
+    def send_webhook(self, token, method, payload, max_attempts,
+                     deadline=None, group=None, callback=None):
+        get_sender().send(token, payload['chat_id'], method, payload,
+                          self._timeout, max_attempts, deadline, group,
+                          callback)
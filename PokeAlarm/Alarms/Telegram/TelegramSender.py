@@ -0,0 +1,189 @@
+# Standard Library Imports
+from collections import deque, namedtuple
+import logging
+import time
+# 3rd Party Imports
+import gevent
+import requests
+# Local Imports
+from PokeAlarm.Alarms.Retry import CircuitBreaker, get_backoff
+from PokeAlarm.Utilities.GenUtils import TokenBucket
+from PokeAlarm.Utilities.HttpUtils import get_session
+
+log = logging.getLogger('Telegram')
+
+Message = namedtuple('Message', ['method', 'payload', 'timeout',
+                                 'max_attempts', 'deadline', 'group',
+                                 'callback'])
+
+
+class TelegramSender(object):
+    """ Sends Telegram messages without going over their rate limits.
+
+    Telegram limits how many messages a bot can send each second, both in
+    total and to a single chat. Each bot and each chat gets a token bucket
+    to stay within these limits. Messages are queued in a lane for each
+    chat, and each lane sends its messages in order from its own greenlet,
+    so chats are sent to at the same time. Messages given the same group
+    (such as the sticker, message and map of one alert) are independent,
+    so a lane sends them at the same time, and waits for all of them before
+    sending the next message. A 429 response pauses the chat for the
+    `retry_after` given by Telegram, and the message is then sent again.
+    Failed messages are tried again after a backoff, and a chat that keeps
+    failing is paused by its circuit breaker. Messages that expire while
+    they wait are dropped. Once a message is sent or given up on, its
+    callback is called with whether it was sent.
+    """
+
+    # Maximum messages per second a bot can send
+    BOT_RATE = 30
+    # Maximum messages per second to a single chat, and how many can be
+    # sent at once (such as the sticker, message and map of one alert)
+    CHAT_RATE = 1
+    CHAT_BURST = 3
+
+    def __init__(self, session=None):
+        self.__session = session
+        self.__bots = {}  # Token bucket for each bot
+        self.__lanes = {}  # Lane for each (bot, chat)
+
+    def send(self, token, chat_id, method, payload, timeout=30,
+             max_attempts=3, deadline=None, group=None, callback=None):
+        """ Queues a call to the Bot API method in the chat's lane.
+
+        Messages queued one after another with the same group are sent to
+        the chat at the same time.
+        """
+        key = (token, chat_id)
+        lane = self.__lanes.get(key)
+        if lane is None:
+            if token not in self.__bots:
+                self.__bots[token] = TokenBucket(self.BOT_RATE)
+            lane = self.__lanes[key] = _Lane(
+                token, self.__bots[token],
+                TokenBucket(self.CHAT_RATE, self.CHAT_BURST))
+        lane.pending.append(Message(
+            method, payload, timeout, max_attempts, deadline, group,
+            callback))
+        if lane.greenlet is None or lane.greenlet.ready():
+            lane.greenlet = gevent.spawn(self._run, lane)
+
+    def get_queue_size(self):
+        """ Returns the number of messages waiting to be sent. """
+        return sum(len(lane.pending) + lane.sending
+                   for lane in self.__lanes.values())
+
+    def join(self, timeout=None):
+        """ Waits for the queued messages to be sent. """
+        greenlets = [lane.greenlet for lane in self.__lanes.values()
+                     if lane.greenlet is not None]
+        gevent.joinall(greenlets, timeout=timeout)
+
+    def _run(self, lane):
+        while lane.pending:
+            parts = [lane.pending.popleft()]
+            group = parts[0].group
+            while group is not None and lane.pending \
+                    and lane.pending[0].group is group:
+                parts.append(lane.pending.popleft())
+            lane.sending = len(parts)
+            if len(parts) == 1:
+                self._deliver(lane, parts[0])
+            else:  # Parts of the same alert don't need to wait on each other
+                gevent.joinall([gevent.spawn(self._deliver, lane, msg)
+                                for msg in parts])
+            lane.sending = 0
+
+    def _deliver(self, lane, msg):
+        """ Sends a message, and calls its callback with the result. """
+        ok = self._try_sending(lane, msg)
+        if msg.callback is not None:
+            try:
+                msg.callback(ok)
+            except Exception as e:
+                log.error("Encountered error in notification callback "
+                          "({}: {})".format(type(e).__name__, e))
+
+    def _try_sending(self, lane, msg):
+        """ Sends a message, trying again until it is sent or given up.
+        Returns whether it was sent. """
+        attempts = 0
+        while True:
+            if msg.deadline is not None and time.time() > msg.deadline:
+                log.info("Notification expired before it could be sent. "
+                         "Giving up.")
+                return False
+            gevent.sleep(lane.breaker.get_delay())
+            lane.breaker.allow()
+            lane.chat.acquire()
+            lane.bot.acquire()
+            try:
+                resp = self._post(lane.token, msg)
+                if resp.status_code >= 500:  # Worth trying again
+                    raise requests.exceptions.RequestException(
+                        "Response received {}, webhook not accepted.".format(
+                            resp.status_code))
+            except Exception as e:
+                attempts += 1
+                lane.breaker.failure()
+                log.error("Encountered error while sending notification"
+                          + " ({}: {})".format(type(e).__name__, e))
+                if attempts < msg.max_attempts:
+                    log.info("Telegram is having connection issues. "
+                             "{} attempt of {}.".format(
+                                 attempts, msg.max_attempts))
+                    gevent.sleep(get_backoff(attempts))
+                    continue
+                log.error("Could not send notification... Giving up.")
+                return False
+            lane.breaker.success()
+            if resp.status_code == 429:
+                retry_after = self.get_retry_after(resp)
+                log.warning("Telegram rate limit reached, pausing chat "
+                            "for {}s.".format(retry_after))
+                lane.chat.pause(retry_after)
+                continue  # Try again once the chat is unpaused
+            if resp.ok is True:
+                log.debug("Notification successful (returned {})".format(
+                    resp.status_code))
+                return True
+            log.debug("Telegram response was {}".format(resp.content))
+            log.error("Response received {}, webhook not accepted. "
+                      "Giving up.".format(resp.status_code))
+            return False
+
+    def _post(self, token, msg):
+        url = "https://api.telegram.org/bot{}/{}".format(token, msg.method)
+        log.debug(url)
+        log.debug(msg.payload)
+        session = self.__session or get_session()
+        return session.post(url, json=msg.payload, timeout=msg.timeout)
+
+    @staticmethod
+    def get_retry_after(resp):
+        """ Returns the seconds to wait after a 429 response. """
+        try:
+            params = resp.json().get('parameters') or {}
+        except ValueError:
+            params = {}
+        return float(params.get('retry_after', 1))
+
+
+class _Lane(object):
+    """ Messages waiting to be sent to a chat. """
+
+    def __init__(self, token, bot, chat):
+        self.token = token
+        self.bot = bot  # Token bucket shared by the bot's chats
+        self.chat = chat  # Token bucket for this chat
+        self.breaker = CircuitBreaker()
+        self.pending = deque()
+        self.sending = 0  # Messages taken from pending, but not yet sent
+        self.greenlet = None
+
+
+def get_sender():
+    """ Returns the sender shared by all Telegram alarms. """
+    if not hasattr(get_sender, 'sender'):
+        get_sender.sender = TelegramSender()
+    return get_sender.sender
@@ -0,0 +1,40 @@
+# Standard Library Imports
+import re
+# 3rd Party Imports
+# Local Imports
+
+
+class Template(object):
+    """ A message with <key> placeholders, compiled for quick substitution.
+
+    The string is split once into literal text and placeholders, so that
+    filling it in only looks up the keys it actually uses. Keys that are
+    missing from the DTS are left in the message untouched.
+    """
+
+    _placeholder = re.compile(r'<([^<>]+)>')
+
+    def __init__(self, string):
+        if isinstance(string, unicode):
+            string = string.encode('utf-8')
+        # Odd indices are placeholder keys, even indices are literals
+        self.__parts = self._placeholder.split(str(string))
+        self.__string = string
+        self.keys = frozenset(self.__parts[1::2])
+
+    def render(self, dts):
+        """ Returns the utf-8 encoded message with the DTS filled in. """
+        parts = list(self.__parts)
+        for i in range(1, len(parts), 2):
+            key = parts[i]
+            if key in dts:
+                parts[i] = str(dts[key])
+            else:
+                parts[i] = "<{}>".format(key)
+        return "".join(parts)
+
+    def __str__(self):
+        return self.__string
+
+    def __repr__(self):
+        return "Template({!r})".format(self.__string)
@@ -12,6 +12,7 @@ from PokeAlarm.Utils import parse_boolean, require_and_remove_key, \
 log = logging.getLogger('Twilio')
 try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 
 
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! ATTENTION! !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -23,6 +24,8 @@ replace = Alarm.replace
 
 class TwilioAlarm(Alarm):
 
+    sends_in_background = True  # Retries are queued on the retry queue
+
     _defaults = {
         'monsters': {
             'message': "A wild <mon_name> has appeared! <gmaps> "
@@ -75,6 +78,15 @@ class TwilioAlarm(Alarm):
         self.__raid = self.set_alert(
             settings.pop('raids', {}), self._defaults['raids'])
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__pokemon,
+            'stops': self.__pokestop,
+            'gyms': self.__gym,
+            'eggs': self.__egg,
+            'raids': self.__raid
+        })
+
         # Warn user about leftover parameters
         reject_leftover_parameters(settings, "'Alarm level in Twilio alarm.")
 
@@ -90,8 +102,13 @@ class TwilioAlarm(Alarm):
             self.send_sms(
                 to_num=self.__to_number,
                 from_num=self.__from_number,
-                body="PokeAlarm activated!"
+                body="PokeAlarm activated!",
+                callback=self._startup_sent
             )
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup message sent!")
 
     # Set the appropriate settings for each alert
@@ -99,17 +116,22 @@ class TwilioAlarm(Alarm):
         alert = {
             'to_number': settings.pop('to_number', self.__to_number),
             'from_number': settings.pop('from_number', self.__from_number),
-            'message': settings.pop('message', default['message'])
+            'message': template(settings.pop('message', default['message']))
         }
         reject_leftover_parameters(settings, "'Alert level in Twilio alarm.")
         return alert
 
     # Send Pokemon Info
     def send_alert(self, alert, info):
+        to_num = alert['to_number']
+        if not isinstance(to_num, list):
+            to_num = [to_num]
         self.send_sms(
-            to_num=alert['to_number'],
+            to_num=to_num,
             from_num=alert['from_number'],
-            body=replace(alert['message'], info)
+            body=replace(alert['message'], info),
+            deadline=self.get_deadline(info),
+            callback=self.track_send(len(to_num))
         )
 
     # Trigger an alert based on Pokemon info
@@ -133,7 +155,8 @@ class TwilioAlarm(Alarm):
         self.send_alert(self.__raid, raid_info)
 
     # Send a SMS message
-    def send_sms(self, to_num, from_num, body):
+    def send_sms(self, to_num, from_num, body, deadline=None,
+                 callback=None):
         if not isinstance(to_num, list):
             to_num = [to_num]
         for num in to_num:
@@ -144,4 +167,5 @@ class TwilioAlarm(Alarm):
             }
             try_sending(
                 log, self.connect, "Twilio",
-                self.__client.messages.create, args)
+                self.__client.messages.create, args,
+                deadline=deadline, destination=num, callback=callback)
@@ -14,6 +14,7 @@ from PokeAlarm.Utils import parse_boolean, get_time_as_str, \
 log = logging.getLogger('Twitter')
 try_sending = Alarm.try_sending
 replace = Alarm.replace
+template = Alarm.create_template
 url_regex = re.compile(
     "(?:http(s)?:\/\/)?[\w.-]+(?:\.[\w\.-]+)+[\w\-\._~:/?#[\]"
     "@!\$&'\(\)\*\+,;=.]+", re.I)
@@ -28,6 +29,8 @@ url_regex = re.compile(
 
 class TwitterAlarm(Alarm):
 
+    sends_in_background = True  # Retries are queued on the retry queue
+
     _defaults = {
         'monsters': {
             'status': "A wild <mon_name> has appeared! "
@@ -80,6 +83,15 @@ class TwitterAlarm(Alarm):
         self.__raid = self.create_alert_settings(
             settings.pop('raids', {}), self._defaults['raids'])
 
+        # Keep track of the DTS each alert uses
+        self.set_dts_keys({
+            'monsters': self.__pokemon,
+            'stops': self.__pokestop,
+            'gyms': self.__gym,
+            'eggs': self.__egg,
+            'raids': self.__raid
+        })
+
         # Warn user about leftover parameters
         reject_leftover_parameters(settings, "'Alarm level in Twitter alarm.")
 
@@ -98,13 +110,18 @@ class TwitterAlarm(Alarm):
             args = {
                 "status": "{}- PokeAlarm activated!" .format(timestamps[2])
             }
-            try_sending(log, self.connect, "Twitter", self.send_tweet, args)
+            try_sending(log, self.connect, "Twitter", self.send_tweet, args,
+                        callback=self._startup_sent)
+
+    @staticmethod
+    def _startup_sent(ok):
+        if ok:
             log.info("Startup tweet sent!")
 
     # Set the appropriate settings for each alert
     def create_alert_settings(self, settings, default):
         alert = {
-            'status': settings.pop('status', default['status'])
+            'status': template(settings.pop('status', default['status']))
         }
         reject_leftover_parameters(settings, "'Alert level in Twitter alarm.")
         return alert
@@ -130,7 +147,9 @@ class TwitterAlarm(Alarm):
         args = {
             "status": self.shorten(replace(alert['status'], info))
         }
-        try_sending(log, self.connect, "Twitter", self.send_tweet, args)
+        try_sending(log, self.connect, "Twitter", self.send_tweet, args,
+                    deadline=self.get_deadline(info),
+                    callback=self.track_send())
 
     # Trigger an alert based on Pokemon info
     def pokemon_alert(self, pokemon_info):
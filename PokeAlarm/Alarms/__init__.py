@@ -1,5 +1,7 @@
 from PokeAlarm.Utils import require_and_remove_key
+from Template import Template  # noqa F401
 from Alarm import Alarm  # noqa F401
+from Dispatcher import Dispatcher  # noqa F401
 
 
 def alarm_factory(settings, max_attempts, api_key):
@@ -29,6 +29,8 @@ class Cache(object):
         self._gym_name = {}
         self._gym_desc = {}
         self._gym_image = {}
+        self._cell_geofences = {}
+        self._geofence_hash = None
 
     def monster_expiration(self, mon_id, expiration=None):
         """ Update and return the datetime that a monster expires."""
@@ -86,6 +88,20 @@ class Cache(object):
         """ Update the current weather in an S2 cell. """
         self._weather_hist[weather_cell_id] = condition
 
+    def set_geofence_hash(self, geofence_hash):
+        """ Forget the geofences of each cell if the geofences changed. """
+        if geofence_hash != self._geofence_hash:
+            self._cell_geofences = {}
+            self._geofence_hash = geofence_hash
+
+    def get_cell_geofences(self, weather_cell_id):
+        """ Returns the geofences overlapping the S2 cell, if known. """
+        return self._cell_geofences.get(weather_cell_id)
+
+    def update_cell_geofences(self, weather_cell_id, geofence_list):
+        """ Update the geofences overlapping an S2 cell. """
+        self._cell_geofences[weather_cell_id] = tuple(geofence_list)
+
     def clean_and_save(self):
         """ Cleans the cache and saves the contents if capable. """
         self._clean_hist()
@@ -42,6 +42,8 @@ class FileCache(Cache):
                 self._gym_name = data.get('gym_name', {})
                 self._gym_desc = data.get('gym_desc', {})
                 self._gym_image = data.get('gym_image', {})
+                self._cell_geofences = data.get('cell_geofences', {})
+                self._geofence_hash = data.get('geofence_hash')
 
                 log.debug("Cache loaded successfully.")
         except Exception as e:
@@ -61,7 +63,9 @@ class FileCache(Cache):
             'gym_team': self._gym_team,
             'gym_name': self._gym_name,
             'gym_desc': self._gym_desc,
-            'gym_image': self._gym_image
+            'gym_image': self._gym_image,
+            'cell_geofences': self._cell_geofences,
+            'geofence_hash': self._geofence_hash
         }
         try:
             # Write to temporary file and then rename
@@ -1,23 +1,177 @@
 # Standard Library Imports
-import logging
 import time
 # 3rd Party Imports
 # Local Imports
+from PokeAlarm.Alarms.Template import Template
+
+
+class LazyDTS(dict):
+    """ A dict of DTS where values are only generated when first used.
+
+    Alarm templates usually reference only a handful of the available DTS,
+    so the expensive ones (formatting, locale lookups, links) are given as
+    functions and only called when their key is looked up. Iterating over
+    the dict only covers values that have already been generated - call
+    `load_all` first to generate the rest.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyDTS, self).__init__(*args, **kwargs)
+        self._loaders = {}
+
+    def set_lazy(self, loaders):
+        """ Sets each key to be generated by calling its function. """
+        for key, loader in loaders.iteritems():
+            dict.pop(self, key, None)
+            self._loaders[key] = loader
+
+    def load_all(self):
+        """ Generates all remaining values, and returns this dict. """
+        for key in self._loaders.keys():
+            self.__missing__(key)
+        return self
+
+    def __missing__(self, key):
+        loader = self._loaders.pop(key, None)
+        if loader is None:
+            raise KeyError(key)
+        value = loader()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._loaders.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._loaders
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).iteritems():
+            self[key] = value
+
+    def copy(self):
+        dts = LazyDTS(self)
+        dts._loaders = self._loaders.copy()
+        return dts
+
+
+class DTSOverlay(object):
+    """ DTS for a single alert, layered over the DTS shared by its event.
+
+    The values that differ between alerts for the same event (such as the
+    geofence or channel) are kept separately, so the shared DTS only need
+    to be generated once. Custom DTS are only used for keys that aren't
+    provided by the event, and can contain DTS of the event themselves -
+    these are filled in the first time each custom DTS is used.
+    """
+
+    def __init__(self, dts, overlay, custom_dts, deadline=None):
+        self._dts = dts
+        self._overlay = overlay
+        self._custom_dts = custom_dts
+        self._rendered = {}  # Custom DTS with the event's DTS filled in
+        self.deadline = deadline  # When the alert is no longer useful
+
+    def __getitem__(self, key):
+        if key in self._overlay:
+            return self._overlay[key]
+        if key in self._dts:
+            return self._dts[key]
+        if key not in self._rendered:
+            # Only the event's DTS are filled in, so custom DTS can't
+            # expand each other (or themselves) endlessly
+            self._rendered[key] = Template(self._custom_dts[key]).render(
+                DTSOverlay(self._dts, self._overlay, {}))
+        return self._rendered[key]
+
+    def __contains__(self, key):
+        return key in self._overlay or key in self._dts \
+            or key in self._custom_dts
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def cached(func, *args):
+    """ Returns a function which calls func(*args) once and reuses it. """
+    result = []
+
+    def get():
+        if not result:
+            result.append(func(*args))
+        return result[0]
+    return get
+
+
+class lazy(object):
+    """ Decorator for an event attribute which is only computed when first
+    used, and then kept in the event's `_<name>` slot.
+
+    Most events are rejected by their first filter check, so attributes
+    that take lookups to work out shouldn't be computed when the event is
+    created.
+    """
+
+    def __init__(self, func):
+        self.__func = func
+        self.__slot = '_' + func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, event, owner):
+        if event is None:
+            return self
+        try:
+            return getattr(event, self.__slot)
+        except AttributeError:  # Not computed yet
+            value = self.__func(event)
+            setattr(event, self.__slot, value)
+            return value
 
 
 class BaseEvent(object):
-    """ Abstract class representing details related to different events. """
+    """ Abstract class representing details related to different events.
+
+    Events are kept in slots rather than a __dict__, as there can be many
+    thousands of them waiting in the queues at once. Each kind of event
+    declares the slots for the attributes it sets.
+    """
+
+    __slots__ = ('_mgr', 'id', 'deadline')
 
     def __init__(self, kind):
         """ Initializes base parameters for an event. """
-        self._log = logging.getLogger(kind)
-
         # Owner of event (set when passed to manager)
         self._mgr = None
 
         # Create an id for this event to be recognized as
         self.id = time.time()
 
+        # Time (in seconds since the epoch) after which the event isn't
+        # worth alerting on anymore, or None if it doesn't expire
+        self.deadline = None
+
+    def __getstate__(self):
+        """ Returns the picklable state of this event. """
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):  # Lazy slots may not be set yet
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        """ Restores the event from a pickled state. """
+        for name, value in state.iteritems():
+            setattr(self, name, value)
+
+    def is_expired(self):
+        """ Returns true if the event's deadline has passed. """
+        return self.deadline is not None and time.time() > self.deadline
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         raise NotImplementedError("This is an abstract method.")
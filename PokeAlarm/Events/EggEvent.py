@@ -3,14 +3,22 @@ from datetime import datetime
 # 3rd Party Imports
 # Local Imports
 from PokeAlarm.Utils import get_time_as_str, get_seconds_remaining, \
-    get_gmaps_link, get_applemaps_link, get_dist_as_str, get_weather_emoji
+    get_gmaps_link, get_applemaps_link, get_dist_as_str, get_weather_emoji, \
+    get_timestamp
 from . import BaseEvent
+from BaseEvent import LazyDTS, cached
 from PokeAlarm import Unknown
 
 
 class EggEvent(BaseEvent):
     """ Event representing the change occurred in a Gym. """
 
+    __slots__ = (
+        'gym_id', 'hatch_time', 'time_left', 'raid_end', 'lat', 'lng',
+        'distance', 'direction', 'weather_id', 'egg_lvl', 'gym_name',
+        'gym_description', 'gym_image', 'sponsor_id', 'park',
+        'current_team_id', 'name', 'geofence', 'geofence_list', 'channel_id')
+
     def __init__(self, data):
         """ Creates a new Stop Event based on the given dict. """
         super(EggEvent, self).__init__('egg')
@@ -23,6 +31,7 @@ class EggEvent(BaseEvent):
         self.hatch_time = datetime.utcfromtimestamp(
             data.get('start') or data.get('raid_begin'))  # RM or Monocle
         self.time_left = get_seconds_remaining(self.hatch_time)
+        self.deadline = get_timestamp(self.hatch_time)
         self.raid_end = datetime.utcfromtimestamp(
             data.get('end') or data.get('raid_end'))  # RM or Monocle
 
@@ -56,45 +65,26 @@ class EggEvent(BaseEvent):
         self.name = self.gym_id
         self.geofence = Unknown.REGULAR
         self.geofence_list = []
-        self.custom_dts = {}
         self.channel_id = Unknown.REGULAR
 
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
-        hatch_time = get_time_as_str(self.hatch_time, timezone)
-        raid_end_time = get_time_as_str(self.raid_end, timezone)
-        weather_name = locale.get_weather_name(self.weather_id)
-        dts = self.custom_dts.copy()
+        hatch_time = cached(get_time_as_str, self.hatch_time, timezone)
+        raid_end_time = cached(get_time_as_str, self.raid_end, timezone)
+        weather_name = cached(locale.get_weather_name, self.weather_id)
+        dts = LazyDTS()
         dts.update({
             # Identification
             'gym_id': self.gym_id,
 
-            # Time Remaining
-            'hatch_time_left': hatch_time[0],
-            '12h_hatch_time': hatch_time[1],
-            '24h_hatch_time': hatch_time[2],
-            'raid_time_left': raid_end_time[0],
-            '12h_raid_end': raid_end_time[1],
-            '24h_raid_end': raid_end_time[2],
-
             # Location
             'lat': self.lat,
             'lng': self.lng,
-            'lat_5': "{:.5f}".format(self.lat),
-            'lng_5': "{:.5f}".format(self.lng),
-            'distance': (
-                get_dist_as_str(self.distance, units)
-                if Unknown.is_not(self.distance) else Unknown.SMALL),
             'direction': self.direction,
-            'gmaps': get_gmaps_link(self.lat, self.lng),
-            'applemaps': get_applemaps_link(self.lat, self.lng),
             'geofence': self.geofence,
             'geofence_list': self.geofence_list,
             'channel_id': self.channel_id,
             'weather_id': self.weather_id,
-            'weather': weather_name,
-            'weather_or_empty': Unknown.or_empty(weather_name),
-            'weather_emoji': get_weather_emoji(self.weather_id),
 
             # Egg info
             'egg_lvl': self.egg_lvl,
@@ -104,14 +94,42 @@ class EggEvent(BaseEvent):
             'gym_description': self.gym_description,
             'gym_image': self.gym_image,
             'sponsor_id': self.sponsor_id,
-            'gym_sponsor_phrase': ("\nSponsored Gym" if Unknown.or_empty(self.sponsor_id) else ""),
-            'sponsored':
-                self.sponsor_id > 0
-                if Unknown.is_not(self.sponsor_id) else Unknown.REGULAR,
             'park': self.park,
-            'gym_park_phrase': ("\n***Possible EX Raid Location (" + self.park + ")***" if Unknown.or_empty(self.park) else ""),
-            'team_id': self.current_team_id,
-            'team_name': locale.get_team_name(self.current_team_id),
-            'team_leader': locale.get_leader_name(self.current_team_id)
+            'team_id': self.current_team_id
+        })
+        dts.set_lazy({
+            # Time Remaining
+            'hatch_time_left': lambda: hatch_time()[0],
+            '12h_hatch_time': lambda: hatch_time()[1],
+            '24h_hatch_time': lambda: hatch_time()[2],
+            'raid_time_left': lambda: raid_end_time()[0],
+            '12h_raid_end': lambda: raid_end_time()[1],
+            '24h_raid_end': lambda: raid_end_time()[2],
+
+            # Location
+            'lat_5': lambda: "{:.5f}".format(self.lat),
+            'lng_5': lambda: "{:.5f}".format(self.lng),
+            'distance': lambda: (
+                get_dist_as_str(self.distance, units)
+                if Unknown.is_not(self.distance) else Unknown.SMALL),
+            'gmaps': lambda: get_gmaps_link(self.lat, self.lng),
+            'applemaps': lambda: get_applemaps_link(self.lat, self.lng),
+            'weather': weather_name,
+            'weather_or_empty': lambda: Unknown.or_empty(weather_name()),
+            'weather_emoji': lambda: get_weather_emoji(self.weather_id),
+
+            # Gym Details
+            'gym_sponsor_phrase': lambda: (
+                "\nSponsored Gym" if Unknown.or_empty(self.sponsor_id)
+                else ""),
+            'sponsored': lambda: (
+                self.sponsor_id > 0
+                if Unknown.is_not(self.sponsor_id) else Unknown.REGULAR),
+            'gym_park_phrase': lambda: (
+                "\n***Possible EX Raid Location (" + self.park + ")***"
+                if Unknown.or_empty(self.park) else ""),
+            'team_name': lambda: locale.get_team_name(self.current_team_id),
+            'team_leader':
+                lambda: locale.get_leader_name(self.current_team_id)
         })
         return dts
@@ -3,12 +3,18 @@
 # Local Imports
 from PokeAlarm.Utils import get_gmaps_link, get_applemaps_link, get_dist_as_str
 from . import BaseEvent
+from BaseEvent import LazyDTS
 from PokeAlarm import Unknown
 
 
 class GymEvent(BaseEvent):
     """ Event representing the change occurred in a Gym. """
 
+    __slots__ = (
+        'gym_id', 'lat', 'lng', 'distance', 'direction', 'old_team_id',
+        'new_team_id', 'gym_name', 'gym_description', 'gym_image',
+        'slots_available', 'guard_count', 'name', 'geofence')
+
     def __init__(self, data):
         """ Creates a new Gym Event based on the given dict. """
         super(GymEvent, self).__init__('gym')
@@ -45,11 +51,10 @@ class GymEvent(BaseEvent):
 
         self.name = self.gym_id
         self.geofence = Unknown.REGULAR
-        self.custom_dts = {}
 
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
-        dts = self.custom_dts.copy()
+        dts = LazyDTS()
         dts.update({
             # Identification
             'gym_id': self.gym_id,
@@ -57,23 +62,12 @@ class GymEvent(BaseEvent):
             # Location
             'lat': self.lat,
             'lng': self.lng,
-            'lat_5': "{:.5f}".format(self.lat),
-            'lng_5': "{:.5f}".format(self.lng),
-            'distance': (
-                get_dist_as_str(self.distance, units)
-                if Unknown.is_not(self.distance) else Unknown.SMALL),
             'direction': self.direction,
-            'gmaps': get_gmaps_link(self.lat, self.lng),
-            'applemaps': get_applemaps_link(self.lat, self.lng),
             'geofence': self.geofence,
 
             # Team Info
-            'old_team': locale.get_team_name(self.old_team_id),
             'old_team_id': self.old_team_id,
-            'old_team_leader': locale.get_leader_name(self.old_team_id),
-            'new_team': locale.get_team_name(self.new_team_id),
             'new_team_id': self.new_team_id,
-            'new_team_leader': locale.get_leader_name(self.new_team_id),
 
             # Details
             'gym_name': self.gym_name,
@@ -84,4 +78,22 @@ class GymEvent(BaseEvent):
             'slots_available': self.slots_available,
             'guard_count': self.guard_count,
         })
+        dts.set_lazy({
+            # Location
+            'lat_5': lambda: "{:.5f}".format(self.lat),
+            'lng_5': lambda: "{:.5f}".format(self.lng),
+            'distance': lambda: (
+                get_dist_as_str(self.distance, units)
+                if Unknown.is_not(self.distance) else Unknown.SMALL),
+            'gmaps': lambda: get_gmaps_link(self.lat, self.lng),
+            'applemaps': lambda: get_applemaps_link(self.lat, self.lng),
+
+            # Team Info
+            'old_team': lambda: locale.get_team_name(self.old_team_id),
+            'old_team_leader':
+                lambda: locale.get_leader_name(self.old_team_id),
+            'new_team': lambda: locale.get_team_name(self.new_team_id),
+            'new_team_leader':
+                lambda: locale.get_leader_name(self.new_team_id)
+        })
         return dts
@@ -4,13 +4,18 @@ from datetime import datetime
 # Local Imports
 from PokeAlarm import Unknown
 from . import BaseEvent
+from BaseEvent import LazyDTS, cached
 from PokeAlarm.Utils import get_gmaps_link, get_applemaps_link, \
-    get_time_as_str, get_seconds_remaining, get_dist_as_str
+    get_time_as_str, get_seconds_remaining, get_dist_as_str, get_timestamp
 
 
 class StopEvent(BaseEvent):
     """ Event representing the discovery of a PokeStop. """
 
+    __slots__ = (
+        'stop_id', 'expiration', 'time_left', 'lat', 'lng', 'distance',
+        'direction', 'name', 'geofence')
+
     def __init__(self, data):
         """ Creates a new Stop Event based on the given dict. """
         super(StopEvent, self).__init__('stop')
@@ -24,6 +29,7 @@ class StopEvent(BaseEvent):
         if self.expiration is not None:
             self.expiration = datetime.utcfromtimestamp(self.expiration)
             self.time_left = get_seconds_remaining(self.expiration)
+            self.deadline = get_timestamp(self.expiration)
 
         # Location
         self.lat = float(data['latitude'])
@@ -36,32 +42,34 @@ class StopEvent(BaseEvent):
         # Used to reject
         self.name = self.stop_id
         self.geofence = Unknown.REGULAR
-        self.custom_dts = {}
 
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
-        time = get_time_as_str(self.expiration, timezone)
-        dts = self.custom_dts.copy()
+        time = cached(get_time_as_str, self.expiration, timezone)
+        dts = LazyDTS()
         dts.update({
             # Identification
             'stop_id': self.stop_id,
 
-            # Time left
-            'time_left': time[0],
-            '12h_time': time[1],
-            '24h_time': time[2],
-
             # Location
             'lat': self.lat,
             'lng': self.lng,
-            'lat_5': "{:.5f}".format(self.lat),
-            'lng_5': "{:.5f}".format(self.lat),
-            'distance': (
-                get_dist_as_str(self.distance, units)
-                if Unknown.is_not(self.distance) else Unknown.SMALL),
             'direction': self.direction,
-            'gmaps': get_gmaps_link(self.lat, self.lng),
-            'applemaps': get_applemaps_link(self.lat, self.lng),
             'geofence': self.geofence
         })
+        dts.set_lazy({
+            # Time left
+            'time_left': lambda: time()[0],
+            '12h_time': lambda: time()[1],
+            '24h_time': lambda: time()[2],
+
+            # Location
+            'lat_5': lambda: "{:.5f}".format(self.lat),
+            'lng_5': lambda: "{:.5f}".format(self.lat),
+            'distance': lambda: (
+                get_dist_as_str(self.distance, units)
+                if Unknown.is_not(self.distance) else Unknown.SMALL),
+            'gmaps': lambda: get_gmaps_link(self.lat, self.lng),
+            'applemaps': lambda: get_applemaps_link(self.lat, self.lng)
+        })
         return dts
@@ -4,12 +4,18 @@ from datetime import datetime
 # Local Imports
 from PokeAlarm import Unknown
 from . import BaseEvent
+from BaseEvent import LazyDTS, cached
 from PokeAlarm.Utils import get_time_as_str, get_weather_emoji
 
 
 class WeatherEvent(BaseEvent):
     """ Event representing the change occurred in Weather """
 
+    __slots__ = (
+        'alert_type', 'weather_cell_id', 'time_changed', 'coords', 'condition',
+        'alert_severity', 'warn', 'day', 'name', 'geofence', 'geofence_list',
+        'channel_id')
+
     def __init__(self, data):
         """ Creates a new Weather Event based on the given dict. """
         super(WeatherEvent, self).__init__('weather')
@@ -39,22 +45,17 @@ class WeatherEvent(BaseEvent):
         self.name = self.weather_cell_id
         self.geofence = Unknown.REGULAR
         self.geofence_list = []
-        self.custom_dts = {}
         self.channel_id = Unknown.REGULAR
 
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
-        time_changed = get_time_as_str(self.time_changed)
-        dts = self.custom_dts.copy()
+        time_changed = cached(get_time_as_str, self.time_changed)
+        dts = LazyDTS()
         dts.update({
             # Identification
             'alert_type': self.alert_type,
             'weather_cell_id': self.weather_cell_id,
 
-            # Time Remaining
-            '12h_time_weather_changed': time_changed[1],
-            '24h_time_weather_changed': time_changed[2],
-
             # Location
             'coords': self.coords,
             'channel_id': self.channel_id,
@@ -64,10 +65,17 @@ class WeatherEvent(BaseEvent):
 
             # Weather info
             'condition': self.condition,
-            'weather': locale.get_weather_name(self.condition),
-            'weather_emoji': get_weather_emoji(self.condition),
             'alert_severity': self.alert_severity,
             'warn': self.warn,
             'day': self.day
         })
+        dts.set_lazy({
+            # Time Remaining
+            '12h_time_weather_changed': lambda: time_changed()[1],
+            '24h_time_weather_changed': lambda: time_changed()[2],
+
+            # Weather info
+            'weather': lambda: locale.get_weather_name(self.condition),
+            'weather_emoji': lambda: get_weather_emoji(self.condition)
+        })
         return dts
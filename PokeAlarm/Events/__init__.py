@@ -1,7 +1,7 @@
 import logging
 import traceback
 
-from BaseEvent import BaseEvent  # noqa F401
+from BaseEvent import BaseEvent, LazyDTS, DTSOverlay, lazy  # noqa F401
 from MonEvent import MonEvent
 from StopEvent import StopEvent
 from GymEvent import GymEvent
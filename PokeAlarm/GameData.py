@@ -0,0 +1,81 @@
+# Standard Library Imports
+from collections import namedtuple
+import json
+import os
+# 3rd Party Imports
+# Local Imports
+from PokeAlarm import config, Unknown
+
+# Details about a move
+Move = namedtuple('Move', ['type', 'damage', 'dps', 'duration', 'energy'])
+UNKNOWN_MOVE = Move(Unknown.SMALL, 'unkn', 'unkn', 'unkn', 'unkn')
+
+# Base details about a monster - types is a tuple of (type1, type2)
+Monster = namedtuple(
+    'Monster', ['attack', 'defense', 'stamina', 'height', 'weight', 'types'])
+
+
+def load(name):
+    """ Returns the parsed contents of a file in the data folder. """
+    file_ = os.path.join(config['ROOT_PATH'], 'data', name)
+    with open(file_, 'r') as f:
+        return json.loads(f.read())
+
+
+def index(records):
+    """ Returns a tuple with each record at the index of its id. """
+    table = [None] * (max(records) + 1)
+    for id_, record in records.iteritems():
+        table[id_] = record
+    return tuple(table)
+
+
+def load_moves():
+    return index({int(id_): Move(
+        move['type'], move['damage'], move['dps'], move['duration'],
+        move['energy']) for id_, move in load('move_info.json').iteritems()})
+
+
+def load_monsters():
+    return index({int(id_): Monster(
+        float(mon['attack']), float(mon['defense']), float(mon['stamina']),
+        mon.get('height'), mon.get('weight'),
+        (mon.get('type1'), mon.get('type2')))
+        for id_, mon in load('base_stats.json').iteritems()})
+
+
+# Each file is only loaded once, when PokeAlarm starts
+MOVES = load_moves()
+MONSTERS = load_monsters()
+CP_MULTIPLIERS = {
+    float(lvl): multi for lvl, multi in load('cp_multipliers.json').items()}
+WEATHER_BOOSTS = {
+    int(w_id): frozenset(types)
+    for w_id, types in load('weather_boosts.json').items()}
+
+
+def lookup(table, id_):
+    """ Returns the record in the table for the id, or None. """
+    try:
+        return table[id_] if id_ >= 0 else None
+    except (IndexError, TypeError):  # Unknown ids may be '?' or too big
+        return None
+
+
+def get_move(move_id):
+    """ Returns the details of a move, or UNKNOWN_MOVE. """
+    return lookup(MOVES, move_id) or UNKNOWN_MOVE
+
+
+def get_monster(monster_id):
+    """ Returns the base details of a monster, or None. """
+    return lookup(MONSTERS, monster_id)
+
+
+def get_cp_multiplier(level):
+    return CP_MULTIPLIERS[float(level)]
+
+
+def get_boosted_types(weather_id):
+    """ Returns the set of types boosted by the weather. """
+    return WEATHER_BOOSTS.get(weather_id, frozenset())
@@ -1,16 +1,34 @@
 # Standard Library Imports
+import hashlib
 import re
 import logging
+import math
 import sys
 import traceback
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 # 3rd Party Imports
 from shapely.geometry import Polygon
+from shapely.prepared import prep
 # Local Imports
 
 
 log = logging.getLogger('Geofence')
 
+# Polygons of weather cells, keyed by S2 cell id. A cell never changes shape,
+# so each only needs to be built once.
+_weather_cells = {}
+
+
+# Returns the polygon covered by a weather event's S2 cell
+def get_weather_cell_polygon(weather):
+    cell_id = weather.weather_cell_id
+    if cell_id is None:
+        return Polygon(weather.coords)
+    polygon = _weather_cells.get(cell_id)
+    if polygon is None:
+        polygon = _weather_cells[cell_id] = Polygon(weather.coords)
+    return polygon
+
 
 # Load in a geofence file
 def load_geofence_file(file_path):
@@ -53,6 +71,12 @@ def load_geofence_file(file_path):
     sys.exit(1)
 
 
+# Returns a hash of a geofence file, used to tell if it has changed
+def get_geofence_file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
 # Geofence object used to determine if points are in a defined range
 class Geofence(object):
 
@@ -60,6 +84,7 @@ class Geofence(object):
     def __init__(self, name, points):
         self.__name = name
         self.__points = points
+        self.__prepared = None  # Built the first time it is needed
 
         self.__min_x = points[0][0]
         self.__max_x = points[0][0]
@@ -99,6 +124,72 @@ class Geofence(object):
     def get_name(self):
         return self.__name
 
+    # Returns the bounding box as (min_x, min_y, max_x, max_y)
+    def get_bounds(self):
+        return self.__min_x, self.__min_y, self.__max_x, self.__max_y
+
     # Checks to see if two regions overlap
     def check_overlap(self, weather):
-        return Polygon(self.__points).intersects(Polygon(weather.coords))
+        if self.__prepared is None:
+            self.__prepared = prep(Polygon(self.__points))
+        return self.__prepared.intersects(get_weather_cell_polygon(weather))
+
+
+# Uniform grid of bounding boxes used to quickly find geofences near a point
+class GeofenceIndex(object):
+
+    # Most cells a single geofence is added to. Fences much larger than
+    # the rest (such as an outline of the whole city) are kept in a list
+    # that is always checked instead, so they don't fill up the grid.
+    MAX_CELLS = 64
+
+    # Build the index from an OrderedDict of geofences
+    def __init__(self, geofences):
+        self.__geofences = list(geofences.values())
+        self.__cells = defaultdict(list)
+        self.__large = []  # Indices of fences that cover too many cells
+
+        # Size the cells to fit a typical geofence, so that most fences
+        # only land in a handful of cells
+        sizes = sorted(max(x2 - x1, y2 - y1) for x1, y1, x2, y2
+                       in (gf.get_bounds() for gf in self.__geofences))
+        self.__size = sizes[len(sizes) // 2] if sizes else 0
+        if self.__size <= 0:
+            self.__size = 0.01
+
+        # Indices are added in file order, so each cell stays sorted
+        for i, gf in enumerate(self.__geofences):
+            min_x, min_y, max_x, max_y = gf.get_bounds()
+            xs = range(self.__cell(min_x), self.__cell(max_x) + 1)
+            ys = range(self.__cell(min_y), self.__cell(max_y) + 1)
+            if len(xs) * len(ys) > self.MAX_CELLS:
+                self.__large.append(i)
+                continue
+            for cx in xs:
+                for cy in ys:
+                    self.__cells[(cx, cy)].append(i)
+
+    def __cell(self, value):
+        return int(math.floor(value / self.__size))
+
+    # Returns the geofences which might contain the point, in file order
+    def candidates(self, x, y):
+        cell = self.__cells.get((self.__cell(x), self.__cell(y)), ())
+        large = [i for i in self.__large
+                 if self.__in_bounds(self.__geofences[i], x, y)]
+        if large:
+            cell = sorted(list(cell) + large)
+        return [self.__geofences[i] for i in cell]
+
+    @staticmethod
+    def __in_bounds(gf, x, y):
+        min_x, min_y, max_x, max_y = gf.get_bounds()
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
+    # Returns the number of cells the geofences were added to
+    def get_cell_count(self):
+        return sum(len(cell) for cell in self.__cells.values())
+
+    # Returns the geofences which contain the point, in file order
+    def search(self, x, y):
+        return [gf for gf in self.candidates(x, y) if gf.contains(x, y)]
@@ -0,0 +1,189 @@
+# Standard Library Imports
+import heapq
+import itertools
+import logging
+import time
+# 3rd Party Imports
+from gevent.event import Event
+from gevent.queue import Empty
+# Local Imports
+from PokeAlarm.Utilities.GenUtils import ExpiringSet
+
+log = logging.getLogger('Ingress')
+
+# Default priority of each kind of webhook - higher goes first
+DEFAULT_WEIGHTS = {
+    'raids': 5,
+    'eggs': 5,
+    'monsters': 3,
+    'stops': 2,
+    'weather': 2,
+    'gyms': 1
+}
+
+
+def get_kind(data):
+    """ Returns the kind of event a webhook frame is for, or None. """
+    try:
+        kind, message = data['type'], data['message']
+        if kind == 'pokemon':
+            return 'monsters'
+        elif kind == 'pokestop':
+            return 'stops'
+        elif kind == 'gym' or kind == 'gym_details':
+            return 'gyms'
+        elif kind == 'raid':
+            return 'raids' if message.get('pokemon_id') else 'eggs'
+        elif kind == 'weather':
+            return 'weather'
+    except Exception:
+        pass  # Let the event factory deal with it
+    return None
+
+
+def get_deadline(kind, data):
+    """ Returns when the event in a webhook frame expires, or None. """
+    try:
+        message = data['message']
+        if kind == 'monsters':
+            return float(message['disappear_time'])
+        elif kind == 'stops':
+            return float(message['lure_expiration'])
+        elif kind == 'eggs':
+            return float(message.get('start') or message.get('raid_begin'))
+        elif kind == 'raids':
+            return float(message.get('end') or message.get('raid_end'))
+    except Exception:
+        pass
+    return None
+
+
+def get_dedupe_key(kind, data):
+    """ Returns a key that is the same for every frame about the same
+    event, or None if duplicates of the frame shouldn't be dropped. """
+    try:
+        message = data['message']
+        if kind == 'monsters':
+            return 'm', message['encounter_id']
+        elif kind == 'stops':
+            return 's', message['pokestop_id'], message['lure_expiration']
+        elif kind == 'eggs' or kind == 'raids':
+            return (kind[0], message['gym_id'],
+                    message.get('end') or message.get('raid_end'))
+    except Exception:
+        pass  # Gyms and weather can change at any time, so always keep them
+    return None
+
+
+def parse_weights(weights):
+    """ Returns the weights given as a list of 'kind:weight' strings. """
+    result = dict(DEFAULT_WEIGHTS)
+    for item in weights or []:
+        try:
+            kind, weight = item.split(':')
+            kind = kind.strip().lower()
+            if kind not in DEFAULT_WEIGHTS:
+                raise ValueError("unknown kind '{}'".format(kind))
+            result[kind] = int(weight)
+        except ValueError as e:
+            raise ValueError(
+                "Unable to interpret '{}' as a queue weight ({}). Weights "
+                "should be given as 'kind:weight', where kind is one of "
+                "{}.".format(item, e, sorted(DEFAULT_WEIGHTS)))
+    return result
+
+
+class IngressQueue(object):
+    """ Bounded queue for webhook frames that hands out the most important
+    ones first.
+
+    Each kind of event has a weight, and frames of the kind with the
+    highest weight are taken first. Frames of the same kind are taken in
+    order of how soon they expire (frames that don't expire come last, in
+    the order they arrived). Once the queue is full, room is made by
+    shedding the frame with the lowest weight that is closest to expiring.
+
+    Frames about an event that was already added are dropped, so the same
+    event isn't parsed and processed each time it is sent again. Events
+    are remembered until they expire.
+    """
+
+    def __init__(self, maxsize=10000, weights=None):
+        self.maxsize = maxsize
+        self.__weights = dict(weights or DEFAULT_WEIGHTS)
+        self.__heaps = {}  # Heap of (deadline, order, key, data) per weight
+        self.__order = itertools.count()  # Keeps ties in the order added
+        self.__size = 0
+        self.__not_empty = Event()
+        self.__seen = ExpiringSet()  # Keys of the events already added
+        self.__shed = 0
+        self.__expired = 0
+        self.__duplicates = 0
+
+    def qsize(self):
+        return self.__size
+
+    def empty(self):
+        return self.__size == 0
+
+    def put(self, data):
+        """ Adds a frame to the queue, shedding one if it is full. """
+        kind = get_kind(data)
+        weight = self.__weights.get(kind, 0)
+        deadline = get_deadline(kind, data)
+        key = get_dedupe_key(kind, data) if deadline is not None else None
+        if key is not None and key in self.__seen:
+            self.__duplicates += 1
+            return
+        item = (deadline if deadline is not None else float('inf'),
+                next(self.__order), key, data)
+        if self.maxsize and self.__size >= self.maxsize:
+            lowest = min(self.__heaps)
+            if weight < lowest or (
+                    weight == lowest and item < self.__heaps[lowest][0]):
+                self.__shed += 1  # Nothing less important to drop
+                return
+            shed = self.__pop(lowest)
+            self.__seen.discard(shed[2])  # Let it be sent again
+            self.__shed += 1
+        if key is not None:
+            self.__seen.add(key, deadline)
+        heapq.heappush(self.__heaps.setdefault(weight, []), item)
+        self.__size += 1
+        self.__not_empty.set()
+
+    def get(self, block=True, timeout=None):
+        """ Removes and returns the most important frame in the queue.
+        Frames that have expired while waiting are dropped. """
+        end = None if timeout is None else time.time() + timeout
+        while True:
+            while self.__size == 0:
+                if not block:
+                    raise Empty()
+                remaining = None if end is None else end - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise Empty()
+                self.__not_empty.clear()
+                self.__not_empty.wait(remaining)
+            deadline, _, _, data = self.__pop(max(self.__heaps))
+            if deadline < time.time():
+                self.__expired += 1
+                continue
+            return data
+
+    def __pop(self, weight):
+        heap = self.__heaps[weight]
+        item = heapq.heappop(heap)
+        if not heap:
+            del self.__heaps[weight]
+        self.__size -= 1
+        return item
+
+    def get_stats(self):
+        """ Returns the number of frames shed because the queue was full,
+        dropped because they expired, and dropped as duplicates, since last
+        collected. """
+        stats = {'shed': self.__shed, 'expired': self.__expired,
+                 'duplicates': self.__duplicates}
+        self.__shed, self.__expired, self.__duplicates = 0, 0, 0
+        return stats
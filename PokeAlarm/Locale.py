@@ -4,12 +4,30 @@ import json
 import logging
 # 3rd Party Imports
 # Local Imports
-from Utils import get_path
+from PokeAlarm import Unknown
+from GameData import MOVES, get_monster, get_move
+from Utils import get_path, get_type_emoji
 
 log = logging.getLogger('Locale')
 
 
-# Locale object is used to get different translations in other languages
+def get_locale(language):
+    """ Returns the Locale for a language, which is shared by every Manager
+    using it (use this instead of creating a new Locale).
+
+    Managers are created before their processes are started, so the
+    locales loaded here are inherited by those processes rather than
+    parsed again in each of them.
+    """
+    if not hasattr(get_locale, 'locales'):
+        get_locale.locales = {}
+    if language not in get_locale.locales:
+        get_locale.locales[language] = Locale(language)
+    return get_locale.locales[language]
+
+
+# Locale object is used to get different translations in other languages.
+# Locales are shared, so they must not be changed once they are created.
 class Locale(object):
 
     # Load in the locale information from the specified json file
@@ -18,10 +36,11 @@ class Locale(object):
         with open(os.path.join(get_path('locales'), 'en.json')) as f:
             default = json.loads(f.read())
         # Now load in the actual language we want
-        # (unnecessary for English but we don't want to discriminate)
-        with open(os.path.join(
-                get_path('locales'), '{}.json'.format(language))) as f:
-            info = json.loads(f.read())
+        info = default
+        if language != 'en':
+            with open(os.path.join(
+                    get_path('locales'), '{}.json'.format(language))) as f:
+                info = json.loads(f.read())
 
         # Pokemon ID -> Name
         self.__pokemon_names = {}
@@ -85,10 +104,33 @@ class Locale(object):
                 self.__form_names[int(pkmn_id)][int(form_id)] = pkmn_forms.get(
                     form_id, form_name)
 
-        log.debug("Loaded '{}' locale successfully!".format(language))
-
         self.__misc = info.get('misc', {})
 
+        # DTS that only depend on the species or move, built once up front
+        # so alerts don't have to look them up and format them every time.
+        # These are shared by all events and must not be modified.
+        self.__monster_dts = {}
+        self.__form_dts = {}
+        self.__costume_dts = {}
+        for pkmn_id in self.__pokemon_names:
+            self.__monster_dts[pkmn_id] = self.__make_monster_dts(pkmn_id)
+            for form_id in self.__form_names.get(pkmn_id, {0: None}):
+                self.__form_dts[(pkmn_id, form_id)] = \
+                    self.__make_form_dts(pkmn_id, form_id)
+            for costume_id in self.__costume_names.get(pkmn_id, {0: None}):
+                self.__costume_dts[(pkmn_id, costume_id)] = \
+                    self.__make_costume_dts(pkmn_id, costume_id)
+        self.__quick_dts = {}
+        self.__charge_dts = {}
+        for move_id, move in enumerate(MOVES):
+            if move is not None:
+                self.__quick_dts[move_id] = \
+                    self.__make_move_dts('quick', move_id)
+                self.__charge_dts[move_id] = \
+                    self.__make_move_dts('charge', move_id)
+
+        log.debug("Loaded '{}' locale successfully!".format(language))
+
     # Returns the name of the Pokemon associated with the given ID
     def get_pokemon_name(self, pokemon_id):
         return self.__pokemon_names.get(pokemon_id, 'unknown')
@@ -128,3 +170,83 @@ class Locale(object):
 
     def get_boosted_text(self):
         return self.__misc.get('boosted', '')
+
+    # Returns the DTS for a species of Pokemon
+    def get_monster_dts(self, pokemon_id):
+        dts = self.__monster_dts.get(pokemon_id)
+        return dts if dts is not None else self.__make_monster_dts(pokemon_id)
+
+    # Returns the DTS for the form of the given Pokemon ID and Form ID
+    def get_form_dts(self, pokemon_id, form_id):
+        dts = self.__form_dts.get((pokemon_id, form_id))
+        return dts if dts is not None \
+            else self.__make_form_dts(pokemon_id, form_id)
+
+    # Returns the DTS for the costume of the given Pokemon ID and Costume ID
+    def get_costume_dts(self, pokemon_id, costume_id):
+        dts = self.__costume_dts.get((pokemon_id, costume_id))
+        return dts if dts is not None \
+            else self.__make_costume_dts(pokemon_id, costume_id)
+
+    # Returns the DTS for a quick move
+    def get_quick_dts(self, move_id):
+        dts = self.__quick_dts.get(move_id)
+        return dts if dts is not None \
+            else self.__make_move_dts('quick', move_id)
+
+    # Returns the DTS for a charge move
+    def get_charge_dts(self, move_id):
+        dts = self.__charge_dts.get(move_id)
+        return dts if dts is not None \
+            else self.__make_move_dts('charge', move_id)
+
+    def __make_monster_dts(self, pokemon_id):
+        mon = get_monster(pokemon_id)
+        type1_id, type2_id = mon.types if mon is not None else (None, None)
+        type1 = self.get_type_name(type1_id)
+        type2 = self.get_type_name(type2_id)
+        type1_emoji = get_type_emoji(type1_id)
+        type2_emoji = get_type_emoji(type2_id)
+        return {
+            'mon_name': self.get_pokemon_name(pokemon_id),
+            'mon_id_3': "{:03}".format(pokemon_id),
+            'type1': type1,
+            'type1_or_empty': Unknown.or_empty(type1),
+            'type1_emoji': Unknown.or_empty(type1_emoji),
+            'type2': type2,
+            'type2_or_empty': Unknown.or_empty(type2),
+            'type2_emoji': Unknown.or_empty(type2_emoji),
+            'types': (u"{}/{}".format(type1, type2)
+                      if Unknown.is_not(type2) else type1),
+            'types_emoji': (u"{}{}".format(type1_emoji, type2_emoji)
+                            if Unknown.is_not(type2) else type1_emoji)
+        }
+
+    def __make_form_dts(self, pokemon_id, form_id):
+        form = self.get_form_name(pokemon_id, form_id)
+        return {
+            'form': form,
+            'form_or_empty': Unknown.or_empty(form),
+            'form_id_3': "{:03d}".format(form_id)
+        }
+
+    def __make_costume_dts(self, pokemon_id, costume_id):
+        costume = self.get_costume_name(pokemon_id, costume_id)
+        return {
+            'costume': costume,
+            'costume_or_empty': Unknown.or_empty(costume),
+            'costume_id_3': "{:03d}".format(costume_id)
+        }
+
+    def __make_move_dts(self, prefix, move_id):
+        move = get_move(move_id)
+        return {
+            prefix + '_move': self.get_move_name(move_id),
+            prefix + '_type_id': move.type,
+            prefix + '_type': self.get_type_name(move.type),
+            prefix + '_type_emoji': get_type_emoji(move.type),
+            prefix + '_damage': move.damage,
+            prefix + '_dps': move.dps,
+            prefix + '_duration': move.duration,
+            prefix + '_energy': move.energy
+        }
@@ -1,23 +1,71 @@
 # Standard Library Imports
-import collections
 from datetime import datetime, timedelta
 import logging
-import time
 import json
+from math import cos, radians
+import os
+import pickle
 import traceback
 import itertools
 # 3rd Party Imports
+from gevent.lock import BoundedSemaphore
+import portalocker
 import requests
-from requests.packages.urllib3.util.retry import Retry
-from gevent.lock import Semaphore
 # Local Imports
-from PokeAlarm import Unknown
-from PokeAlarm.Utilities.GenUtils import synchronize_with
+from PokeAlarm import config, Unknown
+from PokeAlarm.Utilities.GenUtils import LRUCache, SingleFlight, TokenBucket
+from PokeAlarm.Utilities.HttpUtils import create_session
 
 log = logging.getLogger('Gmaps')
 
+_missing = object()  # Marks results that haven't been memoized
+
+
+def get_gmaps(api_keys):
+    """ Returns the GMaps service for a set of API keys, which is shared by
+    every Manager using those keys. """
+    if not hasattr(get_gmaps, 'services'):
+        get_gmaps.services = {}
+    api_keys = tuple(api_keys)
+    if api_keys not in get_gmaps.services:
+        cache_file = None
+        if config.get('GMAPS_CACHE_TYPE') == 'file':
+            cache_file = os.path.join(
+                config['ROOT_PATH'], 'cache', 'gmaps.cache')
+        get_gmaps.services[api_keys] = GMaps(
+            api_keys, cache_size=config.get('GMAPS_CACHE_SIZE', 10000),
+            cache_ttl=config.get('GMAPS_CACHE_TTL', 30) * 86400,
+            snap=config.get('GMAPS_SNAP', 0), cache_file=cache_file)
+    return get_gmaps.services[api_keys]
+
+
+def get_rate_limiter():
+    """ Returns the rate limiter shared by every GMaps service in this
+    process. All APIs use the same quota, which is split evenly between the
+    Manager processes when each Manager runs in its own. """
+    if not hasattr(get_rate_limiter, 'limiter'):
+        processes = 1
+        if config.get('MANAGER_PROCESSES'):
+            processes = max(1, config.get('MANAGER_COUNT', 1))
+        get_rate_limiter.limiter = TokenBucket(
+            GMaps._queries_per_second / float(processes))
+    return get_rate_limiter.limiter
+
 
 class GMaps(object):
+    """ Looks up places and travel times with the Google Maps APIs.
+
+    A service is shared by all Managers using the same keys (see
+    `get_gmaps`), so results are memoized by the language they were asked
+    for, and requests are rate limited across all services (see
+    `get_rate_limiter`). Lookups run concurrently, up to the size of the
+    connection pool, and identical lookups in flight at the same time share
+    a single request.
+
+    Results are kept in LRU caches, which can be saved to a file so they
+    survive restarts. Reverse geocoding can snap coordinates to a grid of
+    `snap` meters, so nearby locations share one lookup.
+    """
 
     # Available travel modes for Distance Matrix calls
     TRAVEL_MODES = frozenset(['walking', 'biking', 'driving', 'transit'])
@@ -27,61 +75,96 @@ class GMaps(object):
     # How often to warn about going over query limit
     _warning_window = timedelta(minutes=1)
 
-    def __init__(self, api_key):
+    # Maximum number of requests in flight at once
+    _pool_size = 10
+
+    def __init__(self, api_key, cache_size=10000, cache_ttl=30 * 86400,
+                 snap=0, cache_file=None):
         self._key = itertools.cycle(api_key)
-        self._lock = Semaphore
 
         # Create a session to handle connections
-        self._session = self._create_session()
+        self.reset()
 
-        # Sliding window for rate limiting
-        self._window = collections.deque(maxlen=self._queries_per_second)
         self._time_limit = datetime.utcnow()
 
-        # Memoization dicts
-        self._geocode_hist = {}
-        self._reverse_geocode_hist = {}
-        self._dm_hist = {key: dict() for key in self.TRAVEL_MODES}
-
-    # TODO: Move into utilities
-    @staticmethod
-    def _create_session(retry_count=3, pool_size=3, backoff=.25):
-        """ Create a session to use connection pooling. """
-
-        # Create a session for connection pooling and
-        session = requests.Session()
-
-        # Reattempt connection on these statuses
-        status_forcelist = [500, 502, 503, 504]
-
-        # Define a Retry object to handle failures
-        retry_policy = Retry(
-            total=retry_count,
-            backoff_factor=backoff,
-            status_forcelist=status_forcelist
-        )
-
-        # Define an Adapter, to limit pool and implement retry policy
-        adapter = requests.adapters.HTTPAdapter(
-            max_retries=retry_policy,
-            pool_connections=pool_size,
-            pool_maxsize=pool_size
-        )
-
-        # Apply Adapter for all HTTPS (no HTTP for you!)
-        session.mount('https://', adapter)
+        # Memoized results
+        self._geocode_hist = LRUCache(cache_size, cache_ttl)
+        self._reverse_geocode_hist = LRUCache(cache_size, cache_ttl)
+        self._dm_hist = LRUCache(cache_size, cache_ttl)
+        self._snap = snap
+        self._file = cache_file
+        self._changed = False
+        if self._file is not None and os.path.isfile(self._file):
+            self._load()
+
+    def reset(self):
+        """ Opens new connections, and forgets the lookups in flight.
+
+        Connections and locks can't be shared with a forked process, so it
+        needs to reset the service before using it.
+        """
+        self._session = create_session(pool_size=self._pool_size)
+        self._pool = BoundedSemaphore(self._pool_size)
+        self._in_flight = SingleFlight()
+
+    def _hists(self):
+        return {
+            'geocode': self._geocode_hist,
+            'reverse_geocode': self._reverse_geocode_hist,
+            'distance_matrix': self._dm_hist
+        }
+
+    def _load(self):
+        """ Loads the results saved to the cache file. """
+        try:
+            with portalocker.Lock(self._file, mode="rb") as f:
+                data = pickle.load(f)
+            for name, hist in self._hists().iteritems():
+                hist.update(data.get(name, []))
+            log.debug(u"GMaps cache loaded from {}.".format(self._file))
+        except Exception as e:
+            log.error(u"There was an error attempting to load the GMaps "
+                      u"cache: {}: {}".format(type(e).__name__, e))
+
+    def save(self):
+        """ Saves new results to the cache file, if there is one. Results
+        saved by other processes are kept as well. """
+        if self._file is None or not self._changed:
+            return
+        try:
+            folder = os.path.dirname(self._file)
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+            temp = self._file + ".new"
+            with portalocker.Lock(self._file + ".lock", timeout=5, mode="wb+"):
+                if os.path.isfile(self._file):
+                    self._load()
+                data = {name: hist.items()
+                        for name, hist in self._hists().iteritems()}
+                with portalocker.Lock(temp, timeout=5, mode="wb+") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                if os.path.exists(self._file):
+                    os.remove(self._file)  # Required for Windows
+                os.rename(temp, self._file)
+            self._changed = False  # Kept if saving failed, to try again
+            log.debug(u"GMaps cache saved to {}.".format(self._file))
+        except Exception as e:
+            log.error(u"Encountered error while saving GMaps cache: "
+                      u"{}: {}".format(type(e).__name__, e))
+            log.error(u"Stack trace: \n {}".format(traceback.format_exc()))
 
-        return session
+    def _snap_to_grid(self, lat, lng):
+        """ Returns the center of the grid square containing lat, lng. """
+        if not self._snap:
+            return lat, lng
+        step = self._snap / 111320.0  # Meters in a degree of latitude
+        lat = round(lat / step) * step
+        step /= max(cos(radians(lat)), 0.01)  # Degrees of lng shrink
+        return lat, round(lng / step) * step
 
     def _make_request(self, service, params=None):
         """ Make a request to the GMAPs API. """
-        # Rate Limit - All APIs use the same quota
-        if len(self._window) == self._queries_per_second:
-            # Calculate elapsed time since start of window
-            elapsed_time = time.time() - self._window[0]
-            if elapsed_time < 1:
-                # Sleep off the difference
-                time.sleep(1 - elapsed_time)
+        get_rate_limiter().acquire()
 
         # Create the correct url
         url = u'https://maps.googleapis.com/maps/api/{}/json'.format(service)
@@ -93,8 +176,8 @@ class GMaps(object):
 
         # Use the session to send the request
         log.debug(u'{} request sending.'.format(service))
-        self._window.append(time.time())
-        request = self._session.get(url, params=params, timeout=3)
+        with self._pool:
+            request = self._session.get(url, params=params, timeout=3)
 
         if not request.ok:
             log.debug(u'Response body: {}'.format(
@@ -113,14 +196,19 @@ class GMaps(object):
         else:
             raise ValueError(u'Unexpected response status:\n {}, Google API:{}'.format(body,params['key']))
 
-    @synchronize_with()
     def geocode(self, address, language='en'):
         # type: (str, str) -> tuple
         """ Returns 'lat,lng' associated with the name of the place. """
         # Check for memoized results
         address = address.lower()
-        if address in self._geocode_hist:
-            return self._geocode_hist[address]
+        key = (address, language)
+        latlng = self._geocode_hist.get(key, _missing)
+        if latlng is not _missing:
+            return latlng
+        return self._in_flight.do(
+            ('geocode',) + key, self._geocode, key, address, language)
+
+    def _geocode(self, key, address, language):
         # Set default in case something happens
         latlng = None
         try:
@@ -136,7 +224,8 @@ class GMaps(object):
                 latlng = float(response['lat']), float(response['lng'])
 
             # Memoize the results
-            self._geocode_hist[address] = latlng
+            self._geocode_hist.set(key, latlng)
+            self._changed = True
         except requests.exceptions.HTTPError as e:
             log.error(u"Geocode failed with "
                       u"HTTPError: {}".format(e.message))
@@ -167,14 +256,28 @@ class GMaps(object):
         'country': Unknown.REGULAR
     }
 
-    @synchronize_with()
+    # DTS provided by Reverse Geocode calls
+    REVERSE_GEOCODE_KEYS = frozenset(_reverse_geocode_defaults)
+
+    @staticmethod
+    def distance_matrix_keys(mode):
+        """ Returns the DTS provided by Distance Matrix calls for a mode. """
+        return '{}_distance'.format(mode), '{}_duration'.format(mode)
+
     def reverse_geocode(self, latlng, language='en'):
         # type: (tuple) -> dict
         """ Returns the reverse geocode DTS associated with 'lat,lng'. """
-        latlng = u'{:.5f},{:.5f}'.format(latlng[0], latlng[1])
+        latlng = u'{:.5f},{:.5f}'.format(*self._snap_to_grid(*latlng))
         # Check for memoized results
-        if latlng in self._reverse_geocode_hist:
-            return self._reverse_geocode_hist[latlng]
+        key = (latlng, language)
+        dts = self._reverse_geocode_hist.get(key)
+        if dts is not None:
+            return dts
+        return self._in_flight.do(
+            ('reverse_geocode',) + key, self._reverse_geocode,
+            key, latlng, language)
+
+    def _reverse_geocode(self, key, latlng, language):
         # Get defaults in case something happens
         dts = self._reverse_geocode_defaults.copy()
         try:
@@ -208,7 +311,8 @@ class GMaps(object):
             dts['country'] = details.get('country', Unknown.REGULAR)
 
             # Memoize the results
-            self._reverse_geocode_hist[latlng] = dts
+            self._reverse_geocode_hist.set(key, dts)
+            self._changed = True
         except requests.exceptions.HTTPError as e:
             log.error(u"Reverse Geocode failed with "
                       u"HTTPError: {}".format(e.message))
@@ -225,7 +329,6 @@ class GMaps(object):
         # Send back dts
         return dts
 
-    @synchronize_with()
     def distance_matrix(self, mode, origin, dest, lang, units):
         # Check for valid mode
         if mode not in self.TRAVEL_MODES:
@@ -235,13 +338,17 @@ class GMaps(object):
         dest = u'{:.5f},{:.5f}'.format(dest[0], dest[1])
 
         # Check for memoized results
-        key = origin + u':' + dest
-        if key in self._dm_hist:
-            return self._dm_hist[key]
-
+        key = (mode, origin, dest, lang, units)
+        dts = self._dm_hist.get(key)
+        if dts is not None:
+            return dts
+        return self._in_flight.do(
+            ('distance_matrix',) + key, self._distance_matrix, key)
+
+    def _distance_matrix(self, key):
+        mode, origin, dest, lang, units = key
         # Set defaults in case something happens
-        dist_key = '{}_distance'.format(mode)
-        dur_key = '{}_duration'.format(mode)
+        dist_key, dur_key = self.distance_matrix_keys(mode)
         dts = {dist_key: Unknown.REGULAR, dur_key: Unknown.REGULAR}
         try:
             # Set parameters and make the request
@@ -262,6 +369,10 @@ class GMaps(object):
                 'distance', {}).get('text', Unknown.REGULAR)
             dts[dur_key] = response.get(
                 'duration', {}).get('text', Unknown.REGULAR)
+
+            # Memoize the results
+            self._dm_hist.set(key, dts)
+            self._changed = True
         except requests.exceptions.HTTPError as e:
             log.error(u"Distance Matrix failed with "
                       u"HTTPError: {}".format(e.message))
@@ -1,8 +1,10 @@
 # Standard Library Imports
 import json
 import logging
+import multiprocessing
 import os
 import re
+import signal
 import sys
 import traceback
 from collections import OrderedDict, namedtuple
@@ -10,21 +12,26 @@ from datetime import datetime, timedelta
 
 # 3rd Party Imports
 import gevent
+import gipc
 from gevent.queue import Queue
 from gevent.event import Event
 import itertools
 
 # Local Imports
 import Alarms
+from Alarms.Retry import reset_retry_queue
 import Filters
 import Events
+from Events import DTSOverlay
 from Cache import cache_factory
-from Geofence import load_geofence_file
-from Locale import Locale
-from LocationServices import GMaps
+from Geofence import load_geofence_file, get_geofence_file_hash, \
+    GeofenceIndex
+from Locale import get_locale
+from LocationServices import GMaps, get_gmaps
 from PokeAlarm import Unknown
 from Utils import (get_earth_dist, get_path, require_and_remove_key,
                    parse_boolean, get_cardinal_dir)
+from Utilities.HttpUtils import reset_session
 from . import config
 Rule = namedtuple('Rule', ['filter_names', 'alarm_names'])
 
@@ -34,21 +41,22 @@ log = logging.getLogger('Manager')
 class Manager(object):
     def __init__(self, name, google_key, locale, units, timezone, time_limit,
                  max_attempts, location, quiet, cache_type, filter_file,
-                 geofence_file, alarm_file, debug, channel_id_file):
+                 geofence_file, alarm_file, debug, channel_id_file,
+                 alarm_workers=1):
         # Set the name of the Manager
         self.__name = str(name).lower()
         log.info("----------- Manager '{}' ".format(self.__name)
                  + " is being created.")
         self.__debug = debug
 
-        # Get the Google Maps API
+        # Get the Google Maps API (shared by Managers with the same keys)
         self._google_key = google_key
-        self._gmaps_service = GMaps(google_key)
+        self._gmaps_service = get_gmaps(google_key)
         self._gmaps_reverse_geocode = False
         self._gmaps_distance_matrix = set()
 
         self._language = locale
-        self.__locale = Locale(locale)  # Setup the language-specific stuff
+        self.__locale = get_locale(locale)  # Language-specific stuff
         self.__units = units  # type of unit used for distances
         self.__timezone = timezone  # timezone for time calculations
         self.__time_limit = time_limit  # Minimum time remaining
@@ -79,8 +87,13 @@ class Manager(object):
 
         # Create the Geofences to filter with from given file
         self.geofences = None
+        self.__geofence_index = None
         if str(geofence_file).lower() != 'none':
             self.geofences = load_geofence_file(get_path(geofence_file))
+            self.__geofence_index = GeofenceIndex(self.geofences)
+            # Cells matched against old geofences need to be checked again
+            self.__cache.set_geofence_hash(
+                get_geofence_file_hash(get_path(geofence_file)))
 
         # Load in the file to get discord API key from geofence/filter-set
         self.channel_id = {}
@@ -89,6 +102,9 @@ class Manager(object):
         # Create the alarms to send notifications out with
         self.__alarms = {}
         self.load_alarms_file(get_path(alarm_file), int(max_attempts))
+        self.__dts_keys = {}  # DTS used by each set of alarms and filter
+        self.__alarm_workers = int(alarm_workers)  # Senders for each alarm
+        self.__dispatchers = {}  # Queues notifications for each alarm
 
         # Initialize Rules
         self.__mon_rules = {}
@@ -103,6 +119,14 @@ class Manager(object):
         self.__event = Event()
         self.__process = None
 
+        # Events dropped from the queue because they expired while waiting
+        self.__expired = 0
+
+        # Only used when running in a separate process
+        self.__pipe = None  # Write end of the pipe to the worker
+        self.__sent = 0  # Events written to the pipe
+        self.__processed = None  # Events processed by the worker
+
         log.info("----------- Manager '{}' ".format(self.__name)
                  + " successfully created.")
 
@@ -110,24 +134,47 @@ class Manager(object):
 
     # Update the object into the queue
     def update(self, obj):
-        self.__queue.put(obj)
+        if self.__pipe is not None:  # Send it to the worker process
+            self.__pipe.put(obj)
+            self.__sent += 1
+        else:
+            self.__queue.put(obj)
 
     # Get the name of this Manager
     def get_name(self):
         return self.__name
 
+    def get_queue_size(self):
+        """ Returns the number of events waiting to be processed. """
+        if self.__pipe is not None:
+            return self.__sent - self.__processed.value
+        return self.__queue.qsize()
+
     # Tell the process to finish up and go home
     def stop(self):
         log.info("Manager {} shutting down... ".format(self.__name)
-                 + "{} items in queue.".format(self.__queue.qsize()))
-        self.__event.set()
+                 + "{} items in queue.".format(self.get_queue_size()))
+        if self.__pipe is not None:
+            self.__pipe.put(None)  # Tells the worker no more events are coming
+            self.__pipe.close()
+            self.__pipe = None
+        else:
+            self.__event.set()
 
     def join(self):
         self.__process.join(timeout=20)
-        if not self.__process.ready():
+        if isinstance(self.__process, gevent.Greenlet):
+            stopped = self.__process.ready()
+        else:
+            stopped = not self.__process.is_alive()
+        if not stopped:
             log.warning("Manager {} could not be stopped in time!"
                         " Forcing process to stop.".format(self.__name))
-            self.__process.kill(timeout=2, block=True)  # Force stop
+            if isinstance(self.__process, gevent.Greenlet):
+                self.__process.kill(timeout=2, block=True)  # Force stop
+            else:
+                self.__process.terminate()
+                self.__process.join(timeout=2)
         else:
             log.info("Manager {} successfully stopped!".format(self.__name))
 
@@ -166,6 +213,44 @@ class Manager(object):
                              "Invalid mode specified.")
         self._gmaps_distance_matrix.discard(mode)
 
+    def _get_dts_keys(self, kind, alarms, custom_dts):
+        """ Returns the DTS used by the alarms and the custom DTS of the
+        filter, or None if unknown. """
+        cache_key = (kind, tuple(alarms), tuple(sorted(custom_dts.items())))
+        if cache_key not in self.__dts_keys:
+            keys = set()
+            for name in alarms:
+                alarm = self.__alarms.get(name)
+                alarm_keys = alarm.get_dts_keys(kind) if alarm else set()
+                if alarm_keys is None:  # Could use anything
+                    keys = None
+                    break
+                keys.update(alarm_keys)
+            if keys is not None:  # Custom DTS can contain more DTS
+                for value in custom_dts.itervalues():
+                    keys.update(Alarms.Template(value).keys)
+            self.__dts_keys[cache_key] = keys
+        return self.__dts_keys[cache_key]
+
+    def _add_gmaps_dts(self, dts, kind, e, alarms, custom_dts):
+        """ Adds the GMaps DTS that are used by the alarms (or the custom
+        DTS of the filter) to the DTS. """
+        keys = self._get_dts_keys(kind, alarms, custom_dts)
+        if self._gmaps_reverse_geocode and 'address' not in dts and (
+                keys is None
+                or not keys.isdisjoint(GMaps.REVERSE_GEOCODE_KEYS)):
+            dts.update(self._gmaps_service.reverse_geocode(
+                (e.lat, e.lng), self._language))
+        for mode in self._gmaps_distance_matrix:
+            mode_keys = GMaps.distance_matrix_keys(mode)
+            if mode_keys[0] in dts:
+                continue  # Already added for an earlier alert
+            if keys is not None and keys.isdisjoint(mode_keys):
+                continue  # No alarms use this mode
+            dts.update(self._gmaps_service.distance_matrix(
+                mode, (e.lat, e.lng), self.__location,
+                self._language, self.__units))
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ RULES API ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -464,8 +549,47 @@ class Manager(object):
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ HANDLE EVENTS ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     # Start it up
-    def start(self):
-        self.__process = gevent.spawn(self.run)
+    def start(self, as_process=False):
+        if not as_process:
+            self.__process = gevent.spawn(self.run)
+            return
+        # Events are passed to the worker over a pipe, and the worker
+        # reports back how many it has finished through shared memory
+        reader, self.__pipe = gipc.pipe()
+        self.__processed = multiprocessing.RawValue('L', 0)
+        self.__process = gipc.start_process(
+            target=self._run_in_process, args=(reader,),
+            name=self.__name, daemon=True)
+
+    def _run_in_process(self, reader):
+        """ Entry point for a Manager running in its own process. """
+        # The server is responsible for telling us when to stop
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # Objects bound to the parent's hub, or holding its connections,
+        # can't be used after the fork
+        self.__queue = Queue()
+        self.__event = Event()
+        self._gmaps_service.reset()
+        reset_session()
+        reset_retry_queue()
+        gevent.spawn(self._read_pipe, reader)
+        try:
+            self.run()
+        except gevent.GreenletExit:
+            pass
+
+    def _read_pipe(self, reader):
+        """ Moves events from the pipe into the queue until told to stop. """
+        with reader:
+            while True:
+                try:
+                    obj = reader.get()
+                except EOFError:  # Server went away
+                    break
+                if obj is None:  # Server is shutting down
+                    break
+                self.__queue.put(obj)
+        self.__event.set()
 
     def setup_in_process(self):
 
@@ -486,18 +610,32 @@ class Manager(object):
             alarm.connect()
             alarm.startup_message()
 
+        # Notifications are sent in the background for each alarm
+        self.__dispatchers = {}
+        for name, alarm in self.__alarms.iteritems():
+            dispatcher = Alarms.Dispatcher(name, alarm, self.__alarm_workers)
+            dispatcher.start()
+            self.__dispatchers[name] = dispatcher
+
     # Main event handler loop
     def run(self):
         self.setup_in_process()
         last_clean = datetime.utcnow()
+        last_stats = datetime.utcnow()
         while True:  # Run forever and ever
 
             # Clean out visited every 5 minutes
             if datetime.utcnow() - last_clean > timedelta(minutes=5):
                 log.debug("Cleaning cache...")
                 self.__cache.clean_and_save()
+                self._gmaps_service.save()
                 last_clean = datetime.utcnow()
 
+            # Report how the alarms are keeping up every minute
+            if datetime.utcnow() - last_stats > timedelta(minutes=1):
+                self.log_stats()
+                last_stats = datetime.utcnow()
+
             try:  # Get next object to process
                 event = self.__queue.get(block=True, timeout=5)
             except gevent.queue.Empty:
@@ -511,7 +649,10 @@ class Manager(object):
             try:
                 kind = type(event)
                 log.debug("Processing event: %s", event.id)
-                if kind == Events.MonEvent:
+                if event.is_expired():  # Not worth alerting on anymore
+                    self.__expired += 1
+                    log.debug("Dropped expired event: %s", event.id)
+                elif kind == Events.MonEvent:
                     self.process_monster(event)
                 elif kind == Events.StopEvent:
                     self.process_stop(event)
@@ -531,12 +672,40 @@ class Manager(object):
                 log.error("Encountered error during processing: "
                           + "{}: {}".format(type(e).__name__, e))
                 log.debug("Stack trace: \n {}".format(traceback.format_exc()))
+            if self.__processed is not None:
+                self.__processed.value += 1
             # Explict context yield
             gevent.sleep(0)
-        # Save cache and exit
+        # Finish sending notifications, then save cache and exit
+        for dispatcher in self.__dispatchers.values():
+            dispatcher.stop(timeout=15)
         self.__cache.clean_and_save()
+        self._gmaps_service.save()
         raise gevent.GreenletExit()
 
+    def log_stats(self):
+        """ Logs the events waiting in and expired from the queue, and the
+        queue depth and send times of each alarm. """
+        # Read directly, since a worker process doesn't have the pipe
+        log.info("Manager {}: {} events waiting to be processed.".format(
+            self.__name, self.__queue.qsize()))
+        if self.__expired > 0:
+            log.info("Manager {}: {} expired events dropped from the "
+                     "queue.".format(self.__name, self.__expired))
+            self.__expired = 0
+        for name, dispatcher in self.__dispatchers.iteritems():
+            stats = dispatcher.get_stats()
+            if stats['sent'] == 0 and stats['queued'] == 0 \
+                    and stats['failed'] == 0 and stats['expired'] == 0:
+                continue
+            log.info("Alarm '{}': {} sent, {} failed, {} queued, {} expired. "
+                     "Waited {:.2f}s avg ({:.2f}s max), sent in {:.2f}s avg "
+                     "({:.2f}s max).".format(
+                         name, stats['sent'], stats['failed'],
+                         stats['queued'], stats['expired'], stats['avg_wait'],
+                         stats['max_wait'], stats['avg_send'],
+                         stats['max_send']))
+
     # Set the location of the Manager
     def set_location(self, location):
         # Regex for Lat,Lng coordinate
@@ -606,6 +775,7 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__mon_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__mon_filters.get(f_name)
@@ -619,39 +789,34 @@ class Manager(object):
                                   " filter set: {}!"
                                   "".format(mon.name, geofence_name, f_name))
                         continue
-                    mon.custom_dts = f.custom_dts
-                    mon.geofence = mon.geofence_list[0] if geofence_name not in self.geofences.iterkeys() else geofence_name
+                    mon.geofence = mon.geofence_list[0] if geofence_name not in self.geofences else geofence_name
                     if self.__quiet is False:
                         log.info("{} monster notification"
                                  " has been triggered in rule '{}', for geofence: {}, filter set: {} channel: {}!"
                                  "".format(mon.name, r_name, geofence_name, f_name, mon.channel_id))
-                    self._trigger_mon(mon, rule.alarm_names)
-
-    def _trigger_mon(self, mon, alarms):
-        # Generate the DTS for the event
-        dts = mon.generate_dts(self.__locale, self.__timezone, self.__units)
+                    if dts is None:
+                        dts = mon.generate_dts(
+                            self.__locale, self.__timezone, self.__units)
+                    self._trigger_mon(
+                        mon, rule.alarm_names, dts, f.custom_dts)
 
+    def _trigger_mon(self, mon, alarms, dts, custom_dts):
         # Get GMaps Triggers
-        if self._gmaps_reverse_geocode:
-            dts.update(self._gmaps_service.reverse_geocode(
-                (mon.lat, mon.lng), self._language))
-        for mode in self._gmaps_distance_matrix:
-            dts.update(self._gmaps_service.distance_matrix(
-                mode, (mon.lat, mon.lng), self.__location,
-                self._language, self.__units))
+        self._add_gmaps_dts(dts, 'monsters', mon, alarms, custom_dts)
 
-        threads = []
-        # Spawn notifications in threads so they can work in background
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(
+            dts, {'geofence': mon.geofence, 'channel_id': mon.channel_id},
+            custom_dts, mon.deadline)
+
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.pokemon_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('pokemon_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
-
     def process_stop(self, stop):
         # type: (Events.StopEvent) -> None
         """ Process a stop event and notify alarms if it passes. """
@@ -693,45 +858,39 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__stop_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__stop_filters.get(f_name)
                 passed = f.check_event(stop) and self.check_geofences(f, stop)
                 if not passed:
                     continue  # go to next filter
-                stop.custom_dts = f.custom_dts
                 if self.__quiet is False:
                     log.info("{} stop notification"
                              " has been triggered in rule '{}'!"
                              "".format(stop.name, r_name))
-                self._trigger_stop(stop, rule.alarm_names)
+                if dts is None:
+                    dts = stop.generate_dts(
+                        self.__locale, self.__timezone, self.__units)
+                self._trigger_stop(stop, rule.alarm_names, dts, f.custom_dts)
                 break  # Next rule
 
-    def _trigger_stop(self, stop, alarms):
-        # Generate the DTS for the event
-        dts = stop.generate_dts(self.__locale, self.__timezone, self.__units)
-
+    def _trigger_stop(self, stop, alarms, dts, custom_dts):
         # Get GMaps Triggers
-        if self._gmaps_reverse_geocode:
-            dts.update(self._gmaps_service.reverse_geocode(
-                (stop.lat, stop.lng), self._language))
-        for mode in self._gmaps_distance_matrix:
-            dts.update(self._gmaps_service.distance_matrix(
-                mode, (stop.lat, stop.lng), self.__location,
-                self._language, self.__units))
+        self._add_gmaps_dts(dts, 'stops', stop, alarms, custom_dts)
+
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(
+            dts, {'geofence': stop.geofence}, custom_dts, stop.deadline)
 
-        threads = []
-        # Spawn notifications in threads so they can work in background
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.pokestop_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('pokestop_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:
-            thread.join()
-
     def process_gym(self, gym):
         # type: (Events.GymEvent) -> None
         """ Process a gym event and notify alarms if it passes. """
@@ -774,45 +933,39 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__gym_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__gym_filters.get(f_name)
                 passed = f.check_event(gym) and self.check_geofences(f, gym)
                 if not passed:
                     continue  # go to next filter
-                gym.custom_dts = f.custom_dts
                 if self.__quiet is False:
                     log.info("{} gym notification"
                              " has been triggered in rule '{}'!"
                              "".format(gym.name, r_name))
-                self._trigger_gym(gym, rule.alarm_names)
+                if dts is None:
+                    dts = gym.generate_dts(
+                        self.__locale, self.__timezone, self.__units)
+                self._trigger_gym(gym, rule.alarm_names, dts, f.custom_dts)
                 break  # Next rule
 
-    def _trigger_gym(self, gym, alarms):
-        # Generate the DTS for the event
-        dts = gym.generate_dts(self.__locale, self.__timezone, self.__units)
-
+    def _trigger_gym(self, gym, alarms, dts, custom_dts):
         # Get GMaps Triggers
-        if self._gmaps_reverse_geocode:
-            dts.update(self._gmaps_service.reverse_geocode(
-                (gym.lat, gym.lng), self._language))
-        for mode in self._gmaps_distance_matrix:
-            dts.update(self._gmaps_service.distance_matrix(
-                mode, (gym.lat, gym.lng), self.__location,
-                self._language, self.__units))
+        self._add_gmaps_dts(dts, 'gyms', gym, alarms, custom_dts)
+
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(
+            dts, {'geofence': gym.geofence}, custom_dts, gym.deadline)
 
-        threads = []
-        # Spawn notifications in threads so they can work in background
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.gym_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('gym_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
-
     def process_egg(self, egg):
         # type: (Events.EggEvent) -> None
         """ Process a egg event and notify alarms if it passes. """
@@ -865,6 +1018,7 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__egg_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__egg_filters.get(f_name)
@@ -878,39 +1032,34 @@ class Manager(object):
                                   " filter set: {}!"
                                   "".format(egg.name, geofence_name, f_name))
                         continue
-                    egg.custom_dts = f.custom_dts
-                    egg.geofence = egg.geofence_list[0] if geofence_name not in self.geofences.iterkeys() else geofence_name
+                    egg.geofence = egg.geofence_list[0] if geofence_name not in self.geofences else geofence_name
                     if self.__quiet is False:
                         log.info("{} egg notification"
                                  " has been triggered in rule '{}', for geofence: {}, filter set: {} channel: {}!"
                                  "".format(egg.name, r_name, geofence_name, f_name, egg.channel_id))
-                    self._trigger_egg(egg, rule.alarm_names)
-
-    def _trigger_egg(self, egg, alarms):
-        # Generate the DTS for the event
-        dts = egg.generate_dts(self.__locale, self.__timezone, self.__units)
+                    if dts is None:
+                        dts = egg.generate_dts(
+                            self.__locale, self.__timezone, self.__units)
+                    self._trigger_egg(
+                        egg, rule.alarm_names, dts, f.custom_dts)
 
+    def _trigger_egg(self, egg, alarms, dts, custom_dts):
         # Get GMaps Triggers
-        if self._gmaps_reverse_geocode:
-            dts.update(self._gmaps_service.reverse_geocode(
-                (egg.lat, egg.lng), self._language))
-        for mode in self._gmaps_distance_matrix:
-            dts.update(self._gmaps_service.distance_matrix(
-                mode, (egg.lat, egg.lng), self.__location,
-                self._language, self.__units))
+        self._add_gmaps_dts(dts, 'eggs', egg, alarms, custom_dts)
+
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(
+            dts, {'geofence': egg.geofence, 'channel_id': egg.channel_id},
+            custom_dts, egg.deadline)
 
-        threads = []
-        # Spawn notifications in threads so they can work in background
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.raid_egg_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('raid_egg_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
-
     def process_raid(self, raid):
         # type: (Events.RaidEvent) -> None
         """ Process a raid event and notify alarms if it passes. """
@@ -963,6 +1112,7 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__raid_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__raid_filters.get(f_name)
@@ -976,39 +1126,34 @@ class Manager(object):
                                   " filter set: {}!"
                                   "".format(raid.name, geofence_name, f_name))
                         continue
-                    raid.custom_dts = f.custom_dts
-                    raid.geofence = raid.geofence_list[0] if geofence_name not in self.geofences.iterkeys() else geofence_name
+                    raid.geofence = raid.geofence_list[0] if geofence_name not in self.geofences else geofence_name
                     if self.__quiet is False:
                         log.info("{} raid notification"
                                  " has been triggered in rule '{}', for geofence: {}, filter set: {} channel: {}!"
                                  "".format(raid.name, r_name, geofence_name, f_name, raid.channel_id))
-                    self._trigger_raid(raid, rule.alarm_names)
-
-    def _trigger_raid(self, raid, alarms):
-        # Generate the DTS for the event
-        dts = raid.generate_dts(self.__locale, self.__timezone, self.__units)
+                    if dts is None:
+                        dts = raid.generate_dts(
+                            self.__locale, self.__timezone, self.__units)
+                    self._trigger_raid(
+                        raid, rule.alarm_names, dts, f.custom_dts)
 
+    def _trigger_raid(self, raid, alarms, dts, custom_dts):
         # Get GMaps Triggers
-        if self._gmaps_reverse_geocode:
-            dts.update(self._gmaps_service.reverse_geocode(
-                (raid.lat, raid.lng), self._language))
-        for mode in self._gmaps_distance_matrix:
-            dts.update(self._gmaps_service.distance_matrix(
-                mode, (raid.lat, raid.lng), self.__location,
-                self._language, self.__units))
+        self._add_gmaps_dts(dts, 'raids', raid, alarms, custom_dts)
+
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(
+            dts, {'geofence': raid.geofence, 'channel_id': raid.channel_id},
+            custom_dts, raid.deadline)
 
-        threads = []
-        # Spawn notifications in threads so they can work in background
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.raid_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('raid_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
-
     def process_weather(self, weather):
         # type: (Events.WeatherEvent) -> None
         """ Process a weather event and notify alarms if it passes. """
@@ -1040,6 +1185,7 @@ class Manager(object):
             rules = {"default": Rule(
                 self.__weather_filters.keys(), self.__alarms.keys())}
 
+        dts = None  # Generated once, then shared by every alert
         for r_name, rule in rules.iteritems():  # For all rules
             for f_name in rule.filter_names:  # Check Filters in Rules
                 f = self.__weather_filters.get(f_name)
@@ -1053,31 +1199,32 @@ class Manager(object):
                                   " filter set: {}!"
                                   "".format(weather.name, geofence_name, f_name))
                         continue
-                    weather.custom_dts = f.custom_dts
-                    weather.geofence = weather.geofence_list[0] if geofence_name not in self.geofences.iterkeys() else geofence_name
+                    weather.geofence = weather.geofence_list[0] if geofence_name not in self.geofences else geofence_name
                     if self.__quiet is False:
                         log.info("{} weather notification"
                                  " has been triggered in rule '{}', for geofence: {}, filter set: {} channel: {}!"
                                  "".format(weather.name, r_name, geofence_name, f_name, weather.channel_id))
-                    self._trigger_weather(weather, rule.alarm_names)
-
-    def _trigger_weather(self, weather, alarms):
-        # Generate the DTS for the event
-        dts = weather.generate_dts(
-            self.__locale, self.__timezone, self.__units)
-
-        threads = []
-        # Spawn notifications in threads so they can work in background
+                    if dts is None:
+                        dts = weather.generate_dts(
+                            self.__locale, self.__timezone, self.__units)
+                    self._trigger_weather(
+                        weather, rule.alarm_names, dts, f.custom_dts)
+
+    def _trigger_weather(self, weather, alarms, dts, custom_dts):
+        # Add the DTS that are specific to this alert
+        dts = DTSOverlay(dts, {
+            'geofence': weather.geofence,
+            'channel_id': weather.channel_id
+        }, custom_dts, weather.deadline)
+
+        # Hand off notifications to be sent in the background
         for name in alarms:
-            alarm = self.__alarms.get(name)
-            if alarm:
-                threads.append(gevent.spawn(alarm.weather_alert, dts))
+            dispatcher = self.__dispatchers.get(name)
+            if dispatcher:
+                dispatcher.send('weather_alert', dts)
             else:
                 log.critical("Alarm '{}' not found!".format(name))
 
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
-
     # Check to see if a notification is within the given range
     def check_geofences(self, f, e):
         """ Returns true if the event passes the filter's geofences. """
@@ -1085,7 +1232,9 @@ class Manager(object):
             return True
         targets = f.geofences
         if len(targets) == 1 and "all" in targets:
-            targets = self.geofences.iterkeys()
+            # Only the fences near the event could possibly contain it
+            targets = [gf.get_name() for gf in
+                       self.__geofence_index.candidates(e.lat, e.lng)]
         for name in targets:
             gf = self.geofences.get(name)
             if not gf:  # gf doesn't exist
@@ -1105,12 +1254,10 @@ class Manager(object):
         """ Returns true if the event passes the filter's geofences. """
         if self.geofences is None:  # No geofences set (Improve here)
             return False
-        for name in self.geofences.iterkeys():
-            gf = self.geofences.get(name)
-            if not gf:  # gf doesn't exist
-                log.error("Cannot check geofence %s: does not exist!", name)
-            elif gf.contains(e.lat, e.lng):  # e in gf
-                gf_name = gf.get_name()
+        # Only the fences near the event could possibly contain it
+        for gf in self.__geofence_index.candidates(e.lat, e.lng):
+            gf_name = gf.get_name()
+            if gf.contains(e.lat, e.lng):  # e in gf
                 log.debug("{} is in geofence {}!".format(
                     e.name, gf_name))
                 e.geofence_list.append(gf_name)  # Set the geofence for dts
@@ -1119,7 +1266,7 @@ class Manager(object):
                     e.geofence_list.append(gf_name.split('-')[1])
                 return True
             else:  # e not in gf
-                log.debug("%s not in %s.", e.name, name)
+                log.debug("%s not in %s.", e.name, gf_name)
         return False
 
 # Check to see if a weather notification s2 cell
@@ -1149,6 +1296,15 @@ class Manager(object):
         """ Returns true if the event passes the filter's geofences. """
         if self.geofences is None:  # No geofences set (Improve here)
             return False
+        # Cells are fixed, so the geofences they overlap only need to be
+        # found the first time the cell is seen
+        cell_id = weather.weather_cell_id
+        geofence_list = None
+        if cell_id is not None:
+            geofence_list = self.__cache.get_cell_geofences(cell_id)
+        if geofence_list is not None:
+            weather.geofence_list = list(geofence_list)
+            return len(geofence_list) > 0
         for name in self.geofences.iterkeys():
             gf = self.geofences.get(name)
             if not gf:  # gf doesn't exist
@@ -1165,11 +1321,11 @@ class Manager(object):
                     log.debug("%s not in %s.", weather.name, name)
             else:  # weather matched parent
                 log.debug("%s  %s Already matched parent area", weather.name, name)
-        if not weather.geofence_list:
-            return False
-        else:
+        if weather.geofence_list:
             weather.geofence_list.append('All')
-        return True
+        if cell_id is not None:
+            self.__cache.update_cell_geofences(cell_id, weather.geofence_list)
+        return len(weather.geofence_list) > 0
 
     def get_channel_id(self, e, filter_name, geofence_name):
         try:
@@ -1,6 +1,10 @@
 # Standard Library Imports
+from collections import OrderedDict
+import heapq
+import time
 # 3rd Party Imports
-from gevent.lock import Semaphore
+import gevent
+from gevent.event import AsyncResult
 # Local Imports
 
 
@@ -16,21 +20,159 @@ def parse_bool(value):
     raise ValueError('Not a valid boolean')
 
 
-def synchronize_with(lock=None):
-    """ Synchronization decorator. """
+class TokenBucket(object):
+    """ Limits how often something can happen, while allowing bursts.
 
-    if lock is None:
-        lock = Semaphore()
+    Holds up to `capacity` tokens and is refilled with `rate` tokens every
+    second. Each action takes a token, and has to wait for one if none are
+    left.
+    """
 
-    def synchronize(func):
+    def __init__(self, rate, capacity=None):
+        self.__rate = float(rate)
+        self.__capacity = float(capacity or rate)
+        self.__tokens = self.__capacity
+        self.__last = time.time()
 
-        def locked_func(*args, **kwargs):
-            lock.acquire(timeout=60)
-            try:
-                return func(*args, **kwargs)
-            finally:
-                lock.release()
+    def __refill(self):
+        now = time.time()
+        self.__tokens = min(self.__capacity,
+                            self.__tokens + (now - self.__last) * self.__rate)
+        self.__last = now
 
-        return locked_func
+    def consume(self):
+        """ Takes a token and returns 0, or returns the seconds to wait
+        until one is available. """
+        self.__refill()
+        if self.__tokens >= 1:
+            self.__tokens -= 1
+            return 0
+        return (1 - self.__tokens) / self.__rate
 
-    return synchronize
+    def acquire(self):
+        """ Waits until a token can be taken. """
+        while True:
+            delay = self.consume()
+            if delay <= 0:
+                return
+            gevent.sleep(delay)
+
+    def pause(self, seconds):
+        """ Makes sure the next token isn't available for some seconds. """
+        self.__refill()
+        self.__tokens = min(self.__tokens, 1 - seconds * self.__rate)
+
+
+class ExpiringSet(object):
+    """ Set of keys that are each forgotten once their expiration passes.
+
+    Expired keys are purged in order of expiration, using a heap, as new
+    keys are added.
+    """
+
+    def __init__(self):
+        self.__keys = {}  # Expiration of each key
+        self.__heap = []  # (expiration, key) in order of expiration
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __contains__(self, key):
+        expiration = self.__keys.get(key)
+        return expiration is not None and expiration > time.time()
+
+    def add(self, key, expiration):
+        """ Adds a key, which is kept until the given timestamp. """
+        self.purge()
+        self.__keys[key] = expiration
+        heapq.heappush(self.__heap, (expiration, key))
+
+    def discard(self, key):
+        self.__keys.pop(key, None)
+
+    def purge(self):
+        """ Removes the keys that have expired. """
+        now = time.time()
+        while self.__heap and self.__heap[0][0] <= now:
+            expiration, key = heapq.heappop(self.__heap)
+            if self.__keys.get(key) == expiration:
+                del self.__keys[key]
+
+
+class LRUCache(object):
+    """ Mapping that holds up to `maxsize` values, each for `ttl` seconds.
+
+    Once full, the least recently used value is evicted to make room.
+    Expired values are dropped as they are found.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__items = OrderedDict()  # (expiration, value), oldest first
+
+    def __len__(self):
+        return len(self.__items)
+
+    def get(self, key, default=None):
+        """ Returns the value of a key, or default if missing or expired. """
+        item = self.__items.pop(key, None)
+        if item is None or item[0] <= time.time():
+            return default
+        self.__items[key] = item  # Most recently used
+        return item[1]
+
+    def set(self, key, value, expiration=None):
+        """ Sets the value of a key, which is kept until the expiration
+        (by default `ttl` seconds from now). """
+        if expiration is None:
+            expiration = time.time() + self.__ttl
+        self.__items.pop(key, None)
+        self.__items[key] = (expiration, value)
+        while len(self.__items) > self.__maxsize:
+            self.__items.popitem(last=False)
+
+    def items(self):
+        """ Returns (key, expiration, value) for each unexpired value, least
+        recently used first. """
+        now = time.time()
+        return [(key, expiration, value) for key, (expiration, value)
+                in self.__items.iteritems() if expiration > now]
+
+    def update(self, items):
+        """ Sets each key from a list of (key, expiration, value), without
+        replacing the keys already set. """
+        now = time.time()
+        for key, expiration, value in items:
+            if key not in self.__items and expiration > now:
+                self.set(key, value, expiration)
+
+
+class SingleFlight(object):
+    """ Coalesces concurrent calls for the same key into a single call.
+
+    While a call for a key is in flight, other callers for that key wait for
+    its result (or exception) instead of making the call themselves.
+    """
+
+    def __init__(self):
+        self.__calls = {}  # Result of each call in flight
+
+    def __len__(self):
+        return len(self.__calls)
+
+    def do(self, key, func, *args):
+        """ Returns func(*args), or the result of the call in flight. """
+        call = self.__calls.get(key)
+        if call is not None:
+            return call.get()
+        call = self.__calls[key] = AsyncResult()
+        try:
+            result = func(*args)
+            call.set(result)
+            return result
+        except Exception as e:
+            call.set_exception(e)
+            raise
+        finally:
+            del self.__calls[key]
@@ -0,0 +1,62 @@
+# Standard Library Imports
+# 3rd Party Imports
+import requests
+from requests.packages.urllib3.util.retry import Retry
+# Local Imports
+from PokeAlarm import config
+
+
+def create_session(retry_count=3, pool_size=3, backoff=.25):
+    """ Create a session to use connection pooling. """
+
+    # Create a session for connection pooling and
+    session = requests.Session()
+
+    # Reattempt connection on these statuses
+    status_forcelist = [500, 502, 503, 504]
+
+    # Define a Retry object to handle failures
+    retry_policy = Retry(
+        total=retry_count,
+        backoff_factor=backoff,
+        status_forcelist=status_forcelist
+    )
+
+    # Define an Adapter, to limit pool and implement retry policy
+    adapter = requests.adapters.HTTPAdapter(
+        max_retries=retry_policy,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size
+    )
+
+    # Apply Adapter for all HTTPS (no HTTP for you!)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def get_session():
+    """ Returns the session shared by all alarms in this process.
+
+    Connections are kept open between notifications, so they only pay for
+    the handshakes once. Failed requests aren't retried by the session -
+    each alarm decides how many attempts a notification gets.
+
+    Only the Discord and Telegram alarms use it. The client libraries used
+    by the other alarms (Slack, Pushbullet, Facebook Pages, Twilio and
+    Twitter) make their own connections, and can't be given a session.
+    """
+    if not hasattr(get_session, 'session'):
+        session = create_session(
+            retry_count=0, pool_size=config.get('HTTP_POOL_SIZE', 10))
+        # Custom webhooks might not use https
+        session.mount('http://', session.get_adapter('https://'))
+        get_session.session = session
+    return get_session.session
+
+
+def reset_session():
+    """ Forgets the shared session, so that a forked process opens its own
+    connections instead of using the ones it inherited. """
+    if hasattr(get_session, 'session'):
+        del get_session.session
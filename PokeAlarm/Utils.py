@@ -11,7 +11,8 @@ import sys
 # Local Imports
 from PokeAlarm import not_so_secret_url
 from PokeAlarm import config
-from PokeAlarm import Unknown
+from PokeAlarm.GameData import get_move, get_monster, get_cp_multiplier, \
+    get_boosted_types
 
 log = logging.getLogger('Utils')
 
@@ -131,135 +132,73 @@ def get_team_id(team_name):
 
 # Returns the types of a move when requesting
 def get_move_type(move_id):
-    if not hasattr(get_move_type, 'info'):
-        get_move_type.info = {}
-        file_ = get_path('data/move_info.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_move_type.info[int(id_)] = j[id_]['type']
-    return get_move_type.info.get(move_id, Unknown.SMALL)
+    return get_move(move_id).type
 
 
 # Returns the damage of a move when requesting
 def get_move_damage(move_id):
-    if not hasattr(get_move_damage, 'info'):
-        get_move_damage.info = {}
-        file_ = get_path('data/move_info.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_move_damage.info[int(id_)] = j[id_]['damage']
-    return get_move_damage.info.get(move_id, 'unkn')
+    return get_move(move_id).damage
 
 
 # Returns the dps of a move when requesting
 def get_move_dps(move_id):
-    if not hasattr(get_move_dps, 'info'):
-        get_move_dps.info = {}
-        file_ = get_path('data/move_info.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_move_dps.info[int(id_)] = j[id_]['dps']
-    return get_move_dps.info.get(move_id, 'unkn')
+    return get_move(move_id).dps
 
 
 # Returns the duration of a move when requesting
 def get_move_duration(move_id):
-    if not hasattr(get_move_duration, 'info'):
-        get_move_duration.info = {}
-        file_ = get_path('data/move_info.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_move_duration.info[int(id_)] = j[id_]['duration']
-    return get_move_duration.info.get(move_id, 'unkn')
+    return get_move(move_id).duration
 
 
 # Returns the duration of a move when requesting
 def get_move_energy(move_id):
-    if not hasattr(get_move_energy, 'info'):
-        get_move_energy.info = {}
-        file_ = get_path('data/move_info.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_move_energy.info[int(id_)] = j[id_]['energy']
-    return get_move_energy.info.get(move_id, 'unkn')
+    return get_move(move_id).energy
 
 
 # Returns the base height for a pokemon
 def get_base_height(pokemon_id):
-    if not hasattr(get_base_height, 'info'):
-        get_base_height.info = {}
-        file_ = get_path('data/base_stats.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_base_height.info[int(id_)] = j[id_].get('height')
-    return get_base_height.info.get(pokemon_id)
+    mon = get_monster(pokemon_id)
+    return mon.height if mon is not None else None
 
 
 # Returns the base weight for a pokemon
 def get_base_weight(pokemon_id):
-    if not hasattr(get_base_weight, 'info'):
-        get_base_weight.info = {}
-        file_ = get_path('data/base_stats.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_base_weight.info[int(id_)] = j[id_].get('weight')
-    return get_base_weight.info.get(pokemon_id)
+    mon = get_monster(pokemon_id)
+    return mon.weight if mon is not None else None
 
 
 # Returns the base stats for a pokemon
 def get_base_stats(pokemon_id):
-    if not hasattr(get_base_stats, 'info'):
-        get_base_stats.info = {}
-        file_ = get_path('data/base_stats.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for id_ in j:
-            get_base_stats.info[int(id_)] = {
-                "attack": float(j[id_].get('attack')),
-                "defense": float(j[id_].get('defense')),
-                "stamina": float(j[id_].get('stamina'))
-            }
-
-    return get_base_stats.info.get(pokemon_id)
+    mon = get_monster(pokemon_id)
+    if mon is None:
+        return None
+    return {
+        "attack": mon.attack,
+        "defense": mon.defense,
+        "stamina": mon.stamina
+    }
 
 
 # Returns a cp range for a certain level of a pokemon caught in a raid
 def get_pokemon_cp_range(pokemon_id, level):
-    stats = get_base_stats(pokemon_id)
-
-    if not hasattr(get_pokemon_cp_range, 'info'):
-        get_pokemon_cp_range.info = {}
-        file_ = get_path('data/cp_multipliers.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for lvl_ in j:
-            get_pokemon_cp_range.info[lvl_] = j[lvl_]
-
-    cp_multi = get_pokemon_cp_range.info["{}".format(level)]
+    mon = get_monster(pokemon_id)
+    cp_multi = get_cp_multiplier(level)
 
     # minimum IV for a egg/raid pokemon is 10/10/10
     min_cp = int(
-        ((stats['attack'] + 10.0) * pow((stats['defense'] + 10.0), 0.5)
-         * pow((stats['stamina'] + 10.0), 0.5) * pow(cp_multi, 2)) / 10.0)
+        ((mon.attack + 10.0) * pow((mon.defense + 10.0), 0.5)
+         * pow((mon.stamina + 10.0), 0.5) * pow(cp_multi, 2)) / 10.0)
     max_cp = int(
-        ((stats['attack'] + 15.0) * pow((stats['defense'] + 15.0), 0.5) *
-         pow((stats['stamina'] + 15.0), 0.5) * pow(cp_multi, 2)) / 10.0)
+        ((mon.attack + 15.0) * pow((mon.defense + 15.0), 0.5) *
+         pow((mon.stamina + 15.0), 0.5) * pow(cp_multi, 2)) / 10.0)
 
     return min_cp, max_cp
 
 
 # Returns the size ratio of a pokemon
 def size_ratio(pokemon_id, height, weight):
-    height_ratio = height / get_base_height(pokemon_id)
-    weight_ratio = weight / get_base_weight(pokemon_id)
-    return height_ratio + weight_ratio
+    mon = get_monster(pokemon_id)
+    return height / mon.height + weight / mon.weight
 
 
 # Returns the appraised size_id of a pokemon
@@ -290,17 +229,8 @@ def get_pokemon_gender(gender):
 
 # Returns the types for a pokemon
 def get_base_types(pokemon_id):
-    if not hasattr(get_base_types, 'info'):
-        get_base_types.info = {}
-        file_ = get_path('data/base_stats.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-            for id_ in j:
-                get_base_types.info[int(id_)] = [
-                    j[id_].get('type1'),
-                    j[id_].get('type2')
-                ]
-    return get_base_types.info.get(pokemon_id)
+    mon = get_monster(pokemon_id)
+    return mon.types if mon is not None else None
 
 
 # Returns the types for a pokemon
@@ -311,15 +241,7 @@ def get_mon_type(pokemon_id):
 
 # Return a boolean for whether the raid boss will have it's catch CP boosted
 def is_weather_boosted(pokemon_id, weather_id):
-    if not hasattr(is_weather_boosted, 'info'):
-        is_weather_boosted.info = {}
-        file_ = get_path('data/weather_boosts.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for w_id in j:
-            is_weather_boosted.info[w_id] = j[w_id]
-
-    boosted_types = is_weather_boosted.info.get(str(weather_id), {})
+    boosted_types = get_boosted_types(weather_id)
     types = get_base_types(pokemon_id)
     return types[0] in boosted_types or types[1] in boosted_types
 
@@ -507,6 +429,11 @@ def get_seconds_remaining(t, timezone=None):
     return seconds
 
 
+# Return the time in seconds since the epoch
+def get_timestamp(t):
+    return (t - datetime.utcfromtimestamp(0)).total_seconds()
+
+
 # Return the default url for images and stuff
 def get_image_url(suffix):
     return not_so_secret_url + suffix
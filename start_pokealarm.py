@@ -16,15 +16,18 @@ logging.basicConfig(
 import json
 import os
 import sys
+import time
 # 3rd Party Imports
 import configargparse
-from gevent import wsgi, spawn, signal, pool, queue
+from gevent import wsgi, spawn, signal, pool
+from gevent.queue import Empty
 from flask import Flask, request, abort
 import pytz
 # Local Imports
 import PokeAlarm.Events as Events
 from PokeAlarm import config
 from PokeAlarm.Cache import cache_options
+from PokeAlarm.Ingress import IngressQueue, parse_weights
 from PokeAlarm.Manager import Manager
 from PokeAlarm.Utils import get_path, parse_unicode, parse_boolean
 from PokeAlarm.Load import parse_rules_file
@@ -39,7 +42,7 @@ log = logging.getLogger('Server')
 
 # Global Variables
 app = Flask(__name__)
-data_queue = queue.Queue()
+data_queue = None
 managers = {}
 server = None
 
@@ -68,14 +71,39 @@ def accept_webhook():
 
 # Thread used to distribute the data into various processes
 def manage_webhook_data(queue):
+    expired = 0  # Events that expired before they could be distributed
+    last_report = time.time()
     while True:
+        if time.time() - last_report > 60:
+            stats = queue.get_stats()
+            expired += stats['expired']
+            if expired > 0:
+                log.info("%s expired events dropped from the webhook "
+                         "queue.", expired)
+                expired = 0
+            log.debug("%s duplicate events dropped from the webhook "
+                      "queue.", stats['duplicates'])
+            if stats['shed'] > 0:
+                log.warning("%s events shed from the full webhook queue.",
+                            stats['shed'])
+            last_report = time.time()
         qsize = queue.qsize()
-        if qsize > 5000:
+        if qsize > config['QUEUE_SIZE'] // 2:  # Half of the capacity
             log.warning("Queue length is at %s... this may be causing "
                         + "a significant delay in notifications.", qsize)
-        data = queue.get(block=True)
+            for name, mgr in managers.iteritems():
+                log.warning("Manager %s has %s events waiting.",
+                            name, mgr.get_queue_size())
+        try:  # Wake up in time for the next report
+            data = queue.get(
+                block=True, timeout=max(1, last_report + 60 - time.time()))
+        except Empty:
+            continue
         obj = Events.event_factory(data)
-        if obj is not None:
+        if obj is not None and obj.is_expired():
+            expired += 1
+            log.debug("Dropped expired event: {}".format(obj.id))
+        elif obj is not None:
             for name, mgr in managers.iteritems():
                 mgr.update(obj)
                 log.debug("Distributing event {} to manager {}.".format(
@@ -95,6 +123,9 @@ def start_server():
 
     parse_settings(os.path.abspath(os.path.dirname(__file__)))
 
+    global data_queue
+    data_queue = IngressQueue(config['QUEUE_SIZE'], config['QUEUE_WEIGHTS'])
+
     # Start Webhook Manager in a Thread
     spawn(manage_webhook_data, data_queue)
 
@@ -134,6 +165,32 @@ def parse_settings(root_path):
     parser.add_argument(
         '-C', '--concurrency', type=int,
         help='Maximum concurrent connections for the webserver.', default=200)
+    parser.add_argument(
+        '-hp', '--http_pool_size', type=int, default=10,
+        help='Connections kept open to each host alarms send to.')
+    parser.add_argument(
+        '-qs', '--queue_size', type=int, default=10000,
+        help='Maximum events waiting to be processed before the least '
+             + 'important are dropped.')
+    parser.add_argument(
+        '-qw', '--queue_weight', action='append', default=[],
+        help='Priority of a kind of event in the queue, as kind:weight '
+             + '(ex: raids:5). Higher weights are processed first.')
+    parser.add_argument(
+        '--gmaps_cache_type', type=parse_unicode, default='mem',
+        choices=cache_options,
+        help="Where GMaps results are cached. A file cache keeps them "
+             + "between runs. Options: ['mem', 'file'] (Default: 'mem')")
+    parser.add_argument(
+        '--gmaps_cache_size', type=int, default=10000,
+        help='Maximum GMaps results of each kind kept in the cache.')
+    parser.add_argument(
+        '--gmaps_cache_ttl', type=int, default=30,
+        help='Days a GMaps result is kept in the cache.')
+    parser.add_argument(
+        '--gmaps_snap', type=int, default=0,
+        help='Snap reverse geocoded locations to a grid of this many '
+             + 'meters, so nearby locations share one lookup (ex: 25).')
 
     # Manager Settings
     parser.add_argument(
@@ -143,6 +200,10 @@ def parse_settings(root_path):
         '-M', '--manager_name', type=parse_unicode,
         action='append', default=[],
         help='Names of Manager processes to start.')
+    parser.add_argument(
+        '-mp', '--manager_processes', action='store_true', default=False,
+        help='Run each Manager in its own OS process. The Google Maps '
+             + 'quota is split evenly between them.')
     # Files
     parser.add_argument(
         '-f', '--filters', type=parse_unicode, action='append',
@@ -211,6 +272,9 @@ def parse_settings(root_path):
     parser.add_argument(
         '-ma', '--max_attempts', type=int, default=[3], action='append',
         help='Maximum attempts an alarm makes to send a notification.')
+    parser.add_argument(
+        '-aw', '--alarm_workers', type=int, default=[1], action='append',
+        help='Number of notifications each alarm can send at once.')
     parser.add_argument(
         '-api', '--channel_id', type=parse_unicode, action='append',
         default=['channel_id.json'],
@@ -228,12 +292,22 @@ def parse_settings(root_path):
     config['HOST'] = args.host
     config['PORT'] = args.port
     config['CONCURRENCY'] = args.concurrency
+    config['HTTP_POOL_SIZE'] = args.http_pool_size
+    config['QUEUE_SIZE'] = args.queue_size
+    config['QUEUE_WEIGHTS'] = parse_weights(args.queue_weight)
+    config['GMAPS_CACHE_TYPE'] = args.gmaps_cache_type
+    config['GMAPS_CACHE_SIZE'] = args.gmaps_cache_size
+    config['GMAPS_CACHE_TTL'] = args.gmaps_cache_ttl
+    config['GMAPS_SNAP'] = args.gmaps_snap
     config['DEBUG'] = args.debug
+    config['MANAGER_PROCESSES'] = args.manager_processes
+    config['MANAGER_COUNT'] = args.manager_count
 
     # Check to make sure that the same number of arguments are included
     for arg in [args.filters, args.alarms, args.rules,
                 args.geofences, args.location, args.locale, args.units,
                 args.cache_type, args.timelimit, args.max_attempts,
+                args.alarm_workers,
                 args.timezone, args.gmaps_rev_geocode, args.gmaps_dm_walk,
                 args.channel_id, args.gmaps_dm_bike, args.gmaps_dm_drive,
                 args.gmaps_dm_transit]:
@@ -279,6 +353,8 @@ def parse_settings(root_path):
             time_limit=get_from_list(args.timelimit, m_ct, args.timelimit[0]),
             max_attempts=get_from_list(
                 args.max_attempts, m_ct, args.max_attempts[0]),
+            alarm_workers=get_from_list(
+                args.alarm_workers, m_ct, args.alarm_workers[0]),
             quiet=False,  # TODO: I'll totally document this some day. Promise.
             cache_type=get_from_list(
                 args.cache_type, m_ct, args.cache_type[0]),
@@ -315,7 +391,7 @@ def parse_settings(root_path):
             sys.exit(1)
     log.info("Starting up the Managers")
     for m_name in managers:
-        managers[m_name].start()
+        managers[m_name].start(as_process=config['MANAGER_PROCESSES'])
 
     # Set up signal handlers for graceful exit
     signal(signal.SIGINT, exit_gracefully)
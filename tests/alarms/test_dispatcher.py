@@ -0,0 +1,161 @@
+import logging
+import time
+import unittest
+import gevent
+from PokeAlarm.Alarms import Alarm, Dispatcher
+from PokeAlarm.Events import DTSOverlay
+
+log = logging.getLogger('Test')
+
+
+class MockAlarm(Alarm):
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.sent = []
+
+    def pokemon_alert(self, info):
+        gevent.sleep(self.delay)
+        self.sent.append(info['mon_name'])
+
+    def raid_alert(self, info):
+        raise ValueError("Service is down")
+
+
+class MockBackgroundAlarm(MockAlarm):
+
+    sends_in_background = True
+
+    def __init__(self, delay=0):
+        super(MockBackgroundAlarm, self).__init__(delay)
+        self.greenlets = []
+
+    def pokemon_alert(self, info):
+        # Queued to be sent later, and fails for MissingNo
+        self.greenlets.append(gevent.spawn_later(
+            self.delay, self.track_send(), info['mon_name'] != 'MissingNo'))
+
+    def flush(self, timeout=None):
+        gevent.joinall(self.greenlets, timeout=timeout)
+
+
+class MockRetryAlarm(MockAlarm):
+
+    sends_in_background = True
+
+    def pokemon_alert(self, info):
+        Alarm.try_sending(log, lambda: None, "Test", self.send,
+                          {'name': info['mon_name']}, max_attempts=1,
+                          destination='test_dispatcher',
+                          callback=self.track_send())
+
+    def send(self, name):
+        if name == 'MissingNo':
+            raise IOError("Service is down")
+        self.sent.append(name)
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_send_in_order(self):
+        alarm = MockAlarm()
+        dispatcher = Dispatcher('test', alarm)
+        dispatcher.start()
+        for name in ['Bulbasaur', 'Ivysaur', 'Venusaur']:
+            dispatcher.send('pokemon_alert', {'mon_name': name})
+        self.assertEqual(dispatcher.get_queue_size(), 3)
+        dispatcher.stop(timeout=5)
+        self.assertEqual(alarm.sent, ['Bulbasaur', 'Ivysaur', 'Venusaur'])
+        self.assertEqual(dispatcher.get_queue_size(), 0)
+
+    def test_send_does_not_block(self):
+        alarm = MockAlarm(delay=0.2)
+        dispatcher = Dispatcher('test', alarm, workers=4)
+        dispatcher.start()
+        for i in range(4):
+            dispatcher.send('pokemon_alert', {'mon_name': i})
+        self.assertEqual(alarm.sent, [])
+        # Workers send at the same time
+        dispatcher.stop(timeout=0.5)
+        self.assertEqual(sorted(alarm.sent), [0, 1, 2, 3])
+
+    def test_stats(self):
+        alarm = MockAlarm()
+        dispatcher = Dispatcher('test', alarm)
+        dispatcher.start()
+        dispatcher.send('pokemon_alert', {'mon_name': 'Mew'})
+        dispatcher.send('raid_alert', {'mon_name': 'Mewtwo'})
+        dispatcher.stop(timeout=5)
+        stats = dispatcher.get_stats()
+        # The raid alert raised, so it failed
+        self.assertEqual((stats['sent'], stats['failed']), (1, 1))
+        self.assertEqual(stats['queued'], 0)
+        self.assertGreaterEqual(stats['max_send'], stats['avg_send'])
+        # Stats are reset once collected
+        self.assertEqual(dispatcher.get_stats()['sent'], 0)
+
+    def test_background_stats(self):
+        alarm = MockBackgroundAlarm(delay=0.1)
+        dispatcher = Dispatcher('test', alarm)
+        dispatcher.start()
+        for name in ['Mew', 'MissingNo']:
+            dispatcher.send('pokemon_alert', {'mon_name': name})
+        dispatcher.send('raid_alert', {'mon_name': 'Mewtwo'})
+        gevent.sleep(0.05)
+        # Nothing counts as sent until the alarm reports it, but the raid
+        # alert failed before it could be queued
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats['sent'], stats['failed']), (0, 1))
+        dispatcher.stop(timeout=5)
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats['sent'], stats['failed']), (1, 1))
+        self.assertGreaterEqual(stats['avg_send'], 0.05)
+
+    def test_retry_stats(self):
+        alarm = MockRetryAlarm()
+        dispatcher = Dispatcher('test', alarm)
+        dispatcher.start()
+        for name in ['Mew', 'MissingNo']:
+            dispatcher.send('pokemon_alert', {'mon_name': name})
+        dispatcher.send('raid_alert', {'mon_name': 'Mewtwo'})
+        dispatcher.stop(timeout=5)
+        self.assertEqual(alarm.sent, ['Mew'])
+        # Only the alert that was actually sent counts as sent
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats['sent'], stats['failed']), (1, 2))
+
+    def test_flush_own_alerts(self):
+        slow, fast = MockAlarm(), MockAlarm()
+        done = slow.track_send()
+        fast.track_send()(True)
+        # Doesn't wait for the alerts of other alarms
+        start = time.time()
+        fast.flush(timeout=5)
+        self.assertLess(time.time() - start, 0.5)
+        gevent.spawn_later(0.1, done, True)
+        slow.flush(timeout=5)
+        self.assertGreaterEqual(time.time() - start, 0.1)
+        self.assertEqual(slow._pending, 0)
+
+    def test_drop_expired(self):
+        alarm = MockAlarm()
+        dispatcher = Dispatcher('test', alarm)
+        dispatcher.start()
+        expired = DTSOverlay({'mon_name': 'Mew'}, {}, {}, time.time() - 1)
+        active = DTSOverlay({'mon_name': 'Mewtwo'}, {}, {}, time.time() + 60)
+        dispatcher.send('pokemon_alert', expired)
+        dispatcher.send('pokemon_alert', active)
+        dispatcher.stop(timeout=5)
+        self.assertEqual(alarm.sent, ['Mewtwo'])
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats['sent'], stats['expired']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
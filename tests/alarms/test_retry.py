@@ -0,0 +1,98 @@
+import logging
+import time
+import unittest
+from PokeAlarm.Alarms import Alarm
+from PokeAlarm.Alarms.Retry import CircuitBreaker, RetryQueue, \
+    get_backoff, get_retry_queue
+
+log = logging.getLogger('Test')
+
+
+class MockService(object):
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, message):
+        if self.failures > 0:
+            self.failures -= 1
+            raise IOError("Service is down")
+        self.sent.append(message)
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_backoff(self):
+        for attempt, limit in [(1, 1), (2, 2), (3, 4), (10, 60)]:
+            delay = get_backoff(attempt)
+            self.assertGreaterEqual(delay, limit / 2.0)
+            self.assertLessEqual(delay, limit)
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=0.1)
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertTrue(breaker.is_open())
+        self.assertFalse(breaker.allow())
+        time.sleep(0.1)
+        # A single attempt is let through after the cooldown
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.success()
+        self.assertFalse(breaker.is_open())
+        self.assertTrue(breaker.allow())
+
+    def test_retry_queue(self):
+        queue = RetryQueue()
+        order = []
+        queue.schedule(0.2, order.append, 2)
+        queue.schedule(0.1, order.append, 1)
+        self.assertEqual(queue.get_queue_size(), 2)
+        queue.join(timeout=5)
+        self.assertEqual(order, [1, 2])
+
+    def test_try_sending(self):
+        service = MockService(failures=1)
+        results = []
+        start = time.time()
+        Alarm.try_sending(log, lambda: None, "Test", service.send,
+                          {'message': 'hi'}, destination='test_retry',
+                          callback=results.append)
+        # Doesn't wait for the retry
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(service.sent, [])
+        self.assertEqual(results, [])
+        get_retry_queue().join(timeout=5)
+        self.assertEqual(service.sent, ['hi'])
+        self.assertEqual(results, [True])
+        # Giving up is reported too
+        service = MockService(failures=1)
+        Alarm.try_sending(log, lambda: None, "Test", service.send,
+                          {'message': 'hi'}, max_attempts=1,
+                          destination='test_retry', callback=results.append)
+        self.assertEqual(results, [True, False])
+
+    def test_try_sending_deadline(self):
+        service = MockService(failures=1)
+        Alarm.try_sending(log, lambda: None, "Test", service.send,
+                          {'message': 'hi'}, deadline=time.time() + 0.1,
+                          destination='test_deadline')
+        get_retry_queue().join(timeout=5)
+        self.assertEqual(service.sent, [])
+        # Expired alerts aren't sent at all
+        Alarm.try_sending(log, lambda: None, "Test", service.send,
+                          {'message': 'hi'}, deadline=time.time() - 1,
+                          destination='test_deadline')
+        self.assertEqual(service.sent, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
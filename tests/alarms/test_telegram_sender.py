@@ -0,0 +1,148 @@
+import time
+import unittest
+import gevent
+from PokeAlarm.Alarms.Telegram import TelegramAlarm
+from PokeAlarm.Alarms.Telegram.TelegramSender import TelegramSender
+
+
+class MockResponse(object):
+
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = ''
+        self.body = body or {'ok': self.ok}
+
+    def json(self):
+        return self.body
+
+
+class MockSession(object):
+
+    def __init__(self, responses=None, delay=0):
+        self.responses = responses or []
+        self.posts = []
+        self.delay = delay
+
+    def post(self, url, json, timeout):
+        self.posts.append((url.rsplit('/', 1)[1], json['chat_id'],
+                           time.time()))
+        gevent.sleep(self.delay)
+        return self.responses.pop(0) if self.responses else MockResponse()
+
+
+class TestTelegramSender(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_order_in_chat(self):
+        session = MockSession()
+        sender = TelegramSender(session)
+        for method in ['sendSticker', 'sendMessage', 'sendLocation']:
+            sender.send('bot', 1, method, {'chat_id': 1})
+        sender.join(timeout=5)
+        self.assertEqual([p[0] for p in session.posts],
+                         ['sendSticker', 'sendMessage', 'sendLocation'])
+
+    def test_group(self):
+        session = MockSession(delay=0.1)
+        sender = TelegramSender(session)
+        group = object()
+        for method in ['sendSticker', 'sendMessage', 'sendLocation']:
+            sender.send('bot', 1, method, {'chat_id': 1}, group=group)
+        sender.send('bot', 1, 'sendMessage', {'chat_id': 1})
+        gevent.sleep(0.05)
+        self.assertEqual(sender.get_queue_size(), 4)
+        sender.join(timeout=5)
+        times = [p[2] for p in session.posts]
+        # Parts of an alert are sent together, before the next message
+        self.assertLess(times[2] - times[0], 0.05)
+        self.assertGreaterEqual(times[3] - times[0], 0.09)
+        self.assertEqual(session.posts[3][0], 'sendMessage')
+
+    def test_chat_rate(self):
+        session = MockSession()
+        sender = TelegramSender(session)
+        sender.CHAT_RATE, sender.CHAT_BURST = 10, 1
+        for i in range(3):
+            sender.send('bot', 1, 'sendMessage', {'chat_id': 1})
+        sender.send('bot', 2, 'sendMessage', {'chat_id': 2})
+        sender.join(timeout=5)
+        chat1 = [p[2] for p in session.posts if p[1] == 1]
+        chat2 = [p[2] for p in session.posts if p[1] == 2]
+        self.assertGreaterEqual(chat1[2] - chat1[0], 0.19)
+        # Other chats don't wait for it
+        self.assertLess(chat2[0] - chat1[0], 0.05)
+
+    def test_retry_after(self):
+        session = MockSession([MockResponse(429, {
+            'ok': False, 'error_code': 429,
+            'parameters': {'retry_after': 0.2}})])
+        sender = TelegramSender(session)
+        sender.send('bot', 1, 'sendMessage', {'chat_id': 1})
+        sender.join(timeout=5)
+        first, second = session.posts
+        self.assertGreaterEqual(second[2] - first[2], 0.19)
+
+    def test_retry_server_error(self):
+        session = MockSession([MockResponse(502)])
+        sender = TelegramSender(session)
+        sender.send('bot', 1, 'sendMessage', {'chat_id': 1},
+                    max_attempts=1)
+        sender.send('bot', 1, 'sendLocation', {'chat_id': 1})
+        sender.join(timeout=5)
+        # Given up after the only attempt, without holding up the next
+        self.assertEqual([p[0] for p in session.posts],
+                         ['sendMessage', 'sendLocation'])
+
+    def test_callback(self):
+        session = MockSession([MockResponse(502)])
+        sender = TelegramSender(session)
+        results = []
+        for method in ['sendMessage', 'sendLocation']:
+            sender.send('bot', 1, method, {'chat_id': 1}, max_attempts=1,
+                        callback=lambda ok, m=method: results.append((m, ok)))
+        self.assertEqual(results, [])
+        sender.join(timeout=5)
+        self.assertEqual(results,
+                         [('sendMessage', False), ('sendLocation', True)])
+
+
+class TestTelegramAlarm(unittest.TestCase):
+
+    def test_nested_dts(self):
+        alarm = TelegramAlarm({
+            'bot_token': 'bot', 'chat_id': 1, 'sticker': False,
+            'map': False, 'monsters': {'message': '<custom>'}})
+        sent = []
+        alarm.send_webhook = lambda token, method, payload, *args: \
+            sent.append(payload)
+        alarm.pokemon_alert({
+            'custom': '<mon_name> near <street>', 'mon_name': 'Bulbasaur',
+            'street': 'Main St', 'lat': 1.0, 'lng': 2.0})
+        self.assertEqual(sent[0]['text'], 'Bulbasaur near Main St')
+
+    def test_alert_sent(self):
+        alarm = TelegramAlarm({
+            'bot_token': 'bot', 'chat_id': 1, 'monsters': {
+                'message': 'A wild <mon_name>', 'sticker_url': 'sticker'}})
+        callbacks, results = [], []
+        alarm.send_webhook = lambda token, method, payload, *args: \
+            callbacks.append(args[-1])
+        alarm.set_send_listener(lambda duration, ok: results.append(ok))
+        alarm.pokemon_alert({'mon_name': 'Bulbasaur', 'lat': 1.0, 'lng': 2.0})
+        self.assertEqual(len(callbacks), 3)  # Sticker, message and map
+        # The alert is only reported once every part is done
+        callbacks[0](True)
+        callbacks[1](False)
+        self.assertEqual(results, [])
+        callbacks[2](True)
+        self.assertEqual(results, [False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import unittest
+from PokeAlarm.Alarms import Alarm, Template
+
+
+class TestTemplate(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_render(self):
+        template = Template("A wild <mon_name> has appeared! (<iv_0>%)")
+        dts = {'mon_name': 'Bulbasaur', 'iv_0': 93.3, 'unused': 'x'}
+        self.assertEqual(template.render(dts),
+                         "A wild Bulbasaur has appeared! (93.3%)")
+        self.assertEqual(template.keys, frozenset(['mon_name', 'iv_0']))
+
+    def test_missing_key(self):
+        template = Template("<mon_name> at <unknown> <<mon_name>>")
+        self.assertEqual(template.render({'mon_name': 'Mew'}),
+                         "Mew at <unknown> <Mew>")
+
+    def test_no_placeholders(self):
+        template = Template("Weather Change")
+        self.assertEqual(template.render({}), "Weather Change")
+        self.assertEqual(template.keys, frozenset())
+
+    def test_unicode(self):
+        template = Template(u"Nidoran♀ in <geofence>")
+        result = template.render({'geofence': 'Downtown'})
+        self.assertIsInstance(result, str)
+        self.assertEqual(result, u"Nidoran♀ in Downtown".encode('utf-8'))
+
+    def test_replace(self):
+        dts = {'custom': 'value'}
+        self.assertIsNone(Alarm.replace(None, dts))
+        self.assertEqual(Alarm.replace(u"<custom>!", dts), "value!")
+        self.assertEqual(
+            Alarm.replace(Alarm.create_template("<custom>?"), dts), "value?")
+
+    def test_dts_keys(self):
+        alarm = Alarm.__new__(Alarm)
+        self.assertIsNone(alarm.get_dts_keys('monsters'))
+        alarm.set_dts_keys({
+            'monsters': {
+                'title': Alarm.create_template("<mon_name> <address>"),
+                'body': Alarm.create_template("<24h_time>"),
+                'url': None,
+                'disable_embed': False
+            }
+        })
+        self.assertEqual(alarm.get_dts_keys('monsters'),
+                         frozenset(['mon_name', 'address', '24h_time']))
+        self.assertEqual(alarm.get_dts_keys('raids'), frozenset())
+
+
+if __name__ == '__main__':
+    unittest.main()
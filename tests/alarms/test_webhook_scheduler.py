@@ -0,0 +1,188 @@
+import time
+import unittest
+from PokeAlarm.Alarms.Discord.WebhookScheduler import WebhookScheduler, \
+    Message, MAX_RATE_LIMITED
+
+
+class MockResponse(object):
+
+    def __init__(self, status_code=204, headers=None, body=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.content = ''
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("No JSON object could be decoded")
+        return self.body
+
+
+class MockSession(object):
+
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.posts = []
+        self.embeds = []
+
+    def post(self, url, json, timeout):
+        self.posts.append((url, json['content'], time.time()))
+        self.embeds.append(len(json.get('embeds', [])))
+        responses = self.responses.get(url)
+        return responses.pop(0) if responses else MockResponse()
+
+
+class TestWebhookScheduler(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_send_in_order(self):
+        session = MockSession()
+        scheduler = WebhookScheduler(session)
+        for i in range(3):
+            scheduler.send('a', {'content': i})
+        self.assertEqual(scheduler.get_queue_size(), 3)
+        scheduler.join(timeout=5)
+        self.assertEqual([p[1] for p in session.posts], [0, 1, 2])
+        self.assertEqual(scheduler.get_queue_size(), 0)
+
+    def test_wait_for_reset(self):
+        session = MockSession({'a': [MockResponse(headers={
+            'X-RateLimit-Remaining': '0',
+            'X-RateLimit-Reset-After': '0.2'})]})
+        scheduler = WebhookScheduler(session)
+        scheduler.send('a', {'content': 1})
+        scheduler.send('a', {'content': 2})
+        scheduler.join(timeout=5)
+        first, second = session.posts
+        self.assertGreaterEqual(second[2] - first[2], 0.2)
+
+    def test_retry_after(self):
+        session = MockSession({'a': [MockResponse(
+            429, body={'retry_after': 200, 'global': False})]})
+        scheduler = WebhookScheduler(session)
+        scheduler.send('a', {'content': 1})
+        scheduler.send('b', {'content': 2})
+        scheduler.join(timeout=5)
+        # Message is sent again, without holding up the other webhook
+        self.assertEqual([p[1] for p in session.posts], [1, 2, 1])
+        self.assertGreaterEqual(session.posts[2][2] - session.posts[0][2],
+                                0.2)
+
+    def test_always_rate_limited(self):
+        session = MockSession({'a': [
+            MockResponse(429, body={'retry_after': 1, 'global': False})
+            for _ in range(2 * (MAX_RATE_LIMITED + 1))]})
+        scheduler = WebhookScheduler(session)
+        results = []
+        scheduler.send('a', {'content': 1}, callback=results.append)
+        scheduler.send('a', {'content': 2}, callback=results.append)
+        scheduler.join(timeout=5)
+        # Given up on instead of holding up the webhook forever
+        self.assertEqual(results, [False, False])
+        self.assertEqual(len(session.posts), 2 * (MAX_RATE_LIMITED + 1))
+
+    def test_give_up(self):
+        session = MockSession({'a': [MockResponse(400)]})
+        scheduler = WebhookScheduler(session)
+        scheduler.send('a', {'content': 1})
+        scheduler.send('a', {'content': 2})
+        scheduler.join(timeout=5)
+        self.assertEqual([p[1] for p in session.posts], [1, 2])
+
+    def test_callback(self):
+        session = MockSession({'a': [MockResponse(400)]})
+        scheduler = WebhookScheduler(session)
+        results = []
+        for i in range(2):
+            scheduler.send('a', {'content': i},
+                           callback=lambda ok, i=i: results.append((i, ok)))
+        scheduler.send('a', {'content': 2}, deadline=time.time() - 1,
+                       callback=lambda ok: results.append((2, ok)))
+        self.assertEqual(results, [])
+        scheduler.join(timeout=5)
+        # Called once each message is given up on or sent
+        self.assertEqual(results, [(0, False), (1, True), (2, False)])
+
+    def test_batch(self):
+        session = MockSession()
+        scheduler = WebhookScheduler(session)
+        for i in range(12):
+            scheduler.send('a', {'content': '', 'embeds': [{'title': str(i)}]},
+                           batch_window=0.1)
+        scheduler.send('a', {'content': 'ping', 'embeds': [{'title': '12'}]},
+                       batch_window=0.1)
+        scheduler.join(timeout=5)
+        self.assertEqual([p[1] for p in session.posts], ['', '', 'ping'])
+        self.assertEqual(session.embeds, [10, 2, 1])
+
+    def test_batch_limits(self):
+        embed = {'embeds': [{'title': 'x' * 2500}]}
+        pending = [Message(embed, 5, 3, 1, 0, None, None)] * 3
+        self.assertEqual(WebhookScheduler.batch(pending)[1], 2)
+        # Messages without a window are sent on their own
+        pending = [Message(embed, 5, 3, 0, 0, None, None)] * 3
+        self.assertEqual(WebhookScheduler.batch(pending), (embed, 1))
+
+    def test_batch_expired(self):
+        embed = {'embeds': [{'title': 'x'}]}
+        expired = Message(embed, 5, 3, 1, 0, time.time() - 1, None)
+        pending = [Message(embed, 5, 3, 1, 0, None, None)] * 2 + [expired]
+        self.assertEqual(WebhookScheduler.batch(pending)[1], 2)
+
+    def test_expire_in_batch_window(self):
+        session = MockSession()
+        scheduler = WebhookScheduler(session)
+        results = []
+        scheduler.send('a', {'content': '', 'embeds': [{'title': '0'}]},
+                       batch_window=0.1, deadline=time.time() + 0.05,
+                       callback=results.append)
+        scheduler.send('a', {'content': '', 'embeds': [{'title': '1'}]},
+                       batch_window=0.1, callback=results.append)
+        scheduler.join(timeout=5)
+        # The first message expired while waiting for the batch
+        self.assertEqual(session.embeds, [1])
+        self.assertEqual(results, [False, True])
+
+    def test_batch_all_fields(self):
+        embed = {'embeds': [{
+            'title': 'x', 'author': {'name': 'x' * 1000},
+            'footer': {'text': 'x' * 1000},
+            'fields': [{'name': 'x', 'value': 'x' * 1000}]}]}
+        pending = [Message(embed, 5, 3, 1, 0, None, None)] * 3
+        self.assertEqual(WebhookScheduler.batch(pending)[1], 1)
+
+    def test_rejected_batch(self):
+        session = MockSession({'a': [MockResponse(400)]})
+        scheduler = WebhookScheduler(session)
+        for i in range(3):
+            scheduler.send('a', {'content': '', 'embeds': [{'title': str(i)}]},
+                           batch_window=0.05)
+        scheduler.join(timeout=5)
+        # Sent again one at a time, instead of being dropped
+        self.assertEqual(session.embeds, [3, 1, 1, 1])
+
+    def test_get_retry_after(self):
+        get_retry_after = WebhookScheduler.get_retry_after
+        v6 = 'https://discordapp.com/api/webhooks/1/a'
+        v8 = 'https://discord.com/api/v8/webhooks/1/a'
+        # Headers are always in seconds
+        self.assertEqual(get_retry_after(
+            v6, {'retry_after': 1500}, {'Retry-After': '2'}), 2.0)
+        self.assertEqual(get_retry_after(
+            v6, {}, {'X-RateLimit-Reset-After': '0.5'}), 0.5)
+        # Otherwise the body is in milliseconds before v8
+        self.assertEqual(get_retry_after(v6, {'retry_after': 1500}, {}), 1.5)
+        self.assertEqual(get_retry_after(v8, {'retry_after': 1}, {}), 1.0)
+        self.assertEqual(get_retry_after(v8, {'retry_after': 0.25}, {}),
+                         0.25)
+        self.assertEqual(get_retry_after(v8, {}, {}), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
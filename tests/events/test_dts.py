@@ -0,0 +1,90 @@
+import unittest
+from PokeAlarm.Alarms import Template
+from PokeAlarm.Events import LazyDTS, DTSOverlay
+
+
+class TestLazyDTS(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def tearDown(self):
+        pass
+
+    def loader(self, value):
+        def load():
+            self.calls.append(value)
+            return value
+        return load
+
+    def test_only_loads_used_keys(self):
+        dts = LazyDTS({'eager': 1})
+        dts.set_lazy({'a': self.loader('A'), 'b': self.loader('B')})
+        self.assertIn('a', dts)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(dts['a'], 'A')
+        self.assertEqual(dts['a'], 'A')
+        self.assertEqual(dts.get('eager'), 1)
+        self.assertEqual(dts.get('missing', 'default'), 'default')
+        self.assertEqual(self.calls, ['A'])
+        self.assertRaises(KeyError, lambda: dts['missing'])
+
+    def test_precedence(self):
+        dts = LazyDTS({'custom': 'c', 'a': 'custom'})
+        dts.set_lazy({'a': self.loader('A'), 'b': self.loader('B')})
+        dts.update({'b': 'overridden'})
+        self.assertEqual(dts['custom'], 'c')
+        self.assertEqual(dts['a'], 'A')
+        self.assertEqual(dts['b'], 'overridden')
+        self.assertEqual(self.calls, ['A'])
+
+    def test_load_all(self):
+        dts = LazyDTS()
+        dts.set_lazy({'a': self.loader('A'), 'b': self.loader('B')})
+        copy = dts.copy()
+        self.assertEqual(dict(dts.load_all()), {'a': 'A', 'b': 'B'})
+        self.assertEqual(copy['b'], 'B')
+        self.assertEqual(sorted(self.calls), ['A', 'B', 'B'])
+
+
+class TestDTSOverlay(unittest.TestCase):
+
+    def setUp(self):
+        self.dts = LazyDTS({'geofence': 'Downtown', 'mon_name': 'Mew'})
+        self.dts.set_lazy({'iv': lambda: '100.0'})
+
+    def tearDown(self):
+        pass
+
+    def test_precedence(self):
+        overlay = DTSOverlay(
+            self.dts, {'geofence': 'Uptown'},
+            {'iv': 'custom', 'custom': 'value'})
+        self.assertEqual(overlay['geofence'], 'Uptown')
+        self.assertEqual(overlay['mon_name'], 'Mew')
+        self.assertEqual(overlay['iv'], '100.0')
+        self.assertEqual(overlay['custom'], 'value')
+        self.assertEqual(overlay.get('missing', 'default'), 'default')
+        self.assertNotIn('missing', overlay)
+        self.assertRaises(KeyError, lambda: overlay['missing'])
+
+    def test_nested_custom_dts(self):
+        overlay = DTSOverlay(
+            self.dts, {'geofence': 'Uptown'},
+            {'where': '<geofence> (<iv>%)', 'loop': '<loop> <where>'})
+        self.assertEqual(overlay['where'], 'Uptown (100.0%)')
+        # Custom DTS don't fill in other custom DTS
+        self.assertEqual(overlay['loop'], '<loop> <where>')
+        message = Template('<mon_name> at <where>')
+        self.assertEqual(message.render(overlay), 'Mew at Uptown (100.0%)')
+
+    def test_shared_dts(self):
+        first = DTSOverlay(self.dts, {'geofence': 'Uptown'}, {})
+        second = DTSOverlay(self.dts, {}, {'custom': 'value'})
+        self.assertEqual(first['geofence'], 'Uptown')
+        self.assertEqual(second['geofence'], 'Downtown')
+        self.assertNotIn('custom', first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import pickle
+import time
+import unittest
+from PokeAlarm.Events import MonEvent, RaidEvent, lazy
+
+
+class Counter(object):
+
+    __slots__ = ('calls', '_value')
+
+    def __init__(self):
+        self.calls = 0
+
+    @lazy
+    def value(self):
+        self.calls += 1
+        return 42
+
+
+class TestLazy(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_computed_once(self):
+        counter = Counter()
+        self.assertEqual(counter.calls, 0)
+        self.assertEqual(counter.value, 42)
+        self.assertEqual(counter.value, 42)
+        self.assertEqual(counter.calls, 1)
+        self.assertIsInstance(Counter.value, lazy)
+
+    def test_mon_event(self):
+        mon = MonEvent({
+            'encounter_id': 1, 'pokemon_id': 129,
+            'disappear_time': time.time() + 600,
+            'latitude': 37.7876146, 'longitude': -122.390624,
+            'move_1': 231, 'move_2': 133, 'height': 1.2, 'weight': 14.0})
+        self.assertFalse(hasattr(mon, '_size_id'))
+        self.assertEqual(mon.types, (11, None))  # Water
+        self.assertEqual(mon.size_id, 5)  # Big
+        self.assertTrue(hasattr(mon, '_size_id'))
+
+    def test_raid_event(self):
+        raid = RaidEvent({
+            'gym_id': 'g', 'end': time.time() + 600, 'level': 5,
+            'latitude': 37.7876146, 'longitude': -122.390624,
+            'pokemon_id': 150, 'cp': 54000, 'weather': 5,  # Windy
+            'move_1': 234, 'move_2': 108})
+        self.assertFalse(hasattr(raid, '_boss_level'))
+        self.assertEqual(raid.boss_level, 25)
+        self.assertEqual(raid.boosted_weather_id, 5)
+        self.assertEqual(raid.cp_range, (2730, 2844))
+
+    def test_pickle(self):
+        raid = RaidEvent({
+            'gym_id': 'g', 'end': time.time() + 600, 'level': 5,
+            'latitude': 37.7876146, 'longitude': -122.390624,
+            'pokemon_id': 150, 'cp': 54000, 'weather': 5})
+        self.assertFalse(hasattr(raid, '__dict__'))
+        raid.distance = 1.5
+        self.assertEqual(raid.boss_level, 25)
+        copy = pickle.loads(pickle.dumps(raid, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(copy.distance, 1.5)
+        self.assertEqual(copy.boss_level, 25)
+        self.assertFalse(hasattr(copy, '_types'))
+        self.assertRaises(AttributeError, setattr, raid, 'unknown', 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
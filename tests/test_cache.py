@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+import unittest
+from PokeAlarm import config
+from PokeAlarm.Cache import Cache, FileCache
+
+
+class TestCellGeofences(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = Cache()
+        self.cache.set_geofence_hash('a')
+
+    def tearDown(self):
+        pass
+
+    def test_hit(self):
+        self.assertIsNone(self.cache.get_cell_geofences(1))
+        self.cache.update_cell_geofences(1, ['Downtown', 'All'])
+        self.assertEqual(self.cache.get_cell_geofences(1),
+                         ('Downtown', 'All'))
+        # Cells outside every geofence are remembered as well
+        self.cache.update_cell_geofences(2, [])
+        self.assertEqual(self.cache.get_cell_geofences(2), ())
+
+    def test_same_hash(self):
+        self.cache.update_cell_geofences(1, ['Downtown'])
+        self.cache.set_geofence_hash('a')
+        self.assertEqual(self.cache.get_cell_geofences(1), ('Downtown',))
+
+    def test_hash_changed(self):
+        self.cache.update_cell_geofences(1, ['Downtown'])
+        self.cache.set_geofence_hash('b')
+        self.assertIsNone(self.cache.get_cell_geofences(1))
+
+
+class TestFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = config['ROOT_PATH']
+        config['ROOT_PATH'] = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(config['ROOT_PATH'])
+        config['ROOT_PATH'] = self.root
+
+    def test_cell_geofences_saved(self):
+        cache = FileCache('test')
+        cache.set_geofence_hash('a')
+        cache.update_cell_geofences(1, ['Downtown', 'All'])
+        cache._save()
+
+        cache = FileCache('test')
+        self.assertEqual(cache.get_cell_geofences(1), ('Downtown', 'All'))
+        cache.set_geofence_hash('a')
+        self.assertEqual(cache.get_cell_geofences(1), ('Downtown', 'All'))
+        cache.set_geofence_hash('b')
+        self.assertIsNone(cache.get_cell_geofences(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from PokeAlarm import Unknown
+from PokeAlarm.GameData import get_move, get_monster, get_cp_multiplier, \
+    get_boosted_types, UNKNOWN_MOVE
+
+
+class TestGameData(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_get_move(self):
+        move = get_move(216)  # Mud Shot
+        self.assertEqual(move.type, 5)
+        self.assertEqual((move.damage, move.dps), (5, 8.33))
+        self.assertEqual((move.duration, move.energy), (600, 7))
+        for move_id in [Unknown.TINY, None, 1, 10000, -1]:
+            self.assertIs(get_move(move_id), UNKNOWN_MOVE)
+
+    def test_get_monster(self):
+        mon = get_monster(150)  # Mewtwo
+        self.assertEqual(mon.types, (14, None))
+        self.assertEqual(mon.attack, 300.0)
+        self.assertEqual(get_monster(Unknown.TINY), None)
+        self.assertEqual(get_monster(0), None)
+
+    def test_other_tables(self):
+        self.assertAlmostEqual(get_cp_multiplier(20), 0.5974, places=4)
+        self.assertEqual(get_cp_multiplier('25'), get_cp_multiplier(25.0))
+        self.assertIn(14, get_boosted_types(5))  # Windy boosts Psychic
+        self.assertEqual(get_boosted_types(Unknown.TINY), frozenset())
+
+
+if __name__ == '__main__':
+    unittest.main()
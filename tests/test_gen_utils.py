@@ -0,0 +1,106 @@
+import time
+import unittest
+import gevent
+from PokeAlarm.Utilities.GenUtils import ExpiringSet, LRUCache, \
+    SingleFlight, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst(self):
+        bucket = TokenBucket(10, capacity=3)
+        for _ in range(3):
+            self.assertEqual(bucket.consume(), 0)
+        self.assertAlmostEqual(bucket.consume(), 0.1, delta=0.01)
+
+    def test_acquire(self):
+        bucket = TokenBucket(20, capacity=1)
+        start = time.time()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.09)
+
+    def test_pause(self):
+        bucket = TokenBucket(10, capacity=5)
+        bucket.pause(2)
+        self.assertAlmostEqual(bucket.consume(), 2, delta=0.01)
+
+
+class TestExpiringSet(unittest.TestCase):
+
+    def test_expire(self):
+        keys = ExpiringSet()
+        keys.add('a', time.time() + 0.05)
+        keys.add('b', time.time() + 60)
+        self.assertIn('a', keys)
+        time.sleep(0.06)
+        self.assertNotIn('a', keys)
+        keys.add('c', time.time() + 60)  # Purges the expired keys
+        self.assertEqual(len(keys), 2)
+        keys.discard('b')
+        self.assertNotIn('b', keys)
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evict_least_recent(self):
+        cache = LRUCache(2, 60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now least recent
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expiration(self):
+        cache = LRUCache(10, 0.05)
+        cache.set('a', 1)
+        cache.set('b', 2, expiration=time.time() + 60)
+        time.sleep(0.06)
+        self.assertEqual(cache.get('a', 'gone'), 'gone')
+        self.assertEqual([key for key, _, _ in cache.items()], ['b'])
+
+    def test_update(self):
+        cache = LRUCache(10, 60)
+        cache.set('a', 1)
+        cache.update([('a', time.time() + 60, 0), ('b', time.time() + 60, 2),
+                      ('c', time.time() - 1, 3)])
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertIsNone(cache.get('c'))
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_coalesce(self):
+        flights, calls = SingleFlight(), []
+
+        def call(value):
+            calls.append(value)
+            gevent.sleep(0.01)
+            return value
+
+        jobs = [gevent.spawn(flights.do, key, call, key)
+                for key in ('a', 'a', 'b')]
+        gevent.joinall(jobs, timeout=1)
+        self.assertEqual([job.value for job in jobs], ['a', 'a', 'b'])
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertEqual(len(flights), 0)
+
+    def test_exception(self):
+        flights = SingleFlight()
+
+        def fail():
+            gevent.sleep(0.01)
+            raise ValueError()
+
+        jobs = [gevent.spawn(flights.do, 'a', fail) for _ in range(2)]
+        gevent.joinall(jobs, timeout=1)
+        for job in jobs:
+            self.assertIsInstance(job.exception, ValueError)
+        self.assertEqual(len(flights), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import random
+import unittest
+from collections import OrderedDict
+from PokeAlarm.Geofence import Geofence, GeofenceIndex, \
+    get_weather_cell_polygon
+
+
+class TestGeofenceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.geofences = OrderedDict()
+        # Overlapping fences of various sizes, including one large parent
+        self.add('city-Downtown', [[0, 0], [0, 1], [1, 1], [1, 0]])
+        self.add('city-Uptown', [[1, 0], [1, 1], [2, 1], [2, 0]])
+        self.add('Triangle', [[0.5, 0.5], [2.5, 0.5], [1.5, 2.5]])
+        self.add('Region', [[-5, -5], [-5, 5], [5, 5], [5, -5]])
+        for i in range(20):
+            x, y = i * 0.37 - 3, (i % 5) * 0.6 - 2
+            self.add('Small-{}'.format(i),
+                     [[x, y], [x, y + 0.3], [x + 0.3, y + 0.3]])
+        self.index = GeofenceIndex(self.geofences)
+
+    def tearDown(self):
+        pass
+
+    def add(self, name, points):
+        self.geofences[name] = Geofence(name, points)
+
+    def linear_search(self, x, y):
+        return [gf for gf in self.geofences.values() if gf.contains(x, y)]
+
+    def test_matches_linear_scan(self):
+        rand = random.Random(1)
+        for _ in range(2000):
+            x, y = rand.uniform(-6, 6), rand.uniform(-6, 6)
+            self.assertEqual(self.linear_search(x, y),
+                             self.index.search(x, y))
+
+    def test_first_match_order(self):
+        self.assertEqual(
+            [gf.get_name() for gf in self.index.search(0.75, 0.6)],
+            ['city-Downtown', 'Triangle', 'Region'])
+
+    def test_outside(self):
+        self.assertEqual(self.index.candidates(50, 50), [])
+        self.assertEqual(self.index.search(-5.5, 0), [])
+
+    def test_single_point(self):
+        geofences = OrderedDict()
+        geofences['Point'] = Geofence('Point', [[1, 1], [1, 1], [1, 1]])
+        index = GeofenceIndex(geofences)
+        self.assertEqual(len(index.candidates(1, 1)), 1)
+
+    def test_large_geofence(self):
+        geofences = OrderedDict()
+        geofences['City'] = Geofence(
+            'City', [[-90, -180], [-90, 180], [90, 180], [90, -180]])
+        for i in range(100):
+            x, y = i * 0.01, i * 0.02
+            geofences['Small-{}'.format(i)] = Geofence(
+                'Small-{}'.format(i),
+                [[x, y], [x, y + 0.01], [x + 0.01, y + 0.01]])
+        index = GeofenceIndex(geofences)
+        # The large fence isn't copied into every cell it covers
+        self.assertLessEqual(index.get_cell_count(),
+                             100 * GeofenceIndex.MAX_CELLS)
+        self.assertEqual(
+            [gf.get_name() for gf in index.search(0.502, 1.008)],
+            ['City', 'Small-50'])
+        self.assertEqual(
+            [gf.get_name() for gf in index.candidates(50, 50)], ['City'])
+
+
+class TestGeofenceOverlap(unittest.TestCase):
+
+    def setUp(self):
+        self.geofence = Geofence('Square', [[0, 0], [0, 1], [1, 1], [1, 0]])
+
+    def tearDown(self):
+        pass
+
+    def test_overlap(self):
+        inside = Weather(1, [[0.5, 0.5], [0.5, 2], [2, 2], [2, 0.5]])
+        outside = Weather(2, [[3, 3], [3, 4], [4, 4], [4, 3]])
+        for _ in range(2):  # Second pass uses the cached geometries
+            self.assertTrue(self.geofence.check_overlap(inside))
+            self.assertFalse(self.geofence.check_overlap(outside))
+
+    def test_cell_polygon_cached(self):
+        weather = Weather(3, [[0, 0], [0, 1], [1, 1]])
+        self.assertIs(get_weather_cell_polygon(weather),
+                      get_weather_cell_polygon(weather))
+
+
+class Weather(object):
+
+    def __init__(self, cell_id, coords):
+        self.weather_cell_id = cell_id
+        self.coords = coords
+
+
+if __name__ == '__main__':
+    unittest.main()
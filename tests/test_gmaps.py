@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import unittest
+import gevent
+from PokeAlarm import config
+from PokeAlarm.LocationServices import GMaps, get_gmaps
+from PokeAlarm.LocationServices.GMaps import get_rate_limiter
+
+
+class FakeResponse(object):
+
+    ok = True
+    status_code = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeSession(object):
+    """ Answers every request with the language it was sent in. """
+
+    def __init__(self, delay=0):
+        self.requests = []
+        self.delay = delay
+        self.in_flight = self.most_in_flight = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(params)
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        gevent.sleep(self.delay)
+        self.in_flight -= 1
+        lang = params['language']
+        if 'distancematrix' in url:
+            return FakeResponse({'status': 'OK', 'rows': [{'elements': [{
+                'distance': {'text': lang + ' km'},
+                'duration': {'text': lang + ' min'}}]}]})
+        return FakeResponse({'status': 'OK', 'results': [{
+            'address_components': [{'types': ['country'],
+                                    'short_name': lang}],
+            'geometry': {'location': {'lat': 1.0, 'lng': 2.0}}}]})
+
+
+class TestGMaps(unittest.TestCase):
+
+    def setUp(self):
+        self.gmaps = GMaps(['key'])
+        self.gmaps._session = FakeSession()
+
+    def test_shared_service(self):
+        gmaps = get_gmaps(['a', 'b'])
+        self.assertIs(get_gmaps(['a', 'b']), gmaps)
+        self.assertIsNot(get_gmaps(['b']), gmaps)
+
+    def test_rate_limit_per_process(self):
+        limiter = getattr(get_rate_limiter, 'limiter', None)
+        old = {k: config.get(k) for k in (
+            'MANAGER_PROCESSES', 'MANAGER_COUNT')}
+        try:
+            del get_rate_limiter.limiter
+        except AttributeError:
+            pass
+        try:
+            config.update(MANAGER_PROCESSES=True, MANAGER_COUNT=5)
+            bucket = get_rate_limiter()
+            self.assertIs(get_rate_limiter(), bucket)
+            # Each of the 5 processes gets 10 of the 50 requests per second
+            for _ in range(10):
+                self.assertEqual(bucket.consume(), 0)
+            self.assertGreater(bucket.consume(), 0)
+        finally:
+            config.update(old)
+            del get_rate_limiter.limiter
+            if limiter is not None:
+                get_rate_limiter.limiter = limiter
+
+    def test_geocode(self):
+        self.assertEqual(self.gmaps.geocode('Some Place'), (1.0, 2.0))
+        self.assertEqual(self.gmaps.geocode('some place'), (1.0, 2.0))
+        self.assertEqual(len(self.gmaps._session.requests), 1)
+
+    def test_reverse_geocode_language(self):
+        latlng = (37.7876146, -122.390624)
+        self.assertEqual(
+            self.gmaps.reverse_geocode(latlng, 'en')['country'], 'en')
+        self.assertEqual(
+            self.gmaps.reverse_geocode(latlng, 'de')['country'], 'de')
+        self.assertEqual(
+            self.gmaps.reverse_geocode(latlng, 'en')['country'], 'en')
+        self.assertEqual(len(self.gmaps._session.requests), 2)
+
+    def test_distance_matrix(self):
+        origin, dest = (37.7876146, -122.390624), (37.8, -122.4)
+        dts = self.gmaps.distance_matrix(
+            'walking', origin, dest, 'fr', 'metric')
+        self.assertEqual(dts, {
+            'walking_distance': 'fr km', 'walking_duration': 'fr min'})
+        self.gmaps.distance_matrix('walking', origin, dest, 'fr', 'metric')
+        self.assertEqual(len(self.gmaps._session.requests), 1)
+        self.gmaps.distance_matrix('walking', origin, dest, 'fr', 'imperial')
+        self.assertEqual(len(self.gmaps._session.requests), 2)
+        self.assertRaises(ValueError, self.gmaps.distance_matrix,
+                          'flying', origin, dest, 'fr', 'metric')
+
+    def test_concurrent_lookups(self):
+        self.gmaps._session = session = FakeSession(delay=0.05)
+        jobs = [gevent.spawn(self.gmaps.reverse_geocode, (i, i), 'en')
+                for i in range(4)]
+        gevent.joinall(jobs, timeout=1)
+        self.assertEqual(len(session.requests), 4)
+        self.assertEqual(session.most_in_flight, 4)
+
+    def test_single_flight(self):
+        self.gmaps._session = session = FakeSession(delay=0.05)
+        # Both round to the same location, so share one request
+        jobs = [gevent.spawn(self.gmaps.reverse_geocode, latlng, 'en')
+                for latlng in ((1.000001, 2.0), (1.000002, 2.0))]
+        gevent.joinall(jobs, timeout=1)
+        self.assertEqual(len(session.requests), 1)
+        self.assertIs(jobs[0].value, jobs[1].value)
+        self.assertEqual(len(self.gmaps._in_flight), 0)
+
+    def test_reset(self):
+        latlng = (37.7876146, -122.390624)
+        dts = self.gmaps.reverse_geocode(latlng)
+        session, pool = self.gmaps._session, self.gmaps._pool
+        self.gmaps.reset()
+        self.assertIsNot(self.gmaps._session, session)
+        self.assertIsNot(self.gmaps._pool, pool)
+        self.assertIs(self.gmaps.reverse_geocode(latlng), dts)  # Memoized
+
+    def test_snap(self):
+        gmaps = GMaps(['key'], snap=25)
+        gmaps._session = session = FakeSession()
+        # About 10 meters apart, in the same 25 meter square
+        first = gmaps.reverse_geocode((37.78760, -122.39060))
+        second = gmaps.reverse_geocode((37.78769, -122.39060))
+        self.assertIs(first, second)
+        gmaps.reverse_geocode((37.78800, -122.39060))  # About 45 meters
+        self.assertEqual(len(session.requests), 2)
+
+    def test_cache_file(self):
+        folder = tempfile.mkdtemp()
+        try:
+            cache_file = os.path.join(folder, 'cache', 'gmaps.cache')
+            gmaps = GMaps(['key'], cache_file=cache_file)
+            gmaps._session = FakeSession()
+            gmaps.reverse_geocode((37.7876146, -122.390624), 'de')
+            gmaps.save()
+            self.assertTrue(os.path.isfile(cache_file))
+
+            gmaps = GMaps(['key'], cache_file=cache_file)
+            gmaps._session = session = FakeSession()
+            dts = gmaps.reverse_geocode((37.7876146, -122.390624), 'de')
+            self.assertEqual(dts['country'], 'de')
+            self.assertEqual(len(session.requests), 0)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_save_failed(self):
+        folder = tempfile.mkdtemp()
+        try:
+            # The cache folder can't be created where a file is
+            open(os.path.join(folder, 'cache'), 'w').close()
+            cache_file = os.path.join(folder, 'cache', 'gmaps.cache')
+            gmaps = GMaps(['key'], cache_file=cache_file)
+            gmaps._session = FakeSession()
+            gmaps.reverse_geocode((37.7876146, -122.390624))
+            gmaps.save()
+            self.assertTrue(gmaps._changed)  # Saved again next time
+            os.remove(os.path.join(folder, 'cache'))
+            gmaps.save()
+            self.assertFalse(gmaps._changed)
+            self.assertTrue(os.path.isfile(cache_file))
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
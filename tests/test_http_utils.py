@@ -0,0 +1,29 @@
+import unittest
+from PokeAlarm.Utilities.HttpUtils import create_session, get_session, \
+    reset_session
+
+
+class TestHttpUtils(unittest.TestCase):
+
+    def test_create_session(self):
+        session = create_session(retry_count=2, pool_size=4)
+        adapter = session.get_adapter('https://discordapp.com')
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_shared_session(self):
+        session = get_session()
+        self.assertIs(get_session(), session)
+        # Alarms retry for themselves, over http or https
+        https = session.get_adapter('https://api.telegram.org')
+        self.assertIs(session.get_adapter('http://example.com'), https)
+        self.assertEqual(https.max_retries.total, 0)
+
+    def test_reset_session(self):
+        session = get_session()
+        reset_session()
+        self.assertIsNot(get_session(), session)
+
+
+if __name__ == '__main__':
+    unittest.main()
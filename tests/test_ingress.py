@@ -0,0 +1,111 @@
+import time
+import unittest
+from gevent.queue import Empty
+from PokeAlarm.Ingress import IngressQueue, get_kind, get_dedupe_key, \
+    parse_weights
+
+
+def mon(name, remaining=600):
+    return {'type': 'pokemon', 'message': {
+        'name': name, 'disappear_time': time.time() + remaining}}
+
+
+def raid(name, remaining=600):
+    return {'type': 'raid', 'message': {
+        'name': name, 'pokemon_id': 150, 'end': time.time() + remaining}}
+
+
+def gym(name):
+    return {'type': 'gym', 'message': {'name': name}}
+
+
+def names(queue):
+    result = []
+    while not queue.empty():
+        result.append(queue.get(block=False)['message']['name'])
+    return result
+
+
+class TestIngressQueue(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_priority(self):
+        queue = IngressQueue()
+        queue.put(gym('gym'))
+        queue.put(mon('late', 900))
+        queue.put(mon('soon', 300))
+        queue.put(raid('raid'))
+        self.assertEqual(names(queue), ['raid', 'soon', 'late', 'gym'])
+
+    def test_weights(self):
+        weights = parse_weights(['gyms:9'])
+        self.assertEqual(weights['raids'], 5)
+        queue = IngressQueue(weights=weights)
+        queue.put(raid('raid'))
+        queue.put(gym('gym'))
+        self.assertEqual(names(queue), ['gym', 'raid'])
+        self.assertRaises(ValueError, parse_weights, ['pokemon:2'])
+        self.assertRaises(ValueError, parse_weights, ['raids'])
+
+    def test_shed(self):
+        queue = IngressQueue(maxsize=3)
+        queue.put(mon('late', 900))
+        queue.put(mon('soon', 300))
+        queue.put(raid('raid'))
+        # Makes room by dropping the monster closest to expiring
+        queue.put(raid('raid2'))
+        self.assertEqual(queue.qsize(), 3)
+        # Nothing is less important than a gym, so it is dropped instead
+        queue.put(gym('gym'))
+        self.assertEqual(names(queue), ['raid', 'raid2', 'late'])
+        self.assertEqual(queue.get_stats()['shed'], 2)
+
+    def test_drop_expired(self):
+        queue = IngressQueue()
+        queue.put(mon('expired', -1))
+        queue.put(mon('active'))
+        self.assertEqual(names(queue), ['active'])
+        self.assertEqual(queue.get_stats()['expired'], 1)
+        self.assertRaises(Empty, queue.get, timeout=0.01)
+
+    def test_dedupe(self):
+        queue = IngressQueue(maxsize=2)
+        first, second = mon('first'), mon('second')
+        first['message']['encounter_id'] = 'abc'
+        second['message']['encounter_id'] = 'abc'
+        queue.put(first)
+        queue.put(second)
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_stats()['duplicates'], 1)
+        # Shed events are let through again
+        queue.put(raid('raid'))
+        queue.put(raid('raid2'))
+        queue.put(second)
+        self.assertEqual(queue.get_stats()['duplicates'], 0)
+        # Gyms are never dropped
+        queue = IngressQueue()
+        queue.put(gym('gym'))
+        queue.put(gym('gym'))
+        self.assertEqual(queue.qsize(), 2)
+
+    def test_get_dedupe_key(self):
+        egg = {'type': 'raid', 'message': {'gym_id': 'g', 'end': 10}}
+        self.assertEqual(get_dedupe_key('eggs', egg), ('e', 'g', 10))
+        egg['message']['pokemon_id'] = 150
+        self.assertEqual(get_dedupe_key('raids', egg), ('r', 'g', 10))
+        self.assertEqual(get_dedupe_key('gyms', gym('gym')), None)
+
+    def test_get_kind(self):
+        self.assertEqual(get_kind(mon('mon')), 'monsters')
+        self.assertEqual(get_kind(raid('raid')), 'raids')
+        self.assertEqual(get_kind({'type': 'raid', 'message': {}}), 'eggs')
+        self.assertEqual(get_kind({'type': 'captcha', 'message': {}}), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import unittest
+from PokeAlarm.Locale import Locale, get_locale
+
+
+class TestLocale(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.locale = get_locale('en')
+
+    def test_get_locale(self):
+        self.assertIs(get_locale('en'), self.locale)
+        self.assertIsNot(get_locale('fr'), self.locale)
+        self.assertIsInstance(get_locale('fr'), Locale)
+        self.assertEqual(get_locale('fr').get_pokemon_name(1), 'Bulbizarre')
+
+    def test_monster_dts(self):
+        dts = self.locale.get_monster_dts(6)  # Charizard
+        self.assertEqual(dts['mon_name'], 'Charizard')
+        self.assertEqual(dts['mon_id_3'], '006')
+        self.assertEqual(dts['types'], 'Fire/Flying')
+        self.assertEqual(dts['types_emoji'], u'🔥🐦')
+        dts = self.locale.get_monster_dts(4)  # Charmander
+        self.assertEqual(dts['types'], 'Fire')
+        self.assertEqual(dts['type2_or_empty'], '')
+        # Prebuilt DTS are shared
+        self.assertIs(self.locale.get_monster_dts(4), dts)
+
+    def test_form_and_costume_dts(self):
+        form = self.locale.get_form_dts(201, 1)  # Unown A
+        self.assertEqual((form['form'], form['form_id_3']), ('A', '001'))
+        form = self.locale.get_form_dts(1, 0)
+        self.assertEqual(form['form_or_empty'], '')
+        costume = self.locale.get_costume_dts(1, 5)
+        self.assertEqual(costume['costume_id_3'], '005')
+
+    def test_move_dts(self):
+        quick = self.locale.get_quick_dts(216)
+        self.assertEqual(quick['quick_move'], 'Mud Shot')
+        self.assertEqual(quick['quick_type'], 'Ground')
+        self.assertEqual(quick['quick_energy'], 7)
+        charge = self.locale.get_charge_dts('?')
+        self.assertEqual(charge['charge_move'], 'unknown')
+        self.assertEqual(charge['charge_damage'], 'unkn')
+
+
+if __name__ == '__main__':
+    unittest.main()
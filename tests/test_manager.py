@@ -0,0 +1,198 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import gevent
+import gipc
+from PokeAlarm import config
+from PokeAlarm.Alarms import Alarm
+import PokeAlarm.Events as Events
+from PokeAlarm.Manager import Manager
+
+
+def write_geofence(path, points):
+    with open(path, 'w') as f:
+        f.write('[Square]\n')
+        for lat, lng in points:
+            f.write('{},{}\n'.format(lat, lng))
+
+
+def generate_weather(cell_id, coords):
+    return Events.WeatherEvent({
+        's2_cell_id': cell_id, 'coords': coords,
+        'time_changed': time.time(), 'condition': 1})
+
+
+def generate_monster(i):
+    return Events.MonEvent({
+        'encounter_id': str(i), 'pokemon_id': 1,
+        'disappear_time': time.time() + 600,
+        'latitude': 37.7876146, 'longitude': -122.390624})
+
+
+class MockAlarm(Alarm):
+
+    def __init__(self, message):
+        self.message = Alarm.create_template(message)
+        self.set_dts_keys({'monsters': [self.message]})
+
+
+class MockDispatcher(object):
+
+    def __init__(self, alarm):
+        self.alarm = alarm
+        self.sent = []
+
+    def send(self, alert, info):
+        self.sent.append(Alarm.replace(self.alarm.message, info))
+
+
+class MockGMaps(object):
+
+    def __init__(self):
+        self.lookups = 0
+
+    def reverse_geocode(self, latlng, language='en'):
+        self.lookups += 1
+        return {'address': '1 Market St'}
+
+
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.files = {}
+        for name in ('filters', 'alarms', 'channel_id'):
+            self.files[name] = os.path.join(self.folder, name + '.json')
+            with open(self.files[name], 'w') as f:
+                json.dump({}, f)
+        self.mgr = Manager(
+            name='test', google_key=[], locale='en', units='metric',
+            timezone=None, time_limit=0, max_attempts=3,
+            location='37.78,-122.40', quiet=False, cache_type='mem',
+            filter_file=self.files['filters'], geofence_file=None,
+            alarm_file=self.files['alarms'], debug=False,
+            channel_id_file=self.files['channel_id'])
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_read_pipe(self):
+        reader, writer = gipc.pipe()
+        reading = gevent.spawn(self.mgr._read_pipe, reader)
+        for i in range(3):
+            writer.put(generate_monster(i))
+        writer.put(None)  # Sentinel
+        writer.close()
+        reading.join(timeout=5)
+        self.assertTrue(reading.ready())
+        self.assertEqual(self.mgr.get_queue_size(), 3)
+        self.assertTrue(self.mgr._Manager__event.is_set())
+
+    def test_gmaps_custom_dts(self):
+        alarm = MockAlarm('<mon_name> at <where>')
+        dispatcher = MockDispatcher(alarm)
+        self.mgr._Manager__alarms['mock'] = alarm
+        self.mgr._Manager__dispatchers['mock'] = dispatcher
+        self.mgr._gmaps_service = MockGMaps()
+        self.mgr._gmaps_reverse_geocode = True
+        mon = generate_monster(0)
+        mon.geofence, mon.channel_id = 'All', None
+        dts = {'mon_name': 'Bulbasaur'}
+        # Not looked up if nothing uses it
+        self.mgr._trigger_mon(mon, ['mock'], dts, {'where': 'home'})
+        self.assertEqual(self.mgr._gmaps_service.lookups, 0)
+        # Custom DTS can contain more DTS
+        self.mgr._trigger_mon(mon, ['mock'], dts, {'where': '<address>'})
+        self.assertEqual(self.mgr._gmaps_service.lookups, 1)
+        self.assertEqual(dispatcher.sent, [
+            'Bulbasaur at home', 'Bulbasaur at 1 Market St'])
+
+    def test_process(self):
+        self.mgr.start(as_process=True)
+        for i in range(5):
+            self.mgr.update(generate_monster(i))
+        self.assertGreater(self.mgr.get_queue_size(), 0)
+        # The worker reports each event it finishes through shared memory
+        end = time.time() + 10
+        while self.mgr.get_queue_size() > 0 and time.time() < end:
+            gevent.sleep(0.05)
+        self.assertEqual(self.mgr.get_queue_size(), 0)
+        self.assertEqual(self.mgr._Manager__processed.value, 5)
+        # The sentinel tells the worker to finish up and exit
+        self.mgr.stop()
+        self.mgr.join()
+        process = self.mgr._Manager__process
+        self.assertFalse(process.is_alive())
+        self.assertEqual(process.exitcode, 0)
+
+
+class TestWeatherGeofences(unittest.TestCase):
+
+    inside = [[0.5, 0.5], [0.5, 2], [2, 2], [2, 0.5]]
+
+    def setUp(self):
+        # The file cache is saved under the root path
+        self.root = config['ROOT_PATH']
+        config['ROOT_PATH'] = tempfile.mkdtemp()
+        os.symlink(os.path.join(self.root, 'locales'),
+                   os.path.join(config['ROOT_PATH'], 'locales'))
+        for name in ('filters', 'alarms', 'channel_id'):
+            with open(os.path.join(config['ROOT_PATH'], name + '.json'),
+                      'w') as f:
+                json.dump({}, f)
+        self.geofence_file = os.path.join(config['ROOT_PATH'], 'geofence.txt')
+        write_geofence(self.geofence_file, [[0, 0], [0, 1], [1, 1], [1, 0]])
+
+    def tearDown(self):
+        shutil.rmtree(config['ROOT_PATH'])
+        config['ROOT_PATH'] = self.root
+
+    def create_manager(self):
+        return Manager(
+            name='test', google_key=[], locale='en', units='metric',
+            timezone=None, time_limit=0, max_attempts=3,
+            location='37.78,-122.40', quiet=False, cache_type='file',
+            filter_file='filters.json', geofence_file='geofence.txt',
+            alarm_file='alarms.json', debug=False,
+            channel_id_file='channel_id.json')
+
+    def test_cell_cached(self):
+        mgr = self.create_manager()
+        weather = generate_weather(1001, self.inside)
+        self.assertTrue(mgr.match_weather_geofences(weather))
+        self.assertEqual(weather.geofence_list, ['Square', 'All'])
+        # The cell isn't checked against the geofences again
+        mgr.geofences.clear()
+        weather = generate_weather(1001, self.inside)
+        self.assertTrue(mgr.match_weather_geofences(weather))
+        self.assertEqual(weather.geofence_list, ['Square', 'All'])
+
+    def test_cell_saved(self):
+        mgr = self.create_manager()
+        mgr.match_weather_geofences(generate_weather(1002, self.inside))
+        mgr._Manager__cache._save()
+
+        mgr = self.create_manager()
+        mgr.geofences.clear()
+        weather = generate_weather(1002, self.inside)
+        self.assertTrue(mgr.match_weather_geofences(weather))
+        self.assertEqual(weather.geofence_list, ['Square', 'All'])
+
+    def test_geofence_file_changed(self):
+        mgr = self.create_manager()
+        mgr.match_weather_geofences(generate_weather(1003, self.inside))
+        mgr._Manager__cache._save()
+
+        # Cells matched against the old geofences are checked again
+        write_geofence(self.geofence_file, [[5, 5], [5, 6], [6, 6], [6, 5]])
+        mgr = self.create_manager()
+        weather = generate_weather(1003, self.inside)
+        self.assertFalse(mgr.match_weather_geofences(weather))
+        self.assertEqual(weather.geofence_list, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
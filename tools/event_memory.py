@@ -0,0 +1,81 @@
+"""
+Compares the memory used by PokeAlarm's slotted events with the memory the
+same events took when each kept its attributes in a __dict__ (along with a
+reference to a logger).
+
+Usage: python tools/event_memory.py [number of events]
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PokeAlarm.Events import event_factory  # noqa: E402
+
+
+class DictEvent(object):
+    """ Holds an event's attributes in a __dict__, like events used to. """
+
+    def __init__(self, event, kind):
+        self.__dict__.update(event.__getstate__())
+        self._log_name = kind
+        self._log = logging.getLogger(kind)
+
+
+def get_frames():
+    """ Returns a webhook frame for each kind of event. """
+    now = time.time()
+    location = {'latitude': 37.7876146, 'longitude': -122.390624}
+    mon = {'encounter_id': 'a', 'pokemon_id': 129, 'disappear_time': now,
+           'individual_attack': 15, 'individual_defense': 15,
+           'individual_stamina': 15, 'move_1': 231, 'move_2': 133,
+           'height': 1.2, 'weight': 14.0, 'cp': 250, 'pokemon_level': 30}
+    stop = {'pokestop_id': 'b', 'lure_expiration': now}
+    gym = {'gym_id': 'c', 'team_id': 1, 'slots_available': 2}
+    egg = {'gym_id': 'd', 'start': now, 'end': now, 'level': 5}
+    raid = dict(egg, pokemon_id=150, cp=54000, move_1=234, move_2=108)
+    weather = {'s2_cell_id': 1, 'time_changed': now, 'condition': 1}
+    for message in (mon, stop, gym, egg, raid):
+        message.update(location)
+    return [
+        ('monster', {'type': 'pokemon', 'message': mon}),
+        ('stop', {'type': 'pokestop', 'message': stop}),
+        ('gym', {'type': 'gym', 'message': gym}),
+        ('egg', {'type': 'raid', 'message': egg}),
+        ('raid', {'type': 'raid', 'message': raid}),
+        ('weather', {'type': 'weather', 'message': weather})
+    ]
+
+
+def get_size(obj):
+    """ Returns the bytes used by an object and its __dict__, if any. """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print("{:<10}{:>14}{:>14}{:>10}".format(
+        'Event', 'Dict (bytes)', 'Slots (bytes)', 'Saved'))
+    total_dict, total_slots = 0, 0
+    for kind, frame in get_frames():
+        event = event_factory(frame)
+        dict_size = get_size(DictEvent(event, kind))
+        slots_size = get_size(event)
+        total_dict += dict_size * count
+        total_slots += slots_size * count
+        print("{:<10}{:>14}{:>14}{:>9.0f}%".format(
+            kind, dict_size, slots_size,
+            100.0 * (dict_size - slots_size) / dict_size))
+    print("\n{} of each event: {:.1f} MB with a __dict__, {:.1f} MB with "
+          "slots.".format(count, total_dict / 1048576.0,
+                          total_slots / 1048576.0))
+    print("Attribute values are shared by both, so are not counted.")
+
+
+if __name__ == '__main__':
+    main()